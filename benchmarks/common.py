@@ -0,0 +1,27 @@
+from src.database.models import Guilds, Users, psql_db
+from src.database.migrations import migrate
+
+
+# IDs of guilds and users created by benchmarks, far from real snowflakes
+FIRST_ID = 1 << 20
+
+
+def prepare_database() -> None:
+    """Apply migrations and remove rows left by an interrupted run"""
+    migrate()
+    cleanup()
+
+
+def cleanup() -> None:
+    # rows of other tables are removed by cascade
+    Guilds.delete().where(Guilds.id.between(FIRST_ID, FIRST_ID * 2)).execute()
+    Users.delete().where(Users.id.between(FIRST_ID, FIRST_ID * 2)).execute()
+
+
+def terminate_other_connections() -> int:
+    """Terminate connections of the database besides the current one"""
+    cursor = psql_db.execute_sql("""
+        SELECT count(pg_terminate_backend(pid)) FROM pg_stat_activity
+        WHERE datname = current_database() AND pid <> pg_backend_pid()
+    """)
+    return cursor.fetchone()[0]
@@ -0,0 +1,86 @@
+"""
+Text activity cooldowns
+
+Replays messages of many members and compares `Cooldowns` with the
+previous way of keeping cooldowns, where every rewarded message parked
+a coroutine sleeping for the whole cooldown before the key was removed
+from a set. Prints time per message, pending tasks and memory held.
+
+Doesn't need a database:
+    python -m benchmarks.cooldowns
+"""
+import asyncio
+import random
+import time
+import tracemalloc
+
+from src.utils.cooldown import Cooldowns
+from benchmarks.stats import describe
+
+
+MEMBERS = 20_000
+MESSAGES = 200_000
+COOLDOWN = 60
+
+
+class SleepingCooldowns:
+    def __init__(self) -> None:
+        self.on_cooldown: set[tuple[int, int]] = set()
+
+    def is_on_cooldown(self, key: tuple[int, int]) -> bool:
+        return key in self.on_cooldown
+
+    async def trigger(self, key: tuple[int, int], seconds: float) -> None:
+        self.on_cooldown.add(key)
+        await asyncio.sleep(seconds)
+        self.on_cooldown.remove(key)
+
+
+async def replay_sleeping(keys: list[tuple[int, int]]) -> None:
+    cooldowns = SleepingCooldowns()
+    tasks = set()
+    durations = []
+    tracemalloc.start()
+    for key in keys:
+        started = time.perf_counter()
+        if not cooldowns.is_on_cooldown(key):
+            # the handler awaited the sleep, so every reward kept a task alive
+            task = asyncio.create_task(cooldowns.trigger(key, COOLDOWN))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            await asyncio.sleep(0)
+        durations.append(time.perf_counter() - started)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    describe('sleeping coroutines', durations)
+    print(f'sleeping coroutines: {len(tasks)} pending tasks, {memory / 2**20:.1f} MiB')
+    for task in list(tasks):
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def replay_expiry(keys: list[tuple[int, int]]) -> None:
+    cooldowns: Cooldowns[tuple[int, int]] = Cooldowns()
+    durations = []
+    tracemalloc.start()
+    for key in keys:
+        started = time.perf_counter()
+        if not cooldowns.is_on_cooldown(key):
+            cooldowns.trigger(key, COOLDOWN)
+            await asyncio.sleep(0)
+        durations.append(time.perf_counter() - started)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    describe('expiry times', durations)
+    print(f'expiry times: 0 pending tasks, {memory / 2**20:.1f} MiB, {len(cooldowns)} keys')
+
+
+def main() -> None:
+    random.seed(0)
+    keys = [(1, random.randrange(MEMBERS)) for _ in range(MESSAGES)]
+    asyncio.run(replay_sleeping(keys))
+    asyncio.run(replay_expiry(keys))
+
+
+if __name__ == '__main__':
+    main()
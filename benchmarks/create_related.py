@@ -0,0 +1,85 @@
+"""
+Provisioning of parent rows by `create_related`
+
+Compares `get_member` for new and known members with the previous way
+of provisioning, which ran the service, caught IntegrityError, created
+the missing parents with get_or_create and ran the service again.
+
+Needs a disposable database configured by POSTGRES_* variables:
+    python -m benchmarks.create_related
+"""
+import time
+from functools import wraps
+
+import peewee
+
+from src.database.models import Guilds, Users, Members, psql_db
+from src.database.services import create_related
+from benchmarks.common import FIRST_ID, prepare_database, cleanup
+from benchmarks.stats import describe
+
+
+MEMBERS = 1000
+
+
+def retrying_create_related(*models: type[peewee.Model]):
+    def wrapper(func):
+        @wraps(func)
+        def wrapped(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except peewee.IntegrityError:
+                for id_, model in zip(args, models):
+                    model.get_or_create(id=id_)
+                return func(*args, **kwargs)
+        return wrapped
+    return wrapper
+
+
+def get_member(guild_id: int, user_id: int, /) -> Members:
+    return Members.get_or_create(guild_id=guild_id, user_id=user_id)[0]
+
+
+def measure(title: str, service, first_id: int) -> None:
+    statements = 0
+    execute_sql = psql_db.execute_sql
+
+    def counting_execute_sql(*args, **kwargs):
+        nonlocal statements
+        statements += 1
+        return execute_sql(*args, **kwargs)
+
+    psql_db.execute_sql = counting_execute_sql
+    try:
+        for phase in ('new', 'known'):
+            statements = 0
+            durations = []
+            for index in range(MEMBERS):
+                started = time.perf_counter()
+                # every member is in a new guild, so both parents are missing
+                service(first_id + index, first_id + index)
+                durations.append(time.perf_counter() - started)
+            describe(f'{title}, {phase} members', durations)
+            print(f'  statements per call: {statements / MEMBERS:.1f}')
+    finally:
+        psql_db.execute_sql = execute_sql
+
+
+def main() -> None:
+    prepare_database()
+    with psql_db.connection_context():
+        measure(
+            'get_or_create retry',
+            retrying_create_related(Guilds, Users)(psql_db.atomic()(get_member)),
+            FIRST_ID,
+        )
+        measure(
+            'upsert provisioning',
+            create_related(Guilds, Users)(psql_db.atomic()(get_member)),
+            FIRST_ID + MEMBERS,
+        )
+    cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Stress test of the pooled database
+
+Services are run through `run_db` from many tasks at once, while all
+connections of the pool are terminated from time to time. Lost
+connections are replaced and services repeated, so calls should fail
+only when the connection was lost during COMMIT: such transactions are
+never repeated, because the commit may be already applied.
+
+The test is repeated for several sizes of the database executor, the
+pool has a couple of connections more than workers, like in settings.
+Prints calls per second, latency and failed calls of every size.
+
+Needs a disposable database configured by POSTGRES_* variables:
+    python -m benchmarks.db_pool
+"""
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.database import executor
+from src.database.executor import run_db, shutdown_db_executor
+from src.database.models import psql_db
+from src.database.services import get_member
+from benchmarks.common import (FIRST_ID, prepare_database, cleanup,
+                               terminate_other_connections)
+from benchmarks.stats import describe
+
+
+CALLS = 5000
+CONCURRENCY = 64
+MEMBERS = 500
+TERMINATIONS = 5
+WORKERS = (1, 2, 4, 8, 16)
+# connections of the pool besides the workers ones
+SPARE_CONNECTIONS = 2
+
+
+def resize(workers: int) -> None:
+    """Replace the database executor and the pool with ones of the given size"""
+    shutdown_db_executor()
+    psql_db.close_all()
+    psql_db._max_connections = workers + SPARE_CONNECTIONS  # pylint: disable=protected-access
+    executor._executor = ThreadPoolExecutor(  # pylint: disable=protected-access
+        max_workers=workers,
+        thread_name_prefix='database',
+    )
+
+
+async def stress(workers: int) -> None:
+    resize(workers)
+    latencies: list[float] = []
+    failures: list[BaseException] = []
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def call() -> None:
+        user_id = FIRST_ID + random.randrange(MEMBERS)
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await run_db(get_member, FIRST_ID, user_id)
+            except Exception as error:  # pylint: disable=broad-except
+                failures.append(error)
+            latencies.append(time.perf_counter() - started)
+
+    async def terminate() -> None:
+        for _ in range(TERMINATIONS):
+            await asyncio.sleep(0.2)
+            terminate_other_connections()
+
+    title = f'{workers} workers'
+    started = time.perf_counter()
+    await asyncio.gather(terminate(), *(call() for _ in range(CALLS)))
+    print(f'{title}: {CALLS / (time.perf_counter() - started):.0f} calls/s')
+    describe(f'{title} latency', latencies)
+    print(f'{title}: {len(failures)} failed calls', {type(error).__name__ for error in failures})
+
+
+async def main() -> None:
+    prepare_database()
+    try:
+        for workers in WORKERS:
+            await stress(workers)
+    finally:
+        cleanup()
+        shutdown_db_executor()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
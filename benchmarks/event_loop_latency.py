@@ -0,0 +1,84 @@
+"""
+Event loop lag while the database is slow
+
+Every service call spends `QUERY_DELAY` seconds in `pg_sleep`, like a
+query waiting for locks or an overloaded server. Services are called
+directly from the event loop, as cogs did before, and through `run_db`,
+while a ticker measures how late the loop wakes it up. With `run_db`
+the lag should stay near zero whatever the query time is.
+
+The same `psql_db.atomic()` service is run by all workers at once,
+which is safe because transactions of `_atomic` are kept per thread.
+
+Needs a disposable database configured by POSTGRES_* variables:
+    python -m benchmarks.event_loop_latency
+"""
+import asyncio
+import time
+
+from src.database.models import psql_db
+from src.database.executor import run_db, shutdown_db_executor
+from src.database.services import get_member
+from benchmarks.common import FIRST_ID, prepare_database, cleanup
+from benchmarks.stats import describe, timed
+
+
+CALLS = 40
+MEMBERS = 8
+# seconds every service call waits in the database
+QUERY_DELAY = 0.05
+# seconds between ticks of the measured coroutine
+TICK = 0.005
+
+
+@psql_db.atomic()
+def slow_service(guild_id: int, user_id: int) -> int:
+    psql_db.execute_sql('SELECT pg_sleep(%s)', (QUERY_DELAY,))
+    return get_member(guild_id, user_id).user_id
+
+
+async def ticker(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - started - TICK)
+
+
+async def measure(title: str, calls) -> None:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    ticking = asyncio.create_task(ticker(lags, stop))
+    await asyncio.sleep(TICK)
+    with timed(f'{title}: {CALLS} calls'):
+        await calls()
+    stop.set()
+    await ticking
+    describe(f'{title} loop lag', lags)
+
+
+async def direct() -> None:
+    for index in range(CALLS):
+        slow_service(FIRST_ID, FIRST_ID + index % MEMBERS)
+        # handlers awaited something between queries
+        await asyncio.sleep(0)
+
+
+async def executor() -> None:
+    await asyncio.gather(*(
+        run_db(slow_service, FIRST_ID, FIRST_ID + index % MEMBERS) for index in range(CALLS)
+    ))
+
+
+async def main() -> None:
+    prepare_database()
+    try:
+        with psql_db.connection_context():
+            await measure('direct', direct)
+        await measure('run_db', executor)
+    finally:
+        cleanup()
+        shutdown_db_executor()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,175 @@
+"""
+Plans of the leaderboard queries with and without their indexes
+
+Seeds guilds with members, likes and game statistics, then runs the
+queries with EXPLAIN ANALYZE. The same queries are explained again
+after the leaderboard indexes are dropped inside a transaction that is
+rolled back. Exits with an error when a query of one guild scans a
+whole table or a board of one guild isn't read from its index while
+the indexes exist. Plans are made with costs of SSD storage.
+
+About a million members are seeded by default, their amount may be
+given as an argument. Needs a disposable database configured by
+POSTGRES_* variables:
+    python -m benchmarks.leaderboard_indexes [members]
+"""
+import sys
+from typing import Iterator
+
+from src.settings import LEADERBOARD_CAPACITY
+from src.database.models import psql_db
+from src.database.leaderboards import Metric, boards_query
+from src.database.migrations import execute_outside_transaction
+from benchmarks.common import FIRST_ID, prepare_database, cleanup
+
+
+GUILDS = 20
+MEMBERS = 1_000_000
+# likes given by every member and share of members that played games
+LIKES_PER_MEMBER = 4
+GAMERS = 0.2
+# every query is run several times, so the first run doesn't warm the cache alone
+RUNS = 3
+# planner cost of random reads on SSD, the default one is set for spinning disks
+RANDOM_PAGE_COST = 1.1
+# index every board of one guild is read from
+BOARD_INDEXES = {
+    Metric.VOICE: 'members_voice_top_idx',
+    Metric.BALANCE: 'members_balance_top_idx',
+    Metric.EXPERIENCE: 'members_experience_top_idx',
+    Metric.MONTHLY_ACTIVITY: 'members_monthly_activity_top_idx',
+    Metric.MEOW: 'members_meow_top_idx',
+    Metric.REPUTATION: 'likes_guild_to_user_idx',
+    Metric.GAMES: 'gamestatistics_wins_top_idx',
+}
+INDEXES = list(BOARD_INDEXES.values())
+# tables that should not be scanned whole to serve one guild
+INDEXED_TABLES = {'members', 'likes', 'gamestatistics'}
+
+
+def seed(members: int) -> None:
+    members_per_guild = members // GUILDS
+    params = {
+        'first': FIRST_ID,
+        'guilds': GUILDS,
+        # members of guilds overlap
+        'users': members_per_guild * 2,
+        'members': members_per_guild,
+        'likes': members_per_guild * LIKES_PER_MEMBER,
+        'gamers': GAMERS,
+    }
+    # rows of guilds are interleaved like rows added over time,
+    # otherwise scans by the guild foreign key read few pages
+    with psql_db.atomic():
+        psql_db.execute_sql("""
+            INSERT INTO guilds (id)
+            SELECT %(first)s + g FROM generate_series(0, %(guilds)s - 1) g;
+            INSERT INTO users (id)
+            SELECT %(first)s + u FROM generate_series(0, %(users)s - 1) u;
+            INSERT INTO members (
+                guild_id, user_id, on_guild, balance, experience,
+                voice_activity, monthly_chat_activity, meow_count
+            )
+            SELECT
+                %(first)s + g, %(first)s + u, random() < 0.9,
+                (random() * 100000)::int, (random() * 1000000)::int,
+                (random() * 1000000)::int, (random() * 10000)::int,
+                (random() * 100)::int
+            FROM generate_series(0, %(guilds)s - 1) g,
+            LATERAL (
+                SELECT u FROM generate_series(0, %(users)s - 1) u
+                ORDER BY random() + g LIMIT %(members)s
+            ) users
+            ORDER BY u, g;
+            INSERT INTO likes (guild_id, user_id, to_user_id, type)
+            SELECT guild_id, user_id, to_user_id, 1 - 2 * (random() < 0.2)::int FROM (
+                SELECT
+                    %(first)s + g guild_id,
+                    %(first)s + (random() * (%(users)s - 1))::int user_id,
+                    %(first)s + (random() * (%(users)s - 1))::int to_user_id
+                FROM generate_series(1, %(likes)s) n,
+                generate_series(0, %(guilds)s - 1) g
+                ORDER BY n, g
+            ) likes
+            ON CONFLICT DO NOTHING;
+            INSERT INTO gamestatistics (guild_id, user_id, wins, money_won)
+            SELECT guild_id, user_id, (random() * 500)::int, (random() * 100000)::int
+            FROM members
+            WHERE guild_id >= %(first)s AND random() < %(gamers)s
+            ORDER BY user_id, guild_id;
+        """, params)
+    # visibility map is set by vacuum, index only scans aren't chosen without it
+    execute_outside_transaction('VACUUM ANALYZE guilds, users, members, likes, gamestatistics')
+
+
+def queries() -> dict[str, tuple[str, dict]]:
+    guild_id = FIRST_ID
+    return {
+        'boards of one guild': boards_query(LEADERBOARD_CAPACITY, guild_id),
+        'boards of all guilds': boards_query(LEADERBOARD_CAPACITY),
+        'member reputation': (
+            'SELECT SUM(type) FROM likes WHERE guild_id = %s AND to_user_id = %s',
+            (guild_id, FIRST_ID + 1),
+        ),
+    }
+
+
+def explain(sql: str, params) -> tuple[float, set[str], set[str]]:
+    """Best execution time in ms of a few runs, used indexes and tables scanned whole"""
+    plans = [
+        psql_db.execute_sql('EXPLAIN (ANALYZE, FORMAT JSON) ' + sql, params).fetchone()[0][0]
+        for _ in range(RUNS)
+    ]
+    plan = min(plans, key=lambda plan: plan['Execution Time'])
+    indexes: set[str] = set()
+    scanned: set[str] = set()
+    for node in _nodes(plan['Plan']):
+        if 'Index Name' in node:
+            indexes.add(node['Index Name'])
+        if node['Node Type'] == 'Seq Scan':
+            scanned.add(node['Relation Name'])
+    return plan['Execution Time'], indexes, scanned
+
+
+def _nodes(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get('Plans', []):
+        yield from _nodes(child)
+
+
+def main() -> None:
+    members = int(sys.argv[1]) if len(sys.argv) > 1 else MEMBERS
+    prepare_database()
+    seed(members)
+    failed = False
+    try:
+        psql_db.execute_sql('SET random_page_cost = %s', (RANDOM_PAGE_COST,))
+        with_indexes = {title: explain(*query) for title, query in queries().items()}
+        with psql_db.atomic() as transaction:
+            for index in INDEXES:
+                psql_db.execute_sql(f'DROP INDEX {index}')
+            without_indexes = {title: explain(*query) for title, query in queries().items()}
+            transaction.rollback()
+
+        for title, (time, indexes, scanned) in with_indexes.items():
+            print(f'{title}:')
+            print(f'  with indexes:    {time:8.2f} ms, indexes {sorted(indexes & set(INDEXES))}, '
+                  f'full scans {sorted(scanned)}')
+            time, _, scanned_without = without_indexes[title]
+            print(f'  without indexes: {time:8.2f} ms, full scans {sorted(scanned_without)}')
+            if 'all guilds' not in title and scanned & INDEXED_TABLES:
+                print('  REGRESSION: the query of one guild scans a whole table')
+                failed = True
+
+        _, indexes, _ = with_indexes['boards of one guild']
+        for metric, index in BOARD_INDEXES.items():
+            if index not in indexes:
+                print(f'REGRESSION: {metric.value} board of one guild is not read from {index}')
+                failed = True
+    finally:
+        cleanup()
+    sys.exit(failed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Keyset and offset pagination of the history
+
+Seeds the history of one guild and browses it with `PeeweePaginator`
+the way members do: pages forward from the first one, a jump to a far
+page, pages after it, the last page and pages back from it. Prints time
+and statements per page change for keyset and offset pagination, pages
+of both are checked to be the same.
+
+Needs a disposable database configured by POSTGRES_* variables:
+    python -m benchmarks.paginator
+"""
+import asyncio
+import datetime
+import time
+
+from src.settings import HISTORY_PARTITIONS_AHEAD, HISTORY_SHOWN_MONTHS
+from src.database.models import History, psql_db
+from src.discord_views.paginate.peewee_paginator import PeeweePaginator
+from src.ext.history.partitions import create_partitions, month_start
+from benchmarks.common import FIRST_ID, prepare_database, cleanup
+from benchmarks.stats import describe
+
+
+ROWS = 200_000
+ITEMS_PER_PAGE = 15
+FORWARD = 100
+FAR_PAGE = 5000
+BACK = 100
+
+
+def seed() -> None:
+    create_partitions(HISTORY_PARTITIONS_AHEAD)
+    with psql_db.atomic():
+        psql_db.execute_sql("""
+            INSERT INTO guilds (id) VALUES (%(first)s);
+            INSERT INTO users (id) VALUES (%(first)s);
+            INSERT INTO history (guild_id, user_id, creation_time, action_name, description)
+            SELECT %(first)s, %(first)s, now() - interval '1 millisecond' * (%(rows)s - n),
+                   'benchmark', md5(n::text)
+            FROM generate_series(1, %(rows)s) n;
+            ANALYZE history;
+        """, {'first': FIRST_ID, 'rows': ROWS})
+
+
+def create_paginator(keyset: bool) -> PeeweePaginator[History]:
+    # same query as HistoryPaginator
+    return PeeweePaginator(
+        History,
+        items_per_page=ITEMS_PER_PAGE,
+        order_by=-History.id,  # type: ignore
+        filters={
+            'guild': History.guild_id == FIRST_ID,
+            'recent': History.creation_time >= month_start(
+                datetime.date.today(), -HISTORY_SHOWN_MONTHS,
+            ),
+        },
+        keyset=keyset,
+    )
+
+
+def browse() -> list[int]:
+    """Pages in order they are opened"""
+    pages = list(range(1, FORWARD + 1))
+    pages += list(range(FAR_PAGE, FAR_PAGE + FORWARD))
+    last_page = -(-ROWS // ITEMS_PER_PAGE)
+    pages += list(range(last_page, last_page - BACK, -1))
+    return pages
+
+
+async def measure(title: str, keyset: bool) -> list[list[int]]:
+    statements = 0
+    execute_sql = psql_db.execute_sql
+
+    def counting_execute_sql(*args, **kwargs):
+        nonlocal statements
+        statements += 1
+        return execute_sql(*args, **kwargs)
+
+    # views are created in the event loop, pages are selected in it too
+    paginator = create_paginator(keyset)
+    opened = []
+    durations = []
+    psql_db.execute_sql = counting_execute_sql
+    try:
+        for page in browse():
+            started = time.perf_counter()
+            paginator.page = page
+            durations.append(time.perf_counter() - started)
+            opened.append([item.id for item in paginator.items])
+    finally:
+        psql_db.execute_sql = execute_sql
+    describe(title, durations)
+    print(f'{title}: {statements / len(durations):.2f} statements per page')
+    return opened
+
+
+def main() -> None:
+    prepare_database()
+    seed()
+    try:
+        offset_pages = asyncio.run(measure('offset', keyset=False))
+        keyset_pages = asyncio.run(measure('keyset', keyset=True))
+        if offset_pages != keyset_pages:
+            raise AssertionError('keyset pages differ from offset pages')
+    finally:
+        cleanup()
+
+
+if __name__ == '__main__':
+    main()
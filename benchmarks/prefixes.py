@@ -0,0 +1,111 @@
+"""
+Prefix resolution of chat messages
+
+Replays a stream of guild messages, a few of them are commands. Before
+prefixes were cached, every message selected prefixes of its guild
+from the database and then built a context. Now prefixes are read from
+`bot.guild_prefixes` and messages without a prefix are dropped before
+the context is built. Prints time per message of both paths.
+
+Needs a disposable database configured by POSTGRES_* variables:
+    python -m benchmarks.prefixes
+"""
+import random
+import time
+from types import SimpleNamespace
+
+from src import settings
+from src.bot import _prefix_callable
+from src.database.models import Guilds, psql_db
+from src.database.services import get_all_guild_prefixes, get_guild_data
+from benchmarks.common import FIRST_ID, prepare_database, cleanup
+from benchmarks.stats import describe
+
+
+MESSAGES = 20_000
+GUILDS = 50
+# every n-th guild has its own prefixes
+CUSTOM_PREFIXES_EVERY = 5
+# share of messages starting with a prefix
+COMMANDS = 0.02
+BOT_ID = FIRST_ID
+
+
+def old_prefix_callable(bot_, message) -> list[str]:
+    """`_prefix_callable` before prefixes were cached"""
+    bot_id = bot_.user.id
+    base = [f'<@!{bot_id}>', f'<@{bot_id}>']
+
+    guild = message.guild
+    if guild:
+        guild_prefixes = get_guild_data(guild.id).prefixes
+        if guild_prefixes:
+            base.extend(guild_prefixes)
+            return base
+
+    base.extend(settings.DEFAULT_PREFIXES)
+    return base
+
+
+def seed() -> None:
+    Guilds.insert_many([
+        {
+            'id': FIRST_ID + index,
+            'prefixes': ['?'] if index % CUSTOM_PREFIXES_EVERY == 0 else None,
+        }
+        for index in range(GUILDS)
+    ]).execute()
+
+
+def messages() -> list[SimpleNamespace]:
+    random.seed(0)
+    stream = []
+    for _ in range(MESSAGES):
+        index = random.randrange(GUILDS)
+        command = random.random() < COMMANDS
+        if command:
+            prefix = '?' if index % CUSTOM_PREFIXES_EVERY == 0 else settings.DEFAULT_PREFIXES[0]
+        else:
+            prefix = ''
+        stream.append(SimpleNamespace(
+            guild=SimpleNamespace(id=FIRST_ID + index),
+            content=f'{prefix}hello there',
+        ))
+    return stream
+
+
+def measure(title: str, prefix_callable, bot_, stream: list[SimpleNamespace]) -> int:
+    """Time prefix resolution of every message, return amount of commands"""
+    durations = []
+    commands = 0
+    for message in stream:
+        started = time.perf_counter()
+        if message.content.startswith(tuple(prefix_callable(bot_, message))):
+            commands += 1
+        durations.append(time.perf_counter() - started)
+    describe(title, durations)
+    return commands
+
+
+def main() -> None:
+    prepare_database()
+    try:
+        with psql_db.connection_context():
+            seed()
+            stream = messages()
+            bot_ = SimpleNamespace(user=SimpleNamespace(id=BOT_ID), guild_prefixes={})
+            old_commands = measure('database per message', old_prefix_callable, bot_, stream)
+
+            started = time.perf_counter()
+            bot_.guild_prefixes = get_all_guild_prefixes()
+            print(f'prefixes loaded in {(time.perf_counter() - started) * 1000:.3f} ms')
+            commands = measure('cached prefixes', _prefix_callable, bot_, stream)
+        if commands != old_commands:
+            raise AssertionError('cached prefixes found other commands')
+        print(f'commands: {commands} of {MESSAGES} messages')
+    finally:
+        cleanup()
+
+
+if __name__ == '__main__':
+    main()
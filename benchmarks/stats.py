@@ -0,0 +1,26 @@
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Iterator, Sequence
+
+
+@contextmanager
+def timed(title: str) -> Iterator[None]:
+    started = time.perf_counter()
+    yield
+    print(f'{title}: {time.perf_counter() - started:.3f} s')
+
+
+def describe(title: str, seconds: Sequence[float]) -> None:
+    """Print percentiles of the durations in milliseconds"""
+    ordered = sorted(seconds)
+    quantiles = (
+        statistics.quantiles(ordered, n=100, method='inclusive')
+        if len(ordered) > 1 else ordered * 99
+    )
+    print(
+        f'{title}: n={len(ordered)} '
+        f'p50={quantiles[49] * 1000:.3f} ms '
+        f'p99={quantiles[98] * 1000:.3f} ms '
+        f'max={ordered[-1] * 1000:.3f} ms'
+    )
@@ -0,0 +1,123 @@
+"""
+Memory and lateness of many timers
+
+Schedules 100k timers due within 20 seconds, cancels and reschedules
+some of them and waits until all of them fire. Compares `TimerService`,
+which saves timers to the database in the background, with a task
+sleeping until every deadline. Prints memory held by scheduled timers
+and how late they fire.
+
+Needs a disposable database configured by POSTGRES_* variables:
+    python -m benchmarks.timers
+"""
+import asyncio
+import datetime
+import random
+import time
+import tracemalloc
+
+from src.database.models import Timers
+from src.timers import Timer, TimerService
+from benchmarks.common import prepare_database
+from benchmarks.stats import describe
+
+
+TIMERS = 100_000
+# seconds before the first timer is due, scheduling is done by then
+DELAY = 10
+# seconds between the first and the last deadline
+SPREAD = 20
+KIND = 'benchmark'
+
+
+def deadlines() -> dict[str, datetime.datetime]:
+    random.seed(0)
+    now = datetime.datetime.now().astimezone()
+    return {
+        f'{KIND}:{index}': now + datetime.timedelta(seconds=DELAY + random.random() * SPREAD)
+        for index in range(TIMERS)
+    }
+
+
+def schedule_tasks(due: dict[str, datetime.datetime], lateness: list[float]) -> list[asyncio.Task]:
+    async def sleep_until(due_at: datetime.datetime) -> None:
+        await asyncio.sleep(due_at.timestamp() - time.time())
+        lateness.append(time.time() - due_at.timestamp())
+
+    tasks = {key: asyncio.create_task(sleep_until(due_at)) for key, due_at in due.items()}
+    for index in range(0, TIMERS, 10):
+        tasks.pop(f'{KIND}:{index}').cancel()
+    return list(tasks.values())
+
+
+def schedule_timers(due: dict[str, datetime.datetime], lateness: list[float]) -> TimerService:
+    async def handler(timer: Timer) -> None:
+        lateness.append(time.time() - timer.due_at.timestamp())
+
+    service = TimerService()
+    service.register(KIND, handler)
+    for key, due_at in due.items():
+        service.schedule(key, KIND, due_at)
+    for index in range(0, TIMERS, 10):
+        service.cancel(f'{KIND}:{index}')
+    # replaced timers leave stale heap items
+    for index in range(1, TIMERS, 10):
+        key = f'{KIND}:{index}'
+        service.schedule(key, KIND, due[key] + datetime.timedelta(seconds=SPREAD / 2))
+    return service
+
+
+async def memory(schedule) -> float:
+    """MiB held by scheduled timers, they are dropped without firing"""
+    due = deadlines()
+    tracemalloc.start()
+    scheduled = schedule(due, [])
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del scheduled
+    return held / 2**20
+
+
+async def sleeping_tasks() -> None:
+    lateness: list[float] = []
+    started = time.perf_counter()
+    tasks = schedule_tasks(deadlines(), lateness)
+    print(f'sleeping tasks: scheduled in {time.perf_counter() - started:.2f} s')
+    await asyncio.gather(*tasks)
+    describe('sleeping tasks lateness', lateness)
+
+
+async def timer_service() -> None:
+    lateness: list[float] = []
+    started = time.perf_counter()
+    service = schedule_timers(deadlines(), lateness)
+    print(f'timer service: scheduled in {time.perf_counter() - started:.2f} s')
+    scheduled = len(service)
+    await service.start()
+    while len(lateness) < scheduled:
+        await asyncio.sleep(0.1)
+    await service.flush()
+    service.stop()
+    describe('timer service lateness', lateness)
+    left = Timers.select().where(Timers.kind == KIND).count()
+    print(f'timer service: {left} timers left in the database')
+
+
+def cleanup() -> None:
+    Timers.delete().where(Timers.kind == KIND).execute()
+
+
+def main() -> None:
+    prepare_database()
+    cleanup()
+    try:
+        print(f'sleeping tasks: {asyncio.run(memory(schedule_tasks)):.1f} MiB')
+        print(f'timer service: {asyncio.run(memory(schedule_timers)):.1f} MiB')
+        asyncio.run(sleeping_tasks())
+        asyncio.run(timer_service())
+    finally:
+        cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+Replay of voice state updates in a busy guild
+
+Compares `VoiceActivityCog` keeping participants of every channel
+incrementally with the previous way, which filtered all channel members
+on every update that moved a member between channels. Channel members
+are collected from voice states of the whole guild, as disnake does.
+
+Doesn't need a database, models imported with the cog connect only
+when they are queried:
+    python -m benchmarks.voice_participants
+"""
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from src.ext.activity.voice_activity import (
+    VoiceActivityCog,
+    MIN_MEMRBER_AMOUNT,
+    _is_conversation_participant,
+)
+from benchmarks.stats import describe
+
+
+CHANNELS = 20
+MEMBERS = 3000
+UPDATES = 30_000
+
+
+@dataclass(frozen=True)
+class FakeVoiceState:
+    channel: Optional['FakeChannel']
+    deaf: bool = False
+    self_deaf: bool = False
+
+
+class FakeGuild:
+    def __init__(self, id_: int) -> None:
+        self.id = id_
+        self.members: dict[int, FakeMember] = {}
+        self.voice_states: dict[int, FakeVoiceState] = {}
+
+    def get_member(self, user_id: int) -> Optional['FakeMember']:
+        return self.members.get(user_id)
+
+
+class FakeChannel:
+    def __init__(self, id_: int, guild: FakeGuild) -> None:
+        self.id = id_
+        self.guild = guild
+
+    @property
+    def members(self) -> list['FakeMember']:
+        return [self.guild.members[user_id]
+                for user_id, state in self.guild.voice_states.items()
+                if state.channel is self]
+
+
+class FakeMember:
+    bot = False
+
+    def __init__(self, id_: int, guild: FakeGuild) -> None:
+        self.id = id_
+        self.guild = guild
+
+    @property
+    def voice(self) -> Optional[FakeVoiceState]:
+        return self.guild.voice_states.get(self.id)
+
+
+class FilteringVoiceActivityCog(VoiceActivityCog):
+    """Participants counting before they were tracked incrementally"""
+
+    async def on_voice_state_update(self, member, before, after) -> None:
+        if member.bot:
+            return
+
+        if before.channel != after.channel:
+            if before.channel:
+                self._check_channel(before.channel)
+            if after.channel:
+                self._check_channel(after.channel)
+
+        self._sync_member(member)
+
+    def _check_channel(self, channel) -> None:
+        members = channel.members
+        members = list(filter(_is_conversation_participant, members))
+
+        if len(members) >= MIN_MEMRBER_AMOUNT:
+            if not self._is_channel_allowed(channel):
+                self.allowed_channels.add(channel.id)
+                for member in members:
+                    self._try_add_to_count(member)
+        else:
+            if self._is_channel_allowed(channel):
+                self.allowed_channels.remove(channel.id)
+                for member in members:
+                    self._try_remove_from_count(member)
+
+
+def generate_updates(channels: list[FakeChannel]) -> list[tuple[int, FakeVoiceState]]:
+    """Joins of every member followed by random moves, leaves and deafens"""
+    random.seed(0)
+    states: dict[int, FakeVoiceState] = {}
+    updates = []
+    for user_id in range(MEMBERS):
+        states[user_id] = FakeVoiceState(random.choice(channels))
+        updates.append((user_id, states[user_id]))
+    for _ in range(UPDATES):
+        user_id = random.randrange(MEMBERS)
+        state = states.get(user_id)
+        roll = random.random()
+        if state is None:
+            state = FakeVoiceState(random.choice(channels))
+        elif roll < 0.4:
+            state = FakeVoiceState(state.channel, self_deaf=not state.self_deaf)
+        elif roll < 0.8:
+            state = FakeVoiceState(random.choice(channels), self_deaf=state.self_deaf)
+        else:
+            state = FakeVoiceState(None)
+        states[user_id] = state
+        updates.append((user_id, state))
+    return updates
+
+
+async def replay(title: str, cog_class: type[VoiceActivityCog]) -> None:
+    guild = FakeGuild(1)
+    guild.members = {user_id: FakeMember(user_id, guild) for user_id in range(MEMBERS)}
+    channels = [FakeChannel(index, guild) for index in range(CHANNELS)]
+
+    cog = cog_class(None)  # type: ignore
+    # accrual writes to the database, nothing is accrued here
+    cog.accrue_voice_time.cancel()
+
+    empty = FakeVoiceState(None)
+    durations = []
+    for user_id, after in generate_updates(channels):
+        member = guild.members[user_id]
+        before = guild.voice_states.get(user_id, empty)
+        if after.channel:
+            guild.voice_states[user_id] = after
+        else:
+            guild.voice_states.pop(user_id, None)
+        started = time.perf_counter()
+        await cog.on_voice_state_update(member, before, after)  # type: ignore
+        durations.append(time.perf_counter() - started)
+    describe(title, durations)
+    print(f'{title}: {len(cog.count_for)} members counted')
+
+
+def main() -> None:
+    logging.disable(logging.INFO)
+    asyncio.run(replay('filtering channel members', FilteringVoiceActivityCog))
+    asyncio.run(replay('incremental participants', VoiceActivityCog))
+
+
+if __name__ == '__main__':
+    main()
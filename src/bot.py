@@ -9,7 +9,13 @@ from disnake.ext import commands
 from src import settings
 from src.setup_development.entry import setup_development
 from src.lock import AsyncioLockManager
-from src.database.services import get_guild_prefixes
+from src.database.services import get_all_guild_prefixes
+from src.database.executor import run_db, shutdown_db_executor
+from src.timers import TimerService
+from src.scheduler import Scheduler
+from src.storage import FileStorage
+from src.http_client import HttpClient
+from src.url_validator import UrlValidator
 from src.logger import get_logger
 from src.translation import get_translator
 from src.utils.extract_traceback import extract_traceback
@@ -43,6 +49,12 @@ class SEBot(commands.AutoShardedBot):
         self.persistent_views_added = False
         self.image_channel_cycle = Cycle[int](settings.IMAGE_CHANNELS)
         self.lock = AsyncioLockManager()
+        self.guild_prefixes: dict[int, list[str]] = {}
+        self.timers = TimerService()
+        self.scheduler = Scheduler()
+        self.http_client = HttpClient()
+        self.storage = FileStorage(self)
+        self.url_validator = UrlValidator(self.http_client)
 
         self._load_exts()
 
@@ -50,7 +62,7 @@ class SEBot(commands.AutoShardedBot):
         self,
         user: Union[disnake.User, disnake.Member],
     ) -> str:
-        url = await self.save_file(await user.display_avatar.to_file())
+        url = await self.storage.save_asset(user.display_avatar)
         return url or user.display_avatar.url
 
     async def possible_embed_image(self, url: str) -> bool:
@@ -67,16 +79,11 @@ class SEBot(commands.AutoShardedBot):
         return True
 
     async def save_file(self, file: disnake.File) -> Optional[str]:
-        channel = self._next_image_channel()
-        if not channel:
-            return None
-
-        try:
-            message = await channel.send(file=file)
-        except (disnake.HTTPException, disnake.Forbidden):
-            return None
+        return await self.storage.save_file(file)
 
-        return message.attachments[0].url
+    async def load_guild_prefixes(self) -> None:
+        self.guild_prefixes = await run_db(get_all_guild_prefixes)
+        logger.info('Loaded prefixes for %d guilds', len(self.guild_prefixes))
 
     def sync_user(self, user: Union[disnake.User, disnake.Member]) -> None:
         cog = self.get_cog('VoiceActivityCog')
@@ -88,6 +95,9 @@ class SEBot(commands.AutoShardedBot):
             pass
         if not hasattr(self, 'uptime'):
             self.uptime = time.time()
+        await self.load_guild_prefixes()
+        await self.timers.start()
+        self.scheduler.start()
 
         if settings.DEVELOPMENT and not hasattr(self, 'prepared'):
             await setup_development(
@@ -103,10 +113,26 @@ class SEBot(commands.AutoShardedBot):
             setattr(self, 'prepared', True)
         print(f'Ready: {self.user} (ID: {self.user.id})')
 
+    async def close(self) -> None:
+        await super().close()
+        self.timers.stop()
+        self.scheduler.stop()
+        await self.http_client.close()
+        try:
+            await self.timers.flush()
+        except Exception as error:  # pylint: disable=broad-except
+            logger.error('timers are not saved on close: %s', repr(error))
+        shutdown_db_executor()
+
     async def process_commands(self, message) -> None:
         if message.author.bot:
             return
 
+        # most messages are just chat, don't build context for them
+        prefixes = tuple(_prefix_callable(self, message))
+        if not message.content.startswith(prefixes):
+            return
+
         ctx = await self.get_context(message)
 
         if ctx.command is None:
@@ -260,7 +286,7 @@ def _prefix_callable(bot_: SEBot, message: disnake.Message) -> list[str]:
 
     guild = message.guild
     if guild:
-        guild_prefixes = get_guild_prefixes(guild.id)
+        guild_prefixes = bot_.guild_prefixes.get(guild.id)
         if guild_prefixes:
             base.extend(guild_prefixes)
             return base
@@ -0,0 +1,166 @@
+import threading
+from functools import wraps
+from typing import Callable, Hashable, Optional
+
+import peewee
+from playhouse.pool import PooledPostgresqlExtDatabase
+
+from src.logger import get_logger
+
+
+logger = get_logger()
+CONNECTION_ERRORS = (peewee.OperationalError, peewee.InterfaceError)
+
+
+class _atomic(peewee._atomic):  # pylint: disable=protected-access
+    """
+    Thread safe version of peewee atomic
+
+    Peewee stores current transaction in the atomic instance itself,
+    so one decorated service can't be called from several threads at once.
+    Here transactions are stored per thread.
+
+    Outermost transactions are restarted if connection to the database was
+    lost before the wrapped function returned. Transaction hooks are
+    executed before commit of the outermost transaction. Hooks added in
+    a nested block are dropped if its savepoint is rolled back.
+    """
+
+    def __init__(self, db: 'ReconnectingPooledDatabase', *args, **kwargs) -> None:
+        super().__init__(db, *args, **kwargs)
+        self._local = threading.local()
+
+    def __call__(self, fn):
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            attempts = 0 if self.db.in_transaction() else self.db.reconnect_attempts
+            for attempt in range(attempts + 1):
+                completed = False
+                try:
+                    with self:
+                        result = fn(*args, **kwargs)
+                        completed = True
+                    return result
+                except CONNECTION_ERRORS:
+                    # never retry if commit failed, it may be already applied
+                    if completed or attempt == attempts or not self.db.connection_lost():
+                        raise
+                    self.db.reconnect()
+        return inner
+
+    def __enter__(self):
+        if self.db.transaction_depth() == 0:
+            args, kwargs = self._transaction_args
+            helper = self.db.transaction(*args, **kwargs)
+        elif isinstance(self.db.top_transaction(), peewee._manual):  # pylint: disable=protected-access
+            raise ValueError('Cannot enter atomic commit block while in manual commit mode.')
+        else:
+            helper = self.db.savepoint()
+
+        helpers = self._helpers()
+        helpers.append(helper)
+        try:
+            result = helper.__enter__()
+        except BaseException:
+            helpers.pop()
+            raise
+        hooks = self._hooks()
+        if isinstance(helper, peewee._transaction):  # pylint: disable=protected-access
+            # set only once the transaction began, so a failed begin leaves no hooks
+            self.db._local.hooks = [{}]  # pylint: disable=protected-access
+        elif hooks is not None:
+            hooks.append({})
+        return result
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        helper = self._helpers().pop()
+        # savepoints of nested blocks are not counted by transaction_depth
+        if not isinstance(helper, peewee._transaction):  # pylint: disable=protected-access
+            hooks = self._hooks()
+            if hooks is None:
+                return helper.__exit__(exc_type, exc_val, exc_tb)
+            nested = hooks.pop()
+            result = helper.__exit__(exc_type, exc_val, exc_tb)
+            # reached only if the savepoint was released
+            if exc_type is None:
+                _merge_hooks(hooks[-1], nested)
+            return result
+
+        hooks = self.db._local.__dict__.pop('hooks', [{}])[0]  # pylint: disable=protected-access
+        if exc_type is None:
+            try:
+                for hook in hooks.values():
+                    hook()
+            except BaseException as error:
+                helper.__exit__(type(error), error, error.__traceback__)
+                raise
+        return helper.__exit__(exc_type, exc_val, exc_tb)
+
+    def _helpers(self) -> list:
+        if not hasattr(self._local, 'helpers'):
+            self._local.helpers = []
+        return self._local.helpers
+
+    def _hooks(self) -> Optional[list[dict]]:
+        """Hooks of the outermost and every nested block of the thread"""
+        return getattr(self.db._local, 'hooks', None)  # pylint: disable=protected-access
+
+
+def _merge_hooks(hooks: dict, nested: dict) -> None:
+    for key, hook in nested.items():
+        if key in hooks:
+            hooks[key].merge(hook)
+        else:
+            hooks[key] = hook
+
+
+class ReconnectingPooledDatabase(PooledPostgresqlExtDatabase):
+    """
+    Pooled database that reconnects when connection is lost
+
+    Queries outside of transactions are simply repeated,
+    transactions are repeated by `atomic` from the beginning.
+    """
+
+    def __init__(self, database, *, reconnect_attempts: int = 1, **kwargs) -> None:
+        super().__init__(database, **kwargs)
+        self.reconnect_attempts = reconnect_attempts
+        self._local = threading.local()
+
+    def atomic(self, *args, **kwargs) -> _atomic:
+        return _atomic(self, *args, **kwargs)
+
+    def transaction_hooks(self) -> Optional[dict[Hashable, Callable[[], None]]]:
+        """
+        Callbacks executed before commit of the current outermost atomic block
+
+        Hooks are keyed, so callers can accumulate data for one transaction
+        and write it with a single statement. Hooks are dropped on rollback.
+        Nested blocks have their own hooks, they are dropped on rollback to
+        the savepoint and merged on its release: a hook already added under
+        the same key gets the nested one with `merge`.
+        Returns None outside of atomic block.
+        """
+        hooks = getattr(self._local, 'hooks', None)
+        return hooks[-1] if hooks else None
+
+    def execute_sql(self, sql, params=None, commit=peewee.SENTINEL):
+        attempts = 0 if self.in_transaction() else self.reconnect_attempts
+        for attempt in range(attempts + 1):
+            try:
+                return super().execute_sql(sql, params, commit)
+            except CONNECTION_ERRORS:
+                if attempt == attempts or not self.connection_lost():
+                    raise
+                self.reconnect()
+
+    def connection_lost(self) -> bool:
+        if self.is_closed():
+            return False
+        return bool(self._state.conn.closed)
+
+    def reconnect(self) -> None:
+        logger.warning('Connection to the database lost, reconnecting')
+        # broken connection should not return to the pool
+        self.manual_close()
+        self.connect()
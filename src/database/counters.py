@@ -0,0 +1,41 @@
+import operator
+from functools import reduce
+from typing import Any, Optional, TypeVar
+
+import peewee
+
+
+ModelT = TypeVar('ModelT', bound=peewee.Model)
+
+
+def increment(
+    model: type[ModelT],
+    key: dict[peewee.Field, Any],
+    amounts: dict[peewee.Field, int],
+    *,
+    floors: Optional[dict[peewee.Field, int]] = None,
+) -> Optional[ModelT]:
+    """
+    Add amounts to the counters of the row with a single statement
+
+    `key` should hold all primary key fields. Missing row is created,
+    its counters start from zero. When a counter would become less than
+    its floor, nothing is changed and None is returned.
+    Returns the updated row.
+    """
+    floors = floors or {}
+    fits = [field + amounts[field] >= floor for field, floor in floors.items()]
+    update = {field: field + amount for field, amount in amounts.items()}
+
+    if all(amounts[field] >= floor for field, floor in floors.items()):
+        query = model.insert({**key, **amounts}).on_conflict(
+            conflict_target=list(key),
+            update=update,
+            where=reduce(operator.and_, fits) if fits else None,
+        )
+    else:
+        # new row would be under the floor, so only existing one is updated
+        query = model.update(update).where(
+            reduce(operator.and_, [field == value for field, value in key.items()] + fits)
+        )
+    return next(iter(query.returning(model).execute()), None)
@@ -1,5 +1,6 @@
 import psycopg2
 from src.database.models import *
+from src.database.migrations import migrate
 from src.settings import DATABASE
 
 
@@ -9,8 +10,8 @@ tables = (UserRoles, Likes, Members,
           RelationshipsSettings, ModerationSettings, EconomySettings,
           ExperienceSettings, PersonalVoice, Users, Guilds,
           History, PremoderationSettings, PremoderationItem,
-          WelcomeSettings, ReminderSettings, Reminders, CreatedShopRoles, RolesInventory,
-          GameStatistics, Puzzles,
+          WelcomeSettings, ReminderSettings, Reminders, Timers, ScheduledJobs, StoredFiles, CreatedShopRoles, RolesInventory,
+          GameStatistics, Puzzles, VoiceSessions, BalanceLedger,
           VoiceRewardsSettings, GameChannelSettings, EventsSettings, 
           Pets, Gifts, UserPets, PetBattleSettings, AuctionPet, AuctionMail, FontainCounter)
 
@@ -32,10 +33,12 @@ def create_database() -> None:
 def recreate_tables() -> None:
     """drop & create tables in DB"""
     psql_db.drop_tables(tables)
-    psql_db.create_tables(tables)
+    psql_db.execute_sql('DROP TABLE IF EXISTS schema_version;')
+    migrate()
     psql_db.close()
 
 
-def create_tables() -> None:
-    psql_db.create_tables(tables)
+def migrate_tables() -> None:
+    """create tables and apply schema changes"""
+    migrate()
     psql_db.close()
\ No newline at end of file
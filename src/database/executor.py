@@ -0,0 +1,40 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, TypeVar
+
+from src.settings import DATABASE_WORKERS
+from src.database.models import psql_db
+from src.logger import get_logger
+
+
+T = TypeVar('T')
+logger = get_logger()
+_executor = ThreadPoolExecutor(
+    max_workers=DATABASE_WORKERS,
+    thread_name_prefix='database',
+)
+
+
+async def run_db(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """Run blocking database service in the database executor
+
+    Peewee keeps connection state per thread, so every worker uses its
+    own connection and `psql_db.atomic()` transactions stay isolated.
+    The connection is returned to the pool once the service is done.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor,
+        partial(_with_connection, func, *args, **kwargs),
+    )
+
+
+def _with_connection(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    with psql_db.connection_context():
+        return func(*args, **kwargs)
+
+
+def shutdown_db_executor() -> None:
+    logger.info('shutting down database executor')
+    _executor.shutdown(wait=True)
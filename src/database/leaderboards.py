@@ -0,0 +1,276 @@
+import threading
+from enum import Enum
+from typing import NamedTuple, Optional
+
+from src.settings import LEADERBOARD_CAPACITY
+from src.database.models import Members, psql_db
+from src.database.executor import run_db
+from src.logger import get_logger
+
+
+logger = get_logger()
+
+
+class Metric(str, Enum):
+    VOICE = 'voice'
+    BALANCE = 'balance'
+    EXPERIENCE = 'experience'
+    MONTHLY_ACTIVITY = 'monthly_activity'
+    MEOW = 'meow'
+    REPUTATION = 'reputation'
+    GAMES = 'games'
+
+
+MEMBER_METRICS = {
+    Metric.VOICE: 'voice_activity',
+    Metric.BALANCE: 'balance',
+    Metric.EXPERIENCE: 'experience',
+    Metric.MONTHLY_ACTIVITY: 'monthly_chat_activity',
+    Metric.MEOW: 'meow_count',
+}
+
+
+class LeaderboardEntry(NamedTuple):
+    user_id: int
+    score: int
+    # additional value shown in the top, money won for games
+    extra: int = 0
+
+
+class Leaderboard:
+    """
+    Bounded top of one guild by one metric
+
+    Every member missing from the board has score not greater than `floor`.
+    Entries below the floor can be outrun by unknown members, so the top
+    is exact only while enough entries stay above it. `floor` is None
+    when the board holds every member that has a score.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        entries: list[LeaderboardEntry],
+        floor: Optional[int] = None,
+    ) -> None:
+        self.capacity = capacity
+        self.floor = floor
+        self._entries = {entry.user_id: entry for entry in entries}
+
+    def update(self, entry: LeaderboardEntry) -> None:
+        if (entry.user_id not in self._entries and
+                self.floor is not None and
+                entry.score <= self.floor):
+            return
+        self._entries[entry.user_id] = entry
+        if len(self._entries) > self.capacity:
+            evicted = min(self._entries.values(), key=lambda item: item.score)
+            del self._entries[evicted.user_id]
+            self.floor = evicted.score if self.floor is None else max(self.floor, evicted.score)
+
+    def remove(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def top(self, size: int) -> Optional[list[LeaderboardEntry]]:
+        """Return best entries or None if the board can't tell them exactly"""
+        ranked = sorted(self._entries.values(), key=lambda item: item.score, reverse=True)
+        if self.floor is None:
+            return ranked[:size]
+        exact = [entry for entry in ranked[:size] if entry.score >= self.floor]
+        if len(exact) < size:
+            return None
+        return exact
+
+
+class Leaderboards:
+    """
+    In memory leaderboards of all guilds
+
+    Boards are loaded with a single query and then kept up to date by
+    services changing the counters. Updates are absolute values, so
+    updates made while boards are loading are replayed on top of them.
+    Missing and incomplete boards are loaded in the database executor
+    when their top is requested.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._boards: dict[tuple[int, Metric], Leaderboard] = {}
+        self._lock = threading.Lock()
+        self._loading = 0
+        self._replay: list[tuple[int, Metric, LeaderboardEntry]] = []
+
+    def load(self, guild_id: Optional[int] = None) -> None:
+        """Load boards of the guild or of all guilds from the database"""
+        with self._lock:
+            self._loading += 1
+        try:
+            boards = _select_boards(self.capacity, guild_id)
+        except Exception:
+            with self._lock:
+                self._finish_loading()
+            raise
+        with self._lock:
+            replay = self._finish_loading()
+            if guild_id is None:
+                self._boards = boards
+            else:
+                for metric in Metric:
+                    self._boards[(guild_id, metric)] = boards.get(
+                        (guild_id, metric),
+                        Leaderboard(self.capacity, []),
+                    )
+            for board_guild_id, metric, entry in replay:
+                if guild_id is None or board_guild_id == guild_id:
+                    self._board(board_guild_id, metric).update(entry)
+        logger.info('leaderboards loaded for guild %s', guild_id)
+
+    def update(
+        self,
+        guild_id: int,
+        user_id: int,
+        metric: Metric,
+        score: int,
+        extra: int = 0,
+    ) -> None:
+        """Set score of the member, member should be present on the guild"""
+        entry = LeaderboardEntry(user_id, score, extra)
+        with self._lock:
+            if self._loading:
+                self._replay.append((guild_id, metric, entry))
+            if (guild_id, metric) in self._boards:
+                self._boards[(guild_id, metric)].update(entry)
+
+    def update_member(self, member: Members, *metrics: Metric) -> None:
+        """Set scores from the members row, all member metrics by default"""
+        if not member.on_guild:
+            return
+        user_id, guild_id = member.get_id()
+        for metric in metrics or MEMBER_METRICS:
+            self.update(guild_id, user_id, metric, getattr(member, MEMBER_METRICS[metric]))
+
+    def reset(self, guild_id: int, metric: Metric) -> None:
+        """Metric was set to zero for every member of the guild, reload the board"""
+        with self._lock:
+            self._boards.pop((guild_id, metric), None)
+
+    def remove_member(self, guild_id: int, user_id: int) -> None:
+        with self._lock:
+            for metric in Metric:
+                board = self._boards.get((guild_id, metric))
+                if board is not None:
+                    board.remove(user_id)
+
+    def invalidate(self, guild_id: int) -> None:
+        """Reload guild boards on the next access"""
+        with self._lock:
+            for metric in Metric:
+                self._boards.pop((guild_id, metric), None)
+
+    async def top(self, guild_id: int, metric: Metric, size: int) -> list[LeaderboardEntry]:
+        with self._lock:
+            board = self._boards.get((guild_id, metric))
+            entries = board.top(size) if board is not None else None
+        if entries is not None:
+            return entries
+
+        logger.debug('leaderboard %s of guild %d is incomplete', metric, guild_id)
+        await run_db(self.load, guild_id)
+        with self._lock:
+            return self._board(guild_id, metric).top(size) or []
+
+    def _finish_loading(self) -> list[tuple[int, Metric, LeaderboardEntry]]:
+        self._loading -= 1
+        replay = self._replay
+        if not self._loading:
+            self._replay = []
+        return replay
+
+    def _board(self, guild_id: int, metric: Metric) -> Leaderboard:
+        key = (guild_id, metric)
+        if key not in self._boards:
+            self._boards[key] = Leaderboard(self.capacity, [])
+        return self._boards[key]
+
+
+def _select_boards(
+    capacity: int,
+    guild_id: Optional[int] = None,
+) -> dict[tuple[int, Metric], Leaderboard]:
+    rows = psql_db.execute_sql(*boards_query(capacity, guild_id)).fetchall()
+
+    entries: dict[tuple[int, Metric], list[LeaderboardEntry]] = {}
+    for metric, board_guild_id, user_id, score, extra in rows:
+        entries.setdefault((board_guild_id, Metric(metric)), []).append(
+            LeaderboardEntry(user_id, score, extra)
+        )
+    return {
+        key: Leaderboard(
+            capacity,
+            board_entries,
+            # full board may miss members, others hold everybody
+            floor=board_entries[-1].score if len(board_entries) >= capacity else None,
+        )
+        for key, board_entries in entries.items()
+    }
+
+
+def boards_query(capacity: int, guild_id: Optional[int] = None) -> tuple[str, dict]:
+    """
+    SQL and parameters selecting the best members of every board
+
+    Member and games boards are read from the top indexes of every guild
+    and stop after `capacity` rows. Reputation is summed for the whole guild.
+    """
+    member_metrics = '\n        UNION ALL\n'.join(
+        f"""
+        SELECT '{metric.value}', g.id, top.user_id, top.score, 0
+        FROM guilds g
+        CROSS JOIN LATERAL (
+            SELECT user_id, {field} score FROM members
+            WHERE guild_id = g.id AND on_guild
+            ORDER BY {field} DESC
+            LIMIT %(capacity)s
+        ) top
+        WHERE %(guild_id)s IS NULL OR g.id = %(guild_id)s
+        """
+        for metric, field in MEMBER_METRICS.items()
+    )
+    return f"""
+    WITH boards (metric, guild_id, user_id, score, extra) AS (
+        {member_metrics}
+        UNION ALL
+        SELECT '{Metric.REPUTATION.value}', guild_id, user_id, score, 0 FROM (
+            SELECT
+                l.guild_id, l.to_user_id user_id, SUM(l.type) score,
+                row_number() OVER(PARTITION BY l.guild_id ORDER BY SUM(l.type) DESC) position
+            FROM likes l
+            INNER JOIN members m ON
+                m.guild_id = l.guild_id AND
+                m.user_id = l.to_user_id AND
+                m.on_guild
+            WHERE %(guild_id)s IS NULL OR l.guild_id = %(guild_id)s
+            GROUP BY l.guild_id, l.to_user_id
+        ) reputation
+        WHERE position <= %(capacity)s
+        UNION ALL
+        SELECT '{Metric.GAMES.value}', g.id, top.user_id, top.wins, top.money_won
+        FROM guilds g
+        CROSS JOIN LATERAL (
+            SELECT s.user_id, s.wins, s.money_won FROM gamestatistics s
+            INNER JOIN members m ON
+                m.guild_id = s.guild_id AND
+                m.user_id = s.user_id AND
+                m.on_guild
+            WHERE s.guild_id = g.id
+            ORDER BY s.wins DESC
+            LIMIT %(capacity)s
+        ) top
+        WHERE %(guild_id)s IS NULL OR g.id = %(guild_id)s
+    )
+    SELECT metric, guild_id, user_id, score, extra FROM boards
+    ORDER BY metric, guild_id, score DESC;
+    """, {'guild_id': guild_id, 'capacity': capacity}
+
+
+leaderboards = Leaderboards(LEADERBOARD_CAPACITY)
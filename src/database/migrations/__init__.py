@@ -0,0 +1,140 @@
+"""
+Versioned database schema migrations
+
+Every migration is a module of this package named `m<version>_<name>`
+with `up()` function. Applied versions are stored in `schema_version`
+table, so starting the bot with an up to date schema costs one query.
+
+Migrations run in a transaction unless module sets `ATOMIC = False`.
+It's required for online operations like `CREATE INDEX CONCURRENTLY`,
+such migrations should be safe to run again after a failure.
+
+Fresh databases get current models from the first migration, so later
+migrations should tolerate already applied changes
+(`ADD COLUMN IF NOT EXISTS` and so on).
+"""
+import importlib
+import pkgutil
+from dataclasses import dataclass
+from types import ModuleType
+
+import peewee
+
+from src.database.models import psql_db
+from src.logger import get_logger
+
+
+logger = get_logger()
+# any constant, used to not apply migrations from two processes at once
+MIGRATIONS_LOCK_ID = 5_281_001
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    module: ModuleType
+
+    @property
+    def atomic(self) -> bool:
+        return getattr(self.module, 'ATOMIC', True)
+
+
+def get_migrations() -> list[Migration]:
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        prefix, _, name = module_info.name.partition('_')
+        if not prefix.startswith('m') or not prefix[1:].isdigit():
+            continue
+        module = importlib.import_module(f'{__name__}.{module_info.name}')
+        migrations.append(Migration(int(prefix[1:]), name, module))
+    migrations.sort(key=lambda migration: migration.version)
+    return migrations
+
+
+def get_schema_version() -> int:
+    """Return last applied version, 0 for a database without migrations"""
+    try:
+        version = psql_db.execute_sql(
+            'SELECT MAX(version) FROM schema_version;',
+            commit=True,
+        ).fetchone()[0]
+    except peewee.ProgrammingError:
+        psql_db.rollback()
+        return 0
+    return version or 0
+
+
+def migrate() -> None:
+    """Apply all not applied migrations"""
+    migrations = get_migrations()
+    if get_schema_version() >= migrations[-1].version:
+        return
+
+    psql_db.execute_sql('SELECT pg_advisory_lock(%s);', (MIGRATIONS_LOCK_ID,), commit=True)
+    try:
+        psql_db.execute_sql("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                applied_at TIMESTAMP NOT NULL DEFAULT now()
+            );
+        """, commit=True)
+        # another process could apply some migrations while we waited for the lock
+        version = get_schema_version()
+        for migration in migrations:
+            if migration.version > version:
+                _apply(migration)
+    finally:
+        psql_db.execute_sql('SELECT pg_advisory_unlock(%s);', (MIGRATIONS_LOCK_ID,), commit=True)
+
+
+def _apply(migration: Migration) -> None:
+    logger.info('applying migration %d %s', migration.version, migration.name)
+    if migration.atomic:
+        with psql_db.atomic():
+            migration.module.up()
+            _save_version(migration)
+    else:
+        migration.module.up()
+        _save_version(migration)
+
+
+def _save_version(migration: Migration) -> None:
+    psql_db.execute_sql(
+        'INSERT INTO schema_version (version, name) VALUES (%s, %s);',
+        (migration.version, migration.name),
+    )
+
+
+def execute_outside_transaction(sql: str, params=None) -> None:
+    """Execute statement which can't run inside a transaction block"""
+    if psql_db.in_transaction():
+        raise ValueError('Statement can not be executed in atomic migration')
+    connection = psql_db.connection()
+    # finish transaction opened implicitly by previous queries
+    connection.commit()
+    connection.autocommit = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+    finally:
+        connection.autocommit = False
+
+
+def create_index_concurrently(name: str, definition: str) -> None:
+    """
+    Build index without locking writes to the table
+
+    Failed concurrent build leaves an invalid index, it's dropped
+    and built again.
+    """
+    invalid = psql_db.execute_sql("""
+        SELECT 1 FROM pg_index
+        INNER JOIN pg_class ON pg_class.oid = pg_index.indexrelid
+        WHERE pg_class.relname = %s AND NOT pg_index.indisvalid;
+    """, (name,), commit=True).fetchone()
+    if invalid:
+        logger.warning('dropping invalid index %s', name)
+        execute_outside_transaction(f'DROP INDEX CONCURRENTLY IF EXISTS {name};')
+    execute_outside_transaction(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition};')
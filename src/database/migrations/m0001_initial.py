@@ -0,0 +1,29 @@
+"""Tables of the models, existing tables are kept as is"""
+from src.database.models import (UserRoles, Likes, Members,
+                                 Relationships, RelationshipParticipant,
+                                 ShopRoles, Suggestions, Codes, SuggestionSettings,
+                                 RelationshipsSettings, ModerationSettings, EconomySettings,
+                                 ExperienceSettings, PersonalVoice, Users, Guilds,
+                                 History, PremoderationSettings, PremoderationItem,
+                                 WelcomeSettings, ReminderSettings, Reminders,
+                                 CreatedShopRoles, RolesInventory, GameStatistics, Puzzles,
+                                 VoiceRewardsSettings, GameChannelSettings, EventsSettings,
+                                 Pets, Gifts, UserPets, PetBattleSettings, AuctionPet,
+                                 AuctionMail, FontainCounter, psql_db)
+
+
+# tables existing before migrations, later tables are created by their migrations
+TABLES = (UserRoles, Likes, Members,
+          Relationships, RelationshipParticipant,
+          ShopRoles, Suggestions, Codes, SuggestionSettings,
+          RelationshipsSettings, ModerationSettings, EconomySettings,
+          ExperienceSettings, PersonalVoice, Users, Guilds,
+          History, PremoderationSettings, PremoderationItem,
+          WelcomeSettings, ReminderSettings, Reminders, CreatedShopRoles, RolesInventory,
+          GameStatistics, Puzzles,
+          VoiceRewardsSettings, GameChannelSettings, EventsSettings,
+          Pets, Gifts, UserPets, PetBattleSettings, AuctionPet, AuctionMail, FontainCounter)
+
+
+def up() -> None:
+    psql_db.create_tables(TABLES)
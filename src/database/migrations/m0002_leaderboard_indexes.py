@@ -0,0 +1,33 @@
+"""Partial and covering indexes used to load leaderboards"""
+from src.database.migrations import create_index_concurrently
+
+
+ATOMIC = False
+
+MEMBER_METRICS = {
+    'voice': 'voice_activity',
+    'balance': 'balance',
+    'experience': 'experience',
+    'monthly_activity': 'monthly_chat_activity',
+    'meow': 'meow_count',
+}
+
+
+def up() -> None:
+    # members present on the guild ranked by the metric,
+    # user ID is included so ranking is answered by index only scans
+    for metric, field in MEMBER_METRICS.items():
+        create_index_concurrently(
+            f'members_{metric}_top_idx',
+            f'ON members (guild_id, {field} DESC) INCLUDE (user_id) WHERE on_guild',
+        )
+    # reputation of the member and reputation top
+    create_index_concurrently(
+        'likes_guild_to_user_idx',
+        'ON likes (guild_id, to_user_id) INCLUDE (type)',
+    )
+    # games top
+    create_index_concurrently(
+        'gamestatistics_wins_top_idx',
+        'ON gamestatistics (guild_id, wins DESC) INCLUDE (user_id, money_won)',
+    )
@@ -0,0 +1,6 @@
+"""Checkpoints of voice activity sessions"""
+from src.database.models import VoiceSessions, psql_db
+
+
+def up() -> None:
+    psql_db.create_tables([VoiceSessions])
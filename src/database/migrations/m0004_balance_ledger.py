@@ -0,0 +1,15 @@
+"""Journal of balance changes"""
+from src.database.models import BalanceLedger, psql_db
+from src.database.migrations import create_index_concurrently
+
+
+ATOMIC = False
+
+
+def up() -> None:
+    psql_db.create_tables([BalanceLedger])
+    # statement of the member, newest entries first
+    create_index_concurrently(
+        'balanceledger_member_idx',
+        'ON balanceledger (guild_id, user_id, id DESC)',
+    )
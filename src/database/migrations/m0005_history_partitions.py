@@ -0,0 +1,63 @@
+"""Monthly range partitions of history by creation time"""
+import datetime
+
+from src.database.models import psql_db
+
+
+def up() -> None:
+    partitioned = psql_db.execute_sql("""
+        SELECT 1 FROM pg_partitioned_table
+        INNER JOIN pg_class ON pg_class.oid = pg_partitioned_table.partrelid
+        WHERE pg_class.relname = 'history';
+    """).fetchone()
+    if partitioned:
+        return
+
+    # names of the constraint and indexes are taken by the new table,
+    # sequence is kept to continue IDs
+    psql_db.execute_sql("""
+        ALTER TABLE history RENAME TO history_legacy;
+        ALTER TABLE history_legacy RENAME CONSTRAINT history_pkey TO history_legacy_pkey;
+        DROP INDEX IF EXISTS history_guild_id, history_user_id;
+        ALTER SEQUENCE history_id_seq OWNED BY NONE;
+
+        CREATE TABLE history (
+            id INTEGER NOT NULL DEFAULT nextval('history_id_seq'),
+            guild_id BIGINT NOT NULL REFERENCES guilds (id) ON DELETE CASCADE,
+            user_id BIGINT NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            creation_time TIMESTAMP NOT NULL,
+            action_name VARCHAR(255) NOT NULL,
+            description VARCHAR(65535) NOT NULL,
+            PRIMARY KEY (id, creation_time)
+        ) PARTITION BY RANGE (creation_time);
+        ALTER SEQUENCE history_id_seq OWNED BY history.id;
+    """)
+
+    first_month = psql_db.execute_sql(
+        "SELECT date_trunc('month', MIN(creation_time))::date FROM history_legacy;"
+    ).fetchone()[0]
+    today = datetime.date.today()
+    month = first_month or today.replace(day=1)
+    # partitions of following months are created by the history cog
+    last_month = _next_month(today.replace(day=1))
+    while month <= last_month:
+        next_month = _next_month(month)
+        psql_db.execute_sql(
+            f'CREATE TABLE history_y{month.year}m{month.month:02} PARTITION OF history '
+            'FOR VALUES FROM (%s) TO (%s);',
+            (month, next_month),
+        )
+        month = next_month
+
+    psql_db.execute_sql("""
+        INSERT INTO history (id, guild_id, user_id, creation_time, action_name, description)
+        SELECT id, guild_id, user_id, creation_time, action_name, description
+        FROM history_legacy;
+        DROP TABLE history_legacy;
+        CREATE INDEX history_guild_idx ON history (guild_id, id DESC);
+        CREATE INDEX history_user_id ON history (user_id);
+    """)
+
+
+def _next_month(month: datetime.date) -> datetime.date:
+    return (month + datetime.timedelta(days=32)).replace(day=1)
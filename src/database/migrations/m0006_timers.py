@@ -0,0 +1,18 @@
+"""Timers of the timer service, pending up reminders are moved to them"""
+from src.database.models import Timers, psql_db
+
+
+def up() -> None:
+    psql_db.create_tables([Timers])
+    psql_db.execute_sql("""
+        INSERT INTO timers (key, kind, due_at, payload)
+        SELECT DISTINCT ON (guild_id, monitoring_bot_id)
+            'up_reminder:' || guild_id || ':' || monitoring_bot_id,
+            'up_reminder',
+            send_time,
+            json_build_object('guild_id', guild_id, 'monitoring_bot_id', monitoring_bot_id)
+        FROM reminders
+        WHERE send_time > now()
+        ORDER BY guild_id, monitoring_bot_id, send_time DESC
+        ON CONFLICT DO NOTHING;
+    """)
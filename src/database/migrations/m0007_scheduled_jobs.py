@@ -0,0 +1,6 @@
+"""Last runs of the scheduled jobs"""
+from src.database.models import ScheduledJobs, psql_db
+
+
+def up() -> None:
+    psql_db.create_tables([ScheduledJobs])
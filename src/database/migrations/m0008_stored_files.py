@@ -0,0 +1,6 @@
+"""URLs of files kept in the image channels"""
+from src.database.models import StoredFiles, psql_db
+
+
+def up() -> None:
+    psql_db.create_tables([StoredFiles])
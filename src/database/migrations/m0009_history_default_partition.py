@@ -0,0 +1,8 @@
+"""Default partition of history for rows of months without a partition"""
+from src.database.models import psql_db
+
+
+def up() -> None:
+    # inserts don't fail if partitions maintenance is late,
+    # rows are moved to monthly partitions once they are created
+    psql_db.execute_sql('CREATE TABLE IF NOT EXISTS history_default PARTITION OF history DEFAULT;')
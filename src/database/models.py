@@ -6,18 +6,23 @@ from dataclasses import dataclass
 from typing import Optional, Sequence, TypedDict
 from peewee import (Model, BigAutoField,
                     ForeignKeyField, CharField, SQL, BooleanField)
-from playhouse.postgres_ext import (PostgresqlExtDatabase, BigIntegerField,
+from playhouse.postgres_ext import (BigIntegerField,
                                     IntegerField, AutoField, ArrayField,
                                     JSONField, TextField, CompositeKey,
                                     DateTimeField, DateTimeTZField, FloatField)
 
-from src.settings import DATABASE
+from src.settings import (DATABASE, DATABASE_MAX_CONNECTIONS,
+                          DATABASE_STALE_TIMEOUT, DATABASE_RECONNECT_ATTEMPTS)
+from src.database.connection import ReconnectingPooledDatabase
 
-psql_db = PostgresqlExtDatabase(DATABASE['dbname'],
-                                host=DATABASE['host'],
-                                port=DATABASE['port'],
-                                user=DATABASE['user'],
-                                password=DATABASE['password'])
+psql_db = ReconnectingPooledDatabase(DATABASE['dbname'],
+                                     host=DATABASE['host'],
+                                     port=DATABASE['port'],
+                                     user=DATABASE['user'],
+                                     password=DATABASE['password'],
+                                     max_connections=DATABASE_MAX_CONNECTIONS,
+                                     stale_timeout=DATABASE_STALE_TIMEOUT,
+                                     reconnect_attempts=DATABASE_RECONNECT_ATTEMPTS)
 
 
 @dataclass
@@ -521,6 +526,9 @@ class History(BaseModel):
     Model for storing actions like balance changes,
     moderation actions, etc.
 
+    Table is partitioned by months of `creation_time`,
+    primary key of the table is `(id, creation_time)`.
+
     id: :class:`int`
         Action ID.
     guild_id: :class:`int`
@@ -542,6 +550,37 @@ class History(BaseModel):
     description: str = CharField(max_length=65535)
 
 
+class BalanceLedger(BaseModel):
+    """
+    Append-only journal of members balance changes
+
+    id: :class:`int`
+        Entry ID, grows with time.
+    guild: :class:`Guilds`
+        Guild.
+    user: :class:`Users`
+        Member whose balance changed.
+    amount: :class:`int`
+        Change of the balance, negative for spendings.
+    currency: :class:`str`
+        `coin` or `crystal`.
+    source: :class:`str`
+        Module which changed the balance.
+    counterparty_id: Optional[:class:`int`]
+        Another member of the transfer.
+    creation_time: :class:`datetime.datetime`
+        When balance changed.
+    """
+    id: int = BigAutoField(primary_key=True)
+    guild: Guilds = ForeignKeyField(Guilds, on_delete='CASCADE')
+    user: Users = ForeignKeyField(Users, on_delete='CASCADE')
+    amount: int = BigIntegerField()
+    currency: str = CharField(max_length=16)
+    source: str = CharField()
+    counterparty_id: Optional[int] = BigIntegerField(null=True)
+    creation_time: datetime.datetime = DateTimeField(default=datetime.datetime.now)
+
+
 class PremoderationItem(BaseModel):
     """
     Model for guild's suggestions
@@ -682,6 +721,60 @@ class Reminders(BaseModel):
     send_time: datetime.datetime = DateTimeTZField()
 
 
+class Timers(BaseModel):
+    """
+    Pending deadlines served by the timer service
+
+    Attributes
+    ----------
+    key: :class:`str`
+        Unique key of the timer, usually kind and IDs of the entity.
+    kind: :class:`str`
+        Name of the handler called when the timer is due.
+    due_at: :class:`datetime`
+        When the timer is due.
+    payload: :class:`dict`
+        Data passed to the handler.
+    """
+    key: str = CharField(primary_key=True)
+    kind: str = CharField()
+    due_at: datetime.datetime = DateTimeTZField()
+    payload: dict = JSONField(default=dict)
+
+
+class ScheduledJobs(BaseModel):
+    """
+    Last runs of the scheduled jobs
+
+    Attributes
+    ----------
+    name: :class:`str`
+        Name of the job.
+    last_run_at: :class:`datetime`
+        When the job was run last time.
+    """
+    name: str = CharField(primary_key=True)
+    last_run_at: datetime.datetime = DateTimeTZField()
+
+
+class StoredFiles(BaseModel):
+    """
+    Files already kept in the image channels
+
+    Attributes
+    ----------
+    key: :class:`str`
+        Key of the content, asset key or hash of the file.
+    url: :class:`str`
+        URL of the stored file.
+    stored_at: :class:`datetime`
+        When the file was stored.
+    """
+    key: str = CharField(primary_key=True)
+    url: str = TextField()
+    stored_at: datetime.datetime = DateTimeTZField()
+
+
 class GameStatistics(BaseModel):
     """
     Current active reminders
@@ -706,6 +799,27 @@ class GameStatistics(BaseModel):
         primary_key = CompositeKey('guild', 'user')
 
 
+class VoiceSessions(BaseModel):
+    """
+    Voice activity of members currently counted in voice channels
+
+    Attributes
+    ----------
+    guild: :class:`Guilds`
+        Guild.
+    user: :class:`Users`
+        User.
+    credited_until: :class:`datetime.datetime`
+        Voice time before this moment is already added to the member.
+    """
+    guild: Guilds = ForeignKeyField(Guilds, on_delete='CASCADE')
+    user: Users = ForeignKeyField(Users, on_delete='CASCADE')
+    credited_until: datetime.datetime = DateTimeField()
+
+    class Meta:
+        primary_key = CompositeKey('guild', 'user')
+
+
 class GameChannelSettings(BaseModel):
     """
     Model for storing game channel settings
@@ -958,6 +1072,3 @@ class Codes(BaseModel):
     name: str = CharField(max_length=50, primary_key=True)  # TODO that doesn't work
     code: str = CharField(max_length=65535)
     group: Optional[int] = IntegerField(null=True)
-
-
-psql_db.connect()
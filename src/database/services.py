@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Sequence
 from functools import wraps
 
 import peewee
@@ -17,22 +17,54 @@ def get_guild_data(guild_id: int) -> Guilds:
     return guild_data
 
 
-def get_guild_prefixes(guild_id: int) -> Optional[list[str]]:
-    guild_data = get_guild_data(guild_id)
-    return guild_data.prefixes  # type: ignore
+def get_all_guild_prefixes() -> dict[int, list[str]]:
+    query = Guilds.select(Guilds.id, Guilds.prefixes).where(
+        Guilds.prefixes.is_null(False)  # type: ignore
+    )
+    return {guild.id: guild.prefixes for guild in query}  # type: ignore
+
+
+# (model, pk) pairs known to exist, so parent rows are inserted once per process
+_provisioned: set[tuple[type[peewee.Model], int]] = set()
+
+
+def provide_related(models: Sequence[type[peewee.Model]], ids: Sequence[int]) -> None:
+    """Insert missing parent rows with a single statement"""
+    missing: dict[type[peewee.Model], list[int]] = {}
+    for model, id_ in zip(models, ids):
+        if (model, id_) not in _provisioned and id_ not in missing.get(model, []):
+            missing.setdefault(model, []).append(id_)
+    if not missing:
+        return
+
+    ctes = []
+    params = []
+    for index, (model, model_ids) in enumerate(missing.items()):
+        meta = model._meta  # pylint: disable=protected-access
+        values = ', '.join(['(%s)'] * len(model_ids))
+        ctes.append(
+            f'p{index} AS (INSERT INTO "{meta.table_name}" ("{meta.primary_key.column_name}") '
+            f'VALUES {values} ON CONFLICT DO NOTHING)'
+        )
+        params.extend(model_ids)
+    psql_db.execute_sql(f'WITH {", ".join(ctes)} SELECT 1', params)
+    _provisioned.update(
+        (model, id_) for model, model_ids in missing.items() for id_ in model_ids
+    )
 
 
 def create_related(*models: type[peewee.Model]):
     def wrapper(func):
         @wraps(func)
         def wrapped(*args, **kwargs):
+            provide_related(models, args)
             try:
                 return func(*args, **kwargs)
             except peewee.IntegrityError:
+                # row may be deleted after it was provided, forget and try again
                 for id_, model in zip(args, models):
-                    _, created = model.get_or_create(id=id_)
-                    if created:
-                        logger.info('%s with pk %d created', model, id_)
+                    _provisioned.discard((model, id_))
+                provide_related(models, args)
                 return func(*args, **kwargs)
         return wrapped
     return wrapper
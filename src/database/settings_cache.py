@@ -0,0 +1,87 @@
+import threading
+from functools import wraps
+from time import monotonic
+from typing import Any, Callable, Hashable, NamedTuple, Optional, TypeVar
+
+import peewee
+
+from src.settings import SETTINGS_CACHE_TTL
+from src.logger import get_logger
+
+
+T = TypeVar('T')
+logger = get_logger()
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    size: int
+
+
+class SettingsCache:
+    """
+    TTL cache for guild settings models
+
+    Entries are grouped by model and keyed by the arguments of the
+    settings getter, guild ID always goes first.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._entries: dict[type[peewee.Model], dict[Hashable, tuple[float, Any]]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def cached(self, model: type[peewee.Model]) -> Callable[[Callable[..., T]], Callable[..., T]]:
+        def wrapper(func: Callable[..., T]) -> Callable[..., T]:
+            @wraps(func)
+            def wrapped(*args, **kwargs) -> T:
+                key = args + tuple(sorted(kwargs.items()))
+                value = self._get(model, key)
+                if value is not None:
+                    return value
+                value = func(*args, **kwargs)
+                self._set(model, key, value)
+                return value
+            return wrapped
+        return wrapper
+
+    def invalidate(self, model: type[peewee.Model], guild_id: Optional[int] = None) -> None:
+        """Drop cached settings of the model for the guild or for all guilds"""
+        with self._lock:
+            entries = self._entries.get(model)
+            if not entries:
+                return
+            if guild_id is None:
+                entries.clear()
+                return
+            for key in [key for key in entries if key[0] == guild_id]:  # type: ignore
+                del entries[key]
+        logger.debug('%s settings cache invalidated for guild %s', model.__name__, guild_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            size = sum(len(entries) for entries in self._entries.values())
+            return CacheInfo(self._hits, self._misses, size)
+
+    def _get(self, model: type[peewee.Model], key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(model, {}).get(key)
+            if entry is None or entry[0] < monotonic():
+                self._misses += 1
+                return None
+            self._hits += 1
+            return entry[1]
+
+    def _set(self, model: type[peewee.Model], key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries.setdefault(model, {})[key] = (monotonic() + self.ttl, value)
+
+
+settings_cache = SettingsCache(SETTINGS_CACHE_TTL)
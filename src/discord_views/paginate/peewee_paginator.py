@@ -1,4 +1,5 @@
 import math
+from time import monotonic
 from typing import Optional, Union, TypeVar, Generic, Sequence
 from functools import reduce
 from operator import and_
@@ -6,6 +7,7 @@ from operator import and_
 import disnake
 import peewee
 
+from src.settings import PAGINATOR_COUNT_TTL
 from src.discord_views.paginate.paginators import Paginator, PaginationItem
 
 
@@ -16,6 +18,16 @@ Order = Optional[
 
 
 class PeeweePaginator(Generic[T], Paginator):
+    """
+    Paginator over rows selected from the database
+
+    With `keyset` pages are selected by the order key of a neighbour page
+    instead of offset, so deep pages cost as much as the first one.
+    Order should be a single unique field then. Neighbour pages are fetched
+    by the same query, and the total count is cached for
+    `PAGINATOR_COUNT_TTL` seconds, call `invalidate` after changing the rows.
+    """
+
     def __init__(
         self,
         model: type[T],
@@ -24,12 +36,19 @@ class PeeweePaginator(Generic[T], Paginator):
         items_per_page: int = 10,
         order_by: Order = None,
         filters: Optional[dict[str, peewee.Expression]] = None,
+        keyset: bool = False,
     ) -> None:
         self._model = model
         self.filters = filters if filters else {}
         self.order_by = order_by
         self.items_per_page = items_per_page
         self.items: Sequence[T] = []
+        self.keyset = keyset
+        if keyset:
+            self._key_field, self._key_descending = _parse_key(order_by)
+        self._pages: dict[int, list[T]] = {}
+        self._count: Optional[int] = None
+        self._counted_at = 0.0
         super().__init__(timeout=timeout)
 
     async def resolve_interaction(
@@ -42,14 +61,90 @@ class PeeweePaginator(Generic[T], Paginator):
         return not self.items
 
     def update(self) -> None:
+        if self.keyset:
+            self._update_keyset()
+        else:
+            self._max_page = self._count_max_page()
+            self._page = self._check_page_range(self._page)
+            query = self._build_query()
+            self.items = list(query.paginate(
+                self.page,  # type: ignore
+                self.items_per_page,
+            ))
+        super().update()
+
+    def invalidate(self) -> None:
+        """Forget cached pages and count"""
+        self._pages = {}
+        self._count = None
+
+    def _update_keyset(self, retry: bool = True) -> None:
         self._max_page = self._count_max_page()
         self._page = self._check_page_range(self._page)
+        if self._page not in self._pages:
+            self._fetch_pages(self._page)
+        items = self._pages.get(self._page, [])
+        if not items and self._page > 1 and retry:
+            # rows were removed since they were counted
+            self.invalidate()
+            return self._update_keyset(retry=False)
+
+        self.items = items
+        self._pages = {
+            page: page_items for page, page_items in self._pages.items()
+            if abs(page - self._page) <= 1
+        }
+        return None
+
+    def _fetch_pages(self, page: int) -> None:
+        """Select the page and one of its neighbours with a single query"""
+        size = self.items_per_page
         query = self._build_query()
-        self.items = list(query.paginate(
-            self.page,  # type: ignore
-            self.items_per_page,
-        ))
-        super().update()
+        field = self._key_field
+        if page - 1 in self._pages:
+            last_key = self._pages[page - 1][-1].__data__[field.name]
+            rows = list(query.where(self._after(last_key)).limit(size * 2))
+            self._store(page, rows)
+        elif page + 1 in self._pages:
+            first_key = self._pages[page + 1][0].__data__[field.name]
+            rows = list(query.where(self._before(first_key)).order_by(
+                self._reversed_order()
+            ).limit(size * 2))
+            self._store_reversed(page, rows)
+        elif page == 1:
+            self._store(page, list(query.limit(size * 2)))
+        elif page == self._max_page:
+            last_page_size = (self._count or 0) - (page - 1) * size
+            rows = list(query.order_by(self._reversed_order()).limit(last_page_size + size))
+            self._store_reversed(page, rows, last_page_size)
+        else:
+            # jump to a far page, following pages are found by its keys
+            self._store(page, list(query.offset((page - 1) * size).limit(size * 2)))
+
+    def _store(self, page: int, rows: list[T]) -> None:
+        size = self.items_per_page
+        self._pages[page] = rows[:size]
+        if len(rows) > size:
+            self._pages[page + 1] = rows[size:]
+
+    def _store_reversed(self, page: int, rows: list[T], page_size: Optional[int] = None) -> None:
+        """Store rows selected in reversed order, ending with the page"""
+        page_size = page_size or self.items_per_page
+        rows.reverse()
+        self._pages[page] = rows[-page_size:]
+        previous = rows[:-page_size]
+        # partial page before the found one means pages were shifted
+        if page > 1 and len(previous) == self.items_per_page:
+            self._pages[page - 1] = previous
+
+    def _after(self, key) -> peewee.Expression:
+        return self._key_field < key if self._key_descending else self._key_field > key
+
+    def _before(self, key) -> peewee.Expression:
+        return self._key_field > key if self._key_descending else self._key_field < key
+
+    def _reversed_order(self) -> peewee.Ordering:
+        return self._key_field.asc() if self._key_descending else self._key_field.desc()
 
     def _build_query(self) -> peewee.ModelSelect:
         query = self._model.select()
@@ -64,8 +159,27 @@ class PeeweePaginator(Generic[T], Paginator):
         return query
 
     def _count_max_page(self) -> int:
-        query = self._build_query()
-        return math.ceil(query.count() / self.items_per_page) or 1  # type: ignore
+        if self.keyset:
+            if self._count is None or monotonic() - self._counted_at > PAGINATOR_COUNT_TTL:
+                self._count = self._build_query().order_by().count()
+                self._counted_at = monotonic()
+            count = self._count
+        else:
+            count = self._build_query().count()
+        return math.ceil(count / self.items_per_page) or 1  # type: ignore
+
+
+def _parse_key(order: Order) -> tuple[peewee.Field, bool]:
+    """Return order key field of keyset pagination and whether it's descending"""
+    if isinstance(order, Sequence):
+        if len(order) != 1:
+            raise ValueError('Keyset pagination needs exactly one order field')
+        order = order[0]
+    if isinstance(order, peewee.Ordering):
+        return order.node, order.direction.upper() == 'DESC'  # type: ignore
+    if isinstance(order, peewee.Field):
+        return order, False
+    raise ValueError('Keyset pagination needs order by a field')
 
 
 class PeeweeItemSelect(disnake.ui.Select, PaginationItem, Generic[T]):
@@ -0,0 +1,120 @@
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from src.logger import get_logger
+from src.database.services import get_member
+from src.database.executor import run_db
+from src.ext.activity.services import add_text_activity
+
+
+logger = get_logger()
+MemberKey = tuple[int, int]
+
+
+@dataclass
+class ActivityDelta:
+    experience: int = 0
+    monthly_chat_activity: int = 0
+    meow_count: int = 0
+
+
+class TextActivityBuffer:
+    """
+    Accumulate text activity in memory and write it in batches
+
+    Experience of recently active members is cached, so level up
+    can be detected without waiting for the next flush. Least recently
+    active members are evicted when the cache is full.
+    """
+
+    def __init__(self, max_pending: int, cache_size: int) -> None:
+        self.max_pending = max_pending
+        self.cache_size = cache_size
+        self._pending: dict[MemberKey, ActivityDelta] = {}
+        self._experience: OrderedDict[MemberKey, int] = OrderedDict()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def add_experience(self, guild_id: int, user_id: int, amount: int) -> tuple[int, int]:
+        """Add experience and return member experience before and after"""
+        key = (guild_id, user_id)
+        previous = await self._get_experience(key)
+        current = previous + amount
+        self._experience[key] = current
+
+        delta = self._delta(key)
+        delta.experience += amount
+        delta.monthly_chat_activity += amount
+        self._flush_if_full()
+        return previous, current
+
+    async def add_meow(self, guild_id: int, user_id: int, amount: int) -> None:
+        key = (guild_id, user_id)
+        await self._get_experience(key)
+        self._delta(key).meow_count += amount
+        self._flush_if_full()
+
+    async def flush(self) -> None:
+        deltas = self._take_pending()
+        if not deltas:
+            return
+        try:
+            await run_db(add_text_activity, deltas)
+        except Exception:
+            self._restore(deltas)
+            raise
+        logger.debug('text activity flushed for %d members', len(deltas))
+
+    def flush_sync(self) -> None:
+        """Flush in the current thread, used when event loop is stopping"""
+        deltas = self._take_pending()
+        if deltas:
+            add_text_activity(deltas)
+
+    async def _get_experience(self, key: MemberKey) -> int:
+        if key not in self._experience:
+            # also creates member, so batched update always finds the row
+            member = await run_db(get_member, *key)
+            if key not in self._experience:
+                pending = self._pending.get(key)
+                self._experience[key] = member.experience + (pending.experience if pending else 0)
+        self._experience.move_to_end(key)
+        if len(self._experience) > self.cache_size:
+            self._experience.popitem(last=False)
+        return self._experience[key]
+
+    def _delta(self, key: MemberKey) -> ActivityDelta:
+        if key not in self._pending:
+            self._pending[key] = ActivityDelta()
+        return self._pending[key]
+
+    def _flush_if_full(self) -> None:
+        if len(self._pending) >= self.max_pending and (
+            self._flush_task is None or self._flush_task.done()
+        ):
+            self._flush_task = asyncio.create_task(self._safe_flush())
+
+    async def _safe_flush(self) -> None:
+        try:
+            await self.flush()
+        except Exception as error:  # pylint: disable=broad-except
+            logger.error('text activity flush failed: %s', repr(error))
+
+    def _take_pending(self) -> list[tuple[int, int, int, int, int]]:
+        pending = self._pending
+        self._pending = {}
+        return [
+            (guild_id, user_id, delta.experience, delta.monthly_chat_activity, delta.meow_count)
+            for (guild_id, user_id), delta in pending.items()
+        ]
+
+    def _restore(self, deltas: list[tuple[int, int, int, int, int]]) -> None:
+        for guild_id, user_id, experience, monthly_chat_activity, meow_count in deltas:
+            delta = self._delta((guild_id, user_id))
+            delta.experience += experience
+            delta.monthly_chat_activity += monthly_chat_activity
+            delta.meow_count += meow_count
@@ -2,8 +2,9 @@ from typing import Optional
 
 import disnake
 from src.logger import get_logger
-from src.database.models import ExperienceSettings, Members
-from src.ext.economy.services import get_economy_settings
+from src.database.models import ExperienceSettings
+from src.ext.economy.services import get_economy_settings, change_balance
+from src.database.executor import run_db
 
 
 logger = get_logger()
@@ -11,13 +12,12 @@ logger = get_logger()
 
 async def coin_rewarder(
     member: disnake.Member,
-    member_data: Members,
     settings: ExperienceSettings,
     lvl: int,
 ) -> Optional[str]:
     award_amount = settings.coins_per_level_up * lvl + 100
-    member_data.balance += award_amount
-    economy_settings = get_economy_settings(member.guild.id)
+    await run_db(change_balance, member.guild.id, member.id, award_amount)
+    economy_settings = await run_db(get_economy_settings, member.guild.id)
 
     logger.info(
         "give %d money to member %s on guild %s (lvl|reward)",
@@ -4,7 +4,7 @@ import asyncio
 import disnake
 
 from src.logger import get_logger
-from src.database.models import ExperienceSettings, Members
+from src.database.models import ExperienceSettings
 from src.translation import get_translator
 
 
@@ -49,7 +49,6 @@ async def add_new_role(
 
 async def role_rewarder(
     member: disnake.Member,
-    _: Members,
     settings: ExperienceSettings,
     lvl: int,
 ) -> Optional[str]:
@@ -1,8 +1,17 @@
-from src.database.models import psql_db, Guilds, ExperienceSettings, VoiceRewardsSettings
-from src.database.services import create_related, get_member
+import datetime
+
+from peewee import EXCLUDED, Tuple
+
+from src.database.models import (psql_db, Guilds, Users, ExperienceSettings,
+                                 VoiceRewardsSettings, VoiceSessions)
+from src.database.services import create_related, provide_related
+from src.database.counters import increment
 from src.database.models import Members
+from src.database.settings_cache import settings_cache
+from src.database.leaderboards import leaderboards, Metric
 
 
+@settings_cache.cached(ExperienceSettings)
 @create_related(Guilds)
 @psql_db.atomic()
 def get_experience_settings(guild_id: int, /) -> ExperienceSettings:
@@ -12,6 +21,7 @@ def get_experience_settings(guild_id: int, /) -> ExperienceSettings:
     return settings
 
 
+@settings_cache.cached(VoiceRewardsSettings)
 @create_related(Guilds)
 @psql_db.atomic()
 def get_voice_rewards_settings(guild_id: int, /) -> VoiceRewardsSettings:
@@ -22,25 +32,115 @@ def get_voice_rewards_settings(guild_id: int, /) -> VoiceRewardsSettings:
 
 
 @psql_db.atomic()
-def add_voice_time(
-    guild_id: int,
-    user_id: int,
-    seconds: int,
-) -> Members:
-    member = get_member(guild_id, user_id)
-    member.voice_activity += seconds  # type: ignore
-    member.until_present += seconds
-    member.save()
-    return member
+def credit_voice_time(
+    credits: dict[tuple[int, int], int],
+    sessions: dict[tuple[int, int], datetime.datetime],
+) -> list[Members]:
+    """
+    Add voice time to members and checkpoint their sessions in one transaction
+
+    `credits` maps `(guild_id, user_id)` to seconds. `sessions` maps members
+    still counted to the time their activity is credited until, sessions
+    of other credited members are closed. Returns updated members.
+    """
+    if not credits:
+        return []
+    provide_related(
+        [Guilds] * len(credits) + [Users] * len(credits),
+        [guild_id for guild_id, _ in credits] + [user_id for _, user_id in credits],
+    )
+    members = list(
+        Members.insert_many(
+            [(guild_id, user_id, seconds, seconds)
+             for (guild_id, user_id), seconds in credits.items()],
+            fields=[Members.guild_id, Members.user_id,
+                    Members.voice_activity, Members.until_present],
+        ).on_conflict(
+            conflict_target=[Members.user_id, Members.guild_id],
+            update={
+                Members.voice_activity: Members.voice_activity + EXCLUDED.voice_activity,
+                Members.until_present: Members.until_present + EXCLUDED.until_present,
+            },
+        ).returning(
+            Members.user_id, Members.guild_id, Members.on_guild,
+            Members.voice_activity, Members.until_present,
+        ).execute()
+    )
+
+    if sessions:
+        VoiceSessions.insert_many(
+            [(guild_id, user_id, credited_until)
+             for (guild_id, user_id), credited_until in sessions.items()],
+            fields=[VoiceSessions.guild, VoiceSessions.user, VoiceSessions.credited_until],
+        ).on_conflict(
+            conflict_target=[VoiceSessions.guild, VoiceSessions.user],
+            update={VoiceSessions.credited_until: EXCLUDED.credited_until},
+        ).execute()
+    closed = [key for key in credits if key not in sessions]
+    if closed:
+        VoiceSessions.delete().where(
+            Tuple(VoiceSessions.guild, VoiceSessions.user).in_(closed)
+        ).execute()
+
+    for member in members:
+        leaderboards.update_member(member, Metric.VOICE)
+    return members
 
 
+@psql_db.atomic()
+def pop_voice_sessions() -> dict[tuple[int, int], datetime.datetime]:
+    """Close all voice sessions and return when they were credited last time"""
+    return {
+        (session.guild_id, session.user_id): session.credited_until
+        for session in VoiceSessions.delete().returning(
+            VoiceSessions.guild, VoiceSessions.user, VoiceSessions.credited_until,
+        ).execute()
+    }
+
+
+@create_related(Guilds, Users)
 @psql_db.atomic()
 def restart_present_counter(
     guild_id: int,
     user_id: int,
+    /,
     seconds: int
 ) -> Members:
-    member = get_member(guild_id, user_id)
-    member.until_present -= seconds
-    member.save()
-    return member
\ No newline at end of file
+    return increment(
+        Members,
+        {Members.guild_id: guild_id, Members.user_id: user_id},
+        {Members.until_present: -seconds},
+    )
+
+
+@psql_db.atomic()
+def add_text_activity(
+    deltas: list[tuple[int, int, int, int, int]],
+) -> None:
+    """
+    Apply accumulated text activity in a single statement
+
+    Each delta is `(guild_id, user_id, experience, monthly_chat_activity, meow_count)`.
+    Members should already exist. New totals are passed to the leaderboards.
+    """
+    if not deltas:
+        return
+    values = ', '.join(['(%s, %s, %s, %s, %s)'] * len(deltas))
+    cursor = psql_db.execute_sql(f"""
+        UPDATE members
+        SET
+            experience = members.experience + v.experience,
+            monthly_chat_activity = members.monthly_chat_activity + v.monthly_chat_activity,
+            meow_count = members.meow_count + v.meow_count
+        FROM (VALUES {values}) AS v(guild_id, user_id, experience, monthly_chat_activity, meow_count)
+        WHERE members.guild_id = v.guild_id AND members.user_id = v.user_id
+        RETURNING
+            members.guild_id, members.user_id, members.on_guild,
+            members.experience, members.monthly_chat_activity, members.meow_count;
+    """, [value for delta in deltas for value in delta])
+    for guild_id, user_id, on_guild, experience, monthly_chat_activity, meow_count in cursor.fetchall():
+        if not on_guild:
+            continue
+        leaderboards.update(guild_id, user_id, Metric.EXPERIENCE, experience)
+        leaderboards.update(guild_id, user_id, Metric.MONTHLY_ACTIVITY, monthly_chat_activity)
+        leaderboards.update(guild_id, user_id, Metric.MEOW, meow_count)
@@ -1,19 +1,22 @@
-import asyncio
 import re
 from random import randint
 
 import disnake
-from disnake.ext import commands
+from disnake.ext import commands, tasks
 
 from src.bot import SEBot
+from src.settings import (ACTIVITY_FLUSH_INTERVAL, ACTIVITY_MAX_PENDING,
+                          ACTIVITY_EXPERIENCE_CACHE_SIZE)
 from src.logger import get_logger
 from src.translation import get_translator
-from src.database.models import ChannelExperienceSettings, ExperienceSettings, Members
-from src.database.services import get_member
+from src.database.models import ChannelExperienceSettings, ExperienceSettings
+from src.database.executor import run_db
 from src.ext.activity.services import get_experience_settings
+from src.ext.activity.activity_buffer import TextActivityBuffer
 from src.ext.activity.lvl_reward.coin_rewarder import coin_rewarder
 from src.ext.activity.lvl_reward.role_rewarder import role_rewarder
 from src.utils.experience import exp_to_lvl
+from src.utils.cooldown import Cooldowns
 from src.discord_views.embeds import DefaultEmbed
 
 
@@ -27,7 +30,20 @@ _rewarders = [coin_rewarder, role_rewarder]
 class TextActivityCog(commands.Cog):
     def __init__(self, bot: SEBot) -> None:
         self.bot = bot
-        self.on_cooldown: set[tuple[int, int]] = set()
+        self.cooldowns: Cooldowns[tuple[int, int]] = Cooldowns()
+        self.activity_buffer = TextActivityBuffer(ACTIVITY_MAX_PENDING, ACTIVITY_EXPERIENCE_CACHE_SIZE)
+        self.flush_activity.start()
+
+    def cog_unload(self) -> None:
+        self.flush_activity.cancel()
+        self.activity_buffer.flush_sync()
+
+    @tasks.loop(seconds=ACTIVITY_FLUSH_INTERVAL)
+    async def flush_activity(self) -> None:
+        try:
+            await self.activity_buffer.flush()
+        except Exception as error:  # pylint: disable=broad-except
+            logger.error('text activity flush failed: %s', repr(error))
 
     @commands.Cog.listener()
     async def on_message(self, message: disnake.Message) -> None:
@@ -38,9 +54,9 @@ class TextActivityCog(commands.Cog):
 
         meow_count = len(re.findall(r"\b{}\b".format("мяу"), message.content.lower()))
         if meow_count > 0:
-            _count_meow(author, meow_count)
+            await self.activity_buffer.add_meow(author.guild.id, author.id, meow_count)
 
-        settings = get_experience_settings(author.guild.id)
+        settings = await run_db(get_experience_settings, author.guild.id)
         channels_settings = settings.experience_channels
         if not channels_settings:
             return
@@ -55,10 +71,13 @@ class TextActivityCog(commands.Cog):
         )
 
         if all(checks):
-            await _give_prize_for_activity(author, settings, channel_setting, message)
-            await self._set_cooldown(author, channel_setting)
+            # set before awaiting, so concurrent messages are not rewarded twice
+            self._set_cooldown(author, channel_setting)
+            await _give_prize_for_activity(
+                self.activity_buffer, author, settings, channel_setting, message
+            )
 
-    async def _set_cooldown(
+    def _set_cooldown(
         self,
         author: disnake.Member,
         channel_settings: ChannelExperienceSettings,
@@ -67,16 +86,10 @@ class TextActivityCog(commands.Cog):
         if not cooldown:
             return
 
-        guild_id = author.guild.id
-        author_id = author.id
-        self.on_cooldown.add((guild_id, author_id))
-        await asyncio.sleep(cooldown)
-        self.on_cooldown.remove((guild_id, author_id))
+        self.cooldowns.trigger((author.guild.id, author.id), cooldown)
 
     def _is_on_cooldown(self, author: disnake.Member) -> bool:
-        guild_id = author.guild.id
-        author_id = author.id
-        return (guild_id, author_id) in self.on_cooldown
+        return self.cooldowns.is_on_cooldown((author.guild.id, author.id))
 
 
 def _is_message_long_enough(
@@ -91,6 +104,7 @@ def _is_message_long_enough(
 
 
 async def _give_prize_for_activity(
+    activity_buffer: TextActivityBuffer,
     member: disnake.Member,
     settings: ExperienceSettings,
     channel_settings: ChannelExperienceSettings,
@@ -100,36 +114,26 @@ async def _give_prize_for_activity(
     max_exp = channel_settings.get("max_experience_per_message", 1)
     min_exp, max_exp = min(min_exp, max_exp), max(min_exp, max_exp)
 
-    member_data = get_member(
-        member.guild.id,
-        member.id,
-    )
     logger.info("count text activity for %s on guild %s",
                 member, member.guild)
-    prev_lvl = exp_to_lvl(member_data.experience)
     gained_experience = randint(
         channel_settings["min_experience_per_message"],
         channel_settings["max_experience_per_message"],
     )
-    member_data.experience += gained_experience
-    member_data.monthly_chat_activity += gained_experience
+    prev_experience, experience = await activity_buffer.add_experience(
+        member.guild.id,
+        member.id,
+        gained_experience,
+    )
 
-    lvl = exp_to_lvl(member_data.experience)
+    prev_lvl = exp_to_lvl(prev_experience)
+    lvl = exp_to_lvl(experience)
     if lvl > prev_lvl:
-        await _give_new_lvl_award(member, member_data, settings, lvl, message)
-    member_data.save()
+        await _give_new_lvl_award(member, settings, lvl, message)
 
-def _count_meow(member: disnake.Member, meow_count: int) -> None:
-    member_data = get_member(
-        member.guild.id,
-        member.id
-    )
-    member_data.meow_count += meow_count
-    member_data.save()
 
 async def _give_new_lvl_award(
     member: disnake.Member,
-    member_data: Members,
     settings: ExperienceSettings,
     lvl: int,
     message: disnake.Message,
@@ -137,7 +141,7 @@ async def _give_new_lvl_award(
     resonses = []
     for rewarder in _rewarders:
         response = await rewarder(
-            member, member_data, settings, lvl
+            member, settings, lvl
         )
         if response is not None:
             resonses.append(response)
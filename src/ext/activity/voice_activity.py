@@ -1,32 +1,88 @@
-from typing import Union
+from typing import Iterable, Union
+import datetime
 import time
 
 import disnake
-from disnake.ext import commands
+from disnake.ext import commands, tasks
 
 from src.bot import SEBot
 from src.logger import get_voice_logger
 from src.translation import get_translator
 from src.ext.activity.services import (
-    add_voice_time,
+    credit_voice_time,
     get_voice_rewards_settings,
+    pop_voice_sessions,
     restart_present_counter
 )
 from src.ext.gifts.services import add_activity_present
+from src.database.executor import run_db
 from src.discord_views.embeds import DefaultEmbed
 
 
 logger = get_voice_logger()
 t = get_translator(route="ext.activity")
 MIN_MEMRBER_AMOUNT = 2
+VOICE_ACCRUAL_INTERVAL = 60
+# sessions checkpointed earlier are not resumed after restart
+VOICE_SESSION_RESUME_TIMEOUT = 5 * 60
 # REWARD_MESSAGE_DELETE_TIME = 60 ?
 
 
 class VoiceActivityCog(commands.Cog):
     def __init__(self, bot: SEBot) -> None:
         self.bot = bot
-        self.count_for = {}
+        # (guild_id, user_id) -> time since which voice activity isn't credited
+        self.count_for: dict[tuple[int, int], float] = {}
+        # seconds of finished sessions waiting for the next accrual
+        self.uncredited: dict[tuple[int, int], float] = {}
         self.allowed_channels = set()
+        # channel id -> user ids of conversation participants
+        self.participants: dict[int, set[int]] = {}
+        # (guild_id, user_id) -> channel id where member is a participant
+        self.participant_channels: dict[tuple[int, int], int] = {}
+        self.sessions_restored = False
+        self.accrue_voice_time.start()
+
+    def cog_unload(self) -> None:
+        self.accrue_voice_time.cancel()
+        credits, sessions = self._take_credits()
+        credit_voice_time(credits, sessions)
+
+    @tasks.loop(seconds=VOICE_ACCRUAL_INTERVAL)
+    async def accrue_voice_time(self) -> None:
+        credits, sessions = self._take_credits()
+        try:
+            members = await run_db(credit_voice_time, credits, sessions)
+        except Exception as error:  # pylint: disable=broad-except
+            logger.error('voice time accrual failed: %s', repr(error))
+            self._restore_credits(credits)
+            return
+
+        logger.debug('voice time credited for %d members', len(members))
+        for member_data in members:
+            user_id, guild_id = member_data.get_id()
+            try:
+                await self._check_for_present(guild_id, user_id, member_data)
+            except Exception as error:  # pylint: disable=broad-except
+                logger.error('voice present check failed for %d on guild %d: %s',
+                             user_id, guild_id, repr(error))
+
+    @commands.Cog.listener()
+    async def on_ready(self) -> None:
+        sessions = {}
+        if not self.sessions_restored:
+            sessions = await run_db(pop_voice_sessions)
+            self.sessions_restored = True
+        self._rebuild_count()
+
+        resume_after = time.time() - VOICE_SESSION_RESUME_TIMEOUT
+        for key, credited_until in sessions.items():
+            since = credited_until.timestamp()
+            if key in self.count_for and since > resume_after:
+                self.count_for[key] = since
+        logger.info('voice activity counted for %d members, %d sessions resumed',
+                    len(self.count_for),
+                    len(self.count_for.keys() & sessions.keys()))
 
     def external_sync(
         self,
@@ -43,6 +99,7 @@ class VoiceActivityCog(commands.Cog):
         if not channel:
             return
 
+        self._update_participant(user)
         self._check_channel(channel)
         self._sync_member(user)
 
@@ -56,14 +113,33 @@ class VoiceActivityCog(commands.Cog):
         if member.bot:
             return
 
-        if before.channel != after.channel:
-            if before.channel:
-                self._check_channel(before.channel)
-            if after.channel:
-                self._check_channel(after.channel)
+        # mute changes participants amount too, so channel is checked on every update
+        self._update_participant(member)
+        if before.channel and before.channel != after.channel:
+            self._check_channel(before.channel)
+        if after.channel:
+            self._check_channel(after.channel)
 
         self._sync_member(member)
 
+    def _update_participant(self, member: disnake.Member) -> None:
+        key = (member.guild.id, member.id)
+        previous_channel_id = self.participant_channels.pop(key, None)
+        if previous_channel_id is not None:
+            participants = self.participants[previous_channel_id]
+            participants.discard(member.id)
+            if not participants:
+                del self.participants[previous_channel_id]
+
+        voice_state = member.voice
+        if not voice_state or not voice_state.channel:
+            return
+        if not _is_conversation_participant(member):
+            return
+        channel_id = voice_state.channel.id
+        self.participant_channels[key] = channel_id
+        self.participants.setdefault(channel_id, set()).add(member.id)
+
     def _sync_member(self, member: disnake.Member) -> None:
         self._try_remove_from_count(member)
         self._try_add_to_count(member)
@@ -72,17 +148,52 @@ class VoiceActivityCog(commands.Cog):
         if not self._is_count_for(member):
             return
 
-        seconds = time.time() - self.count_for.pop(
-            (member.guild.id, member.id)
-        )
+        seconds = self._stop_count((member.guild.id, member.id))
         logger.info('stop voice activity for %s on guild %s (%ds.)',
                     member, member.guild, seconds)
-        member_data = add_voice_time(
-            member.guild.id,
-            member.id,
-            int(seconds),
-        )
-        self._check_for_present(member_data)
+
+    def _stop_count(self, key: tuple[int, int]) -> float:
+        seconds = time.time() - self.count_for.pop(key)
+        self.uncredited[key] = self.uncredited.get(key, 0) + seconds
+        return seconds
+
+    def _take_credits(self) -> tuple[dict[tuple[int, int], int],
+                                     dict[tuple[int, int], datetime.datetime]]:
+        """Take not credited seconds, counting of open sessions starts over"""
+        now = time.time()
+        credits = self.uncredited
+        self.uncredited = {}
+        for key, since in self.count_for.items():
+            credits[key] = credits.get(key, 0) + now - since
+            # fraction of the second is left for the next accrual
+            self.count_for[key] = now - credits[key] % 1
+        credits = {key: int(seconds) for key, seconds in credits.items() if int(seconds) > 0}
+        checkpoint = datetime.datetime.fromtimestamp(now)
+        return credits, {key: checkpoint for key in self.count_for if key in credits}
+
+    def _restore_credits(self, credits: dict[tuple[int, int], int]) -> None:
+        for key, seconds in credits.items():
+            self.uncredited[key] = self.uncredited.get(key, 0) + seconds
+
+    def _rebuild_count(self) -> None:
+        """Sync counted members with voice states, used after connection"""
+        for guild_id, user_id in list(self.count_for):
+            guild = self.bot.get_guild(guild_id)
+            member = guild.get_member(user_id) if guild else None
+            voice_state = member.voice if member else None
+            if not voice_state or not voice_state.channel:
+                self._stop_count((guild_id, user_id))
+        self.participants.clear()
+        self.participant_channels.clear()
+        for guild in self.bot.guilds:
+            for channel in guild.voice_channels + guild.stage_channels:
+                for member in channel.members:
+                    self._update_participant(member)
+                self._check_channel(channel)
+                for member in channel.members:
+                    if not self._is_countable(member):
+                        self._try_remove_from_count(member)
+                    self._try_add_to_count(member)
 
     def _try_add_to_count(self, member: disnake.Member) -> None:
         voice_state = member.voice
@@ -95,50 +206,48 @@ class VoiceActivityCog(commands.Cog):
         logger.info('start count voice activity for %s on guild %s',
                     member, member.guild)
 
-    def _check_for_present(self, member_data) -> None:
-        guild = member_data.guild_id.id
-        user = member_data.user_id.id
+    async def _check_for_present(self, guild: int, user: int, member_data) -> None:
 
-        settings = get_voice_rewards_settings(guild)
+        settings = await run_db(get_voice_rewards_settings, guild)
         seconds = settings.seconds_for_present
         if member_data.until_present < seconds:
             return
         
         logger.info('rewarding member %s for voice activity on guild %s',
-                member_data.user_id, member_data.guild_id)
-        restart_present_counter(guild, user, seconds) #type: ignore 
-        add_activity_present(guild, user)
+                user, guild)
+        await run_db(restart_present_counter, guild, user, seconds) #type: ignore 
+        await run_db(add_activity_present, guild, user)
 
         channel = self.bot.get_channel(settings.channel_id) # type: ignore
         if not isinstance(channel, disnake.TextChannel):
             return
         
-        self.bot.loop.create_task(
-            _send_reward_embed(channel, member_data.user_id)
-        )
+        await _send_reward_embed(channel, user)
 
     def _check_channel(
         self,
         channel: Union[disnake.VoiceChannel,
                        disnake.StageChannel]
     ) -> None:
-        members = channel.members
-        members = list(filter(_is_conversation_participant, members))
+        participants = self.participants.get(channel.id, ())
 
-        if len(members) >= MIN_MEMRBER_AMOUNT:
+        if len(participants) >= MIN_MEMRBER_AMOUNT:
             if not self._is_channel_allowed(channel):
                 self.allowed_channels.add(channel.id)
                 logger.info('add %s to allowed_channels', channel)
-                for member in members:
+                for member in _get_members(channel.guild, participants):
                     self._try_add_to_count(member)
         else:
             if self._is_channel_allowed(channel):
                 self.allowed_channels.remove(channel.id)
                 logger.info('remove %s from allowed_channels', channel)
-                for member in members:
+                for member in _get_members(channel.guild, participants):
                     self._try_remove_from_count(member)
 
     def _is_can_add_to_count(self, member: disnake.Member) -> bool:
+        return self._is_countable(member) and not self._is_count_for(member)
+
+    def _is_countable(self, member: disnake.Member) -> bool:
         voice_state = member.voice
         if not voice_state:
             return False
@@ -148,7 +257,6 @@ class VoiceActivityCog(commands.Cog):
             return False
 
         return (_is_conversation_participant(member) and
-                not self._is_count_for(member) and
                 self._is_channel_allowed(channel))
 
     def _is_count_for(self, member: disnake.Member) -> bool:
@@ -162,6 +270,11 @@ class VoiceActivityCog(commands.Cog):
         return channel.id in self.allowed_channels
 
 
+def _get_members(guild: disnake.Guild, user_ids: Iterable[int]) -> list[disnake.Member]:
+    members = (guild.get_member(user_id) for user_id in user_ids)
+    return [member for member in members if member is not None]
+
+
 def _is_conversation_participant(member: disnake.Member) -> bool:
     return not member.bot and not _is_muted(member)
 
@@ -1,8 +1,7 @@
-import asyncio
 import time
 
 import disnake
-from disnake.ext import commands, tasks
+from disnake.ext import commands
 
 from src.bot import SEBot
 from src.translation import get_translator
@@ -10,8 +9,9 @@ from src.discord_views.embeds import DefaultEmbed
 from src.converters import interacted_member
 from src.formatters import from_user_to_user
 from src.custom_errors import DailyAlreadyReceived
-from src.ext.economy.services import (change_balance, get_economy_settings,
-                                      take_bonus, take_tax_for_roles, swap_crystals_to_coins)
+from src.ext.economy.services import (get_economy_settings, take_bonus,
+                                      swap_crystals_to_coins, transfer_balance)
+from src.ext.economy.tax import collect_tax
 from src.ext.economy.shops.shops import get_not_empty_shops, Shop
 from src.discord_views.switch import ViewSwitcher
 from src.utils.time_ import second_until_end_of_day
@@ -20,41 +20,26 @@ from src.logger import get_logger
 
 t = get_translator(route="ext.economy")
 logger = get_logger()
+TAX_JOB = 'role_tax'
 
 
 class EconomyCog(commands.Cog):
     def __init__(self, bot: SEBot) -> None:
         self.bot = bot
-        self.taxing.start()
+        bot.scheduler.add_job(TAX_JOB, '0 0 * * *', self.taxing)
 
     def cog_unload(self) -> None:
-        self.taxing.cancel()
+        self.bot.scheduler.remove_job(TAX_JOB)
 
-    @tasks.loop(hours=24)
     async def taxing(self) -> None:
-        to_delete = take_tax_for_roles()
-        for item in to_delete:
-            guild = self.bot.get_guild(item.guild.id)
-            if not guild:
-                logger.info("taxing want to delete role with id %d but can't find guild %d",
-                            item.role_id, item.guild.id)
-                continue
-
-            role = guild.get_role(item.role_id)  # type: ignore
-            if not role:
-                logger.info("taxing want to delete role with id %d, but role missing",
-                            item.role_id)
-                continue
-
-            logger.info("taxing removes role %d", item.role_id)
-            await role.delete()
-
-    @taxing.before_loop
-    async def before_taxing(self) -> None:
-        await self.bot.wait_until_ready()
-        sleep_time = second_until_end_of_day()
-        logger.debug('tax will sleep for %d second', sleep_time)
-        await asyncio.sleep(sleep_time)
+        await collect_tax(self.bot)
+
+    @commands.command()
+    @commands.is_owner()
+    async def tax_report(self, ctx: commands.Context) -> None:
+        """Show what the next tax would do without applying it"""
+        report = await collect_tax(self.bot, dry_run=True)
+        await ctx.send(f'```{report}```')
 
     @commands.slash_command()
     async def daily(
@@ -153,8 +138,7 @@ class EconomyCog(commands.Cog):
         """
         guild_id: int = inter.guild.id
         coin = get_economy_settings(guild_id).coin
-        change_balance(guild_id, inter.author.id, -amount)  # noqa
-        change_balance(guild_id, member.id, amount)
+        transfer_balance(guild_id, inter.author.id, member.id, amount, source=__name__)
 
         embed = DefaultEmbed(
             title=t('transfered'),
@@ -119,6 +119,7 @@ class EconomyControlCog(commands.Cog):
             member.id,
             amount=amount,
             currency=currency,
+            source=__name__,
         )
         await inter.response.send_message(
             t('balance_changed'),
@@ -0,0 +1,76 @@
+from typing import Optional
+
+from src.database.models import BalanceLedger, psql_db
+
+
+_LEDGER_HOOK = 'balance_ledger'
+_FIELDS = [
+    BalanceLedger.guild,
+    BalanceLedger.user,
+    BalanceLedger.amount,
+    BalanceLedger.currency,
+    BalanceLedger.source,
+    BalanceLedger.counterparty_id,
+]
+
+
+class _LedgerBatch:
+    def __init__(self) -> None:
+        self.entries: list[tuple] = []
+
+    def __call__(self) -> None:
+        _insert(self.entries)
+
+    def merge(self, nested: '_LedgerBatch') -> None:
+        self.entries.extend(nested.entries)
+
+
+def record(
+    guild_id: int,
+    user_id: int,
+    amount: int,
+    currency: str,
+    *,
+    source: str,
+    counterparty_id: Optional[int] = None,
+) -> None:
+    """
+    Add balance change to the ledger
+
+    Entries of one transaction are inserted with a single statement
+    right before it's committed, so they are saved only with the change.
+    `source` is the module which changed the balance, callers pass `__name__`.
+    """
+    if amount == 0:
+        return
+    entry = (guild_id, user_id, amount, currency, source, counterparty_id)
+    hooks = psql_db.transaction_hooks()
+    if hooks is None:
+        _insert([entry])
+        return
+    if _LEDGER_HOOK not in hooks:
+        hooks[_LEDGER_HOOK] = _LedgerBatch()
+    hooks[_LEDGER_HOOK].entries.append(entry)  # type: ignore
+
+
+def get_statement(
+    guild_id: int,
+    user_id: int,
+    *,
+    limit: int = 20,
+    before_id: Optional[int] = None,
+) -> list[BalanceLedger]:
+    """Latest entries of the member, older pages start before `before_id`"""
+    query = BalanceLedger.select().where(
+        (BalanceLedger.guild == guild_id) &
+        (BalanceLedger.user == user_id)
+    )
+    if before_id is not None:
+        query = query.where(BalanceLedger.id < before_id)
+    return list(query.order_by(BalanceLedger.id.desc()).limit(limit))
+
+
+def _insert(entries: list[tuple]) -> None:
+    if entries:
+        BalanceLedger.insert_many(entries, fields=_FIELDS).execute()
+
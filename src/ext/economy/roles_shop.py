@@ -114,6 +114,7 @@ class BuyRoleSelect(PeeweeItemSelect[ShopRoles]):
             guild_id=inter.guild.id,
             user_id=author.id,
             amount=-item.price,
+            source=__name__,
         )
         add_role_to_inventory(
             guild_id, user_id, role.id, price
@@ -201,7 +202,8 @@ class BuyCreatedRoleSelect(BuyRoleSelect):  # pylint: disable=too-many-ancestors
         item: CreatedShopRoles,
     ) -> None:
         await super()._resolve_select(inter, item)  # type: ignore
-        change_balance(inter.guild.id, item.creator.id, item.price // 5)  # type: ignore
+        change_balance(inter.guild.id, item.creator.id, item.price // 5,  # type: ignore
+                       source=__name__)
 
 
 class CreateRoleModal(disnake.ui.Modal):
@@ -259,6 +261,7 @@ class CreateRoleModal(disnake.ui.Modal):
                 inter.author.id,
                 -self._settings.role_creation_price,
                 currency=CurrencyType.CRYSTAL,
+                source=__name__,
             )
         except NotEnoughMoney:
             await inter.response.send_message(
@@ -1,8 +1,13 @@
 from enum import Enum
+from typing import Optional
 
 from src.database.models import (Members, Users, psql_db, Guilds,
                                  EconomySettings, ShopRoles, CreatedShopRoles, RolesInventory)
-from src.database.services import get_member, create_related
+from src.database.services import get_member, create_related, provide_related
+from src.database.counters import increment
+from src.ext.economy import ledger
+from src.database.settings_cache import settings_cache
+from src.database.leaderboards import leaderboards, Metric
 from src.logger import LoggingLevel, get_logger, log_calls
 from src.custom_errors import CriticalException, NotEnoughMoney, DailyAlreadyReceived
 from src.utils.time_ import get_current_day
@@ -37,26 +42,46 @@ def change_balance(
     user_id: int,
     amount: int,
     *,
+    source: str,
     currency: CurrencyType = CurrencyType.COIN,
+    counterparty_id: Optional[int] = None,
 ) -> Members:
-    member = get_member(guild_id, user_id)
-    if currency == CurrencyType.COIN:
-        member.balance += amount
-        balance = member.balance
-    elif currency == CurrencyType.CRYSTAL:
-        member.donate_balance += amount
-        balance = member.donate_balance
-    else:
+    if currency not in (CurrencyType.COIN, CurrencyType.CRYSTAL):
         raise CriticalException(f'no currency {currency}')
 
-    if balance < 0:
-        raise NotEnoughMoney(abs(balance))
+    field = currency.model_field
+    provide_related((Guilds, Users), (guild_id, user_id))
+    member = increment(
+        Members,
+        {Members.guild_id: guild_id, Members.user_id: user_id},
+        {field: amount},
+        floors={field: 0} if amount < 0 else None,
+    )
+    if member is None:
+        balance = getattr(get_member(guild_id, user_id), field.name)
+        raise NotEnoughMoney(abs(balance + amount))
 
-    member.save()
+    ledger.record(guild_id, user_id, amount, currency.value,
+                  source=source, counterparty_id=counterparty_id)
+    if currency == CurrencyType.COIN:
+        leaderboards.update_member(member, Metric.BALANCE)
     logger.info('Balance of memeber %d changed %d, currency is %s', user_id, amount, currency)
     return member
 
 
+@psql_db.atomic()
+def transfer_balance(
+    guild_id: int,
+    from_user_id: int,
+    to_user_id: int,
+    amount: int,
+    *,
+    source: str,
+) -> None:
+    change_balance(guild_id, from_user_id, -amount, source=source, counterparty_id=to_user_id)
+    change_balance(guild_id, to_user_id, amount, source=source, counterparty_id=from_user_id)
+
+
 @psql_db.atomic()
 @log_calls(level=LoggingLevel.INFO)
 def change_balances(
@@ -64,6 +89,7 @@ def change_balances(
     user_ids: list[int],
     amount: int,
     *,
+    source: str,
     currency: CurrencyType = CurrencyType.COIN,
 ) -> None:
     field = currency.model_field
@@ -71,28 +97,39 @@ def change_balances(
     if amount < 0 < (
         Members.
         select().
-        where((field < amount) & target).
+        where((field + amount < 0) & target).
         count()
     ):
         raise CriticalException("Can't change balances, some members don't have enough money")
-    (
+    updated = (
         Members.
         update({field: field + amount})
         .where(target)
+        .returning(Members.user_id, Members.guild_id, Members.on_guild, Members.balance)
         .execute()
     )
+    for member in updated:
+        user_id, _ = member.get_id()
+        ledger.record(guild_id, user_id, amount, currency.value, source=source)
+        if currency == CurrencyType.COIN:
+            leaderboards.update_member(member, Metric.BALANCE)
 
 
 @psql_db.atomic()
-def set_balance(guild_id: int, user_id: int, amount: int) -> None:
+def set_balance(guild_id: int, user_id: int, amount: int, *, source: str) -> None:
     member = get_member(guild_id, user_id)
+    previous_balance = member.balance
     member.balance = amount  # type: ignore
     if member.balance < 0:
         raise NotEnoughMoney(abs(member.balance))  # type: ignore
     member.save()
+    ledger.record(guild_id, user_id, amount - previous_balance, CurrencyType.COIN.value,
+                  source=source)
+    leaderboards.update_member(member, Metric.BALANCE)
     logger.info('Balance of memeber %d setted to %d', user_id, amount)
 
 
+@settings_cache.cached(EconomySettings)
 @create_related(Guilds)
 @psql_db.atomic()
 def get_economy_settings(guild_id: int, /) -> EconomySettings:
@@ -112,7 +149,7 @@ def take_bonus(
     if member.bonus_taked_on_day >= get_current_day():
         raise DailyAlreadyReceived()
 
-    member = change_balance(guild_id, user_id, amount)
+    member = change_balance(guild_id, user_id, amount, source=__name__)
     member.bonus_taked_on_day = get_current_day()  # type: ignore
     member.save()
     return member
@@ -225,36 +262,84 @@ def delete_created_role(
     return query.execute()
 
 
-@psql_db.atomic()
-def take_tax_for_roles() -> list[CreatedShopRoles]:
-    roles_to_delete = (
+def get_taxed_guild_ids() -> list[int]:
+    """Guilds with created roles, the tax doesn't touch other guilds"""
+    query = (
         CreatedShopRoles.
-        select(CreatedShopRoles).
-        join(Members, on=(
-            (Members.guild_id == CreatedShopRoles.guild) &
-            (Members.user_id == CreatedShopRoles.creator) &
-            (CreatedShopRoles.role_id.is_null(False))  # type: ignore
-        )).
-        join(EconomySettings, on=(CreatedShopRoles.guild == EconomySettings.guild_id)).
-        where(Members.donate_balance < EconomySettings.role_day_tax)
+        select(CreatedShopRoles.guild).
+        where(CreatedShopRoles.role_id.is_null(False)).  # type: ignore
+        distinct().
+        order_by(CreatedShopRoles.guild)
     )
-    to_delete = list(roles_to_delete)
-
-    squery = roles_to_delete.select(CreatedShopRoles.role_id)
-    RolesInventory.delete().where(RolesInventory.role_id << squery).execute()
-    CreatedShopRoles.delete().where(CreatedShopRoles.role_id << squery).execute()
-    psql_db.execute_sql("""
-        UPDATE members
-        SET donate_balance = donate_balance - economysettings.role_day_tax
-        FROM economysettings, createdshoproles
-        WHERE (
-            members.guild_id=economysettings.guild_id AND
-            createdshoproles.creator_id=members.user_id AND
-            createdshoproles.guild_id=members.guild_id AND
-            createdshoproles.role_id IS NOT NULL
-        );
-    """)
-    return list(to_delete)
+    return [role.guild_id for role in query]
+
+
+def take_tax_for_roles(
+    guild_ids: list[int],
+    *,
+    dry_run: bool = False,
+) -> tuple[list[tuple[int, int]], list[tuple[int, int, int]]]:
+    """
+    Take daily tax from creators of roles on the guilds
+
+    Roles of creators who can't pay are removed, others pay the tax once
+    no matter how many roles they have. Returns removed roles as
+    `(guild_id, role_id)` and taxed members as `(guild_id, user_id, tax)`.
+    Dry run returns the same result without changing anything.
+    """
+    with psql_db.atomic() as transaction:
+        # statements of the query see the same snapshot,
+        # so taxed roles exclude the removed ones explicitly
+        rows = psql_db.execute_sql("""
+            WITH delinquent AS (
+                SELECT r.guild_id, r.role_id
+                FROM createdshoproles r
+                INNER JOIN members m ON
+                    m.guild_id = r.guild_id AND
+                    m.user_id = r.creator_id
+                INNER JOIN economysettings s ON s.guild_id = r.guild_id
+                WHERE
+                    r.guild_id = ANY(%(guild_ids)s) AND
+                    r.role_id IS NOT NULL AND
+                    m.donate_balance < s.role_day_tax
+            ), removed_inventory AS (
+                DELETE FROM rolesinventory
+                WHERE role_id IN (SELECT role_id FROM delinquent)
+            ), removed AS (
+                DELETE FROM createdshoproles
+                WHERE role_id IN (SELECT role_id FROM delinquent)
+                RETURNING guild_id, role_id
+            ), taxed AS (
+                UPDATE members m
+                SET donate_balance = m.donate_balance - s.role_day_tax
+                FROM economysettings s
+                WHERE
+                    m.guild_id = s.guild_id AND
+                    m.guild_id = ANY(%(guild_ids)s) AND
+                    EXISTS (
+                        SELECT 1 FROM createdshoproles r
+                        WHERE
+                            r.guild_id = m.guild_id AND
+                            r.creator_id = m.user_id AND
+                            r.role_id IS NOT NULL AND
+                            r.role_id NOT IN (SELECT role_id FROM delinquent)
+                    )
+                RETURNING m.guild_id, m.user_id, s.role_day_tax
+            )
+            SELECT FALSE, guild_id, role_id, 0 FROM removed
+            UNION ALL
+            SELECT TRUE, guild_id, user_id, role_day_tax FROM taxed;
+        """, {'guild_ids': guild_ids}).fetchall()
+
+        removed = [(guild_id, role_id) for is_tax, guild_id, role_id, _ in rows if not is_tax]
+        taxed = [(guild_id, user_id, tax) for is_tax, guild_id, user_id, tax in rows if is_tax]
+        if dry_run:
+            transaction.rollback()
+            return removed, taxed
+
+        for guild_id, user_id, tax in taxed:
+            ledger.record(guild_id, user_id, -tax, CurrencyType.CRYSTAL.value, source=__name__)
+    return removed, taxed
 
 
 @psql_db.atomic()
@@ -267,5 +352,7 @@ def swap_crystals_to_coins(
     if member_data.donate_balance < 1:
         raise NotEnoughMoney(amount)
     amount = min(amount, member_data.donate_balance)
-    change_balance(guild_id, user_id, -amount, currency=CurrencyType.CRYSTAL)
-    change_balance(guild_id, user_id, amount * COINS_PER_CRYSTAL, currency=CurrencyType.COIN)
+    change_balance(guild_id, user_id, -amount,
+                   source=__name__, currency=CurrencyType.CRYSTAL)
+    change_balance(guild_id, user_id, amount * COINS_PER_CRYSTAL,
+                   source=__name__, currency=CurrencyType.COIN)
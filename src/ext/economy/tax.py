@@ -0,0 +1,144 @@
+import asyncio
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Optional
+
+import disnake
+
+from src.bot import SEBot
+from src.settings import TAX_GUILDS_CHUNK, ROLE_DELETION_CONCURRENCY, ROLE_DELETION_ATTEMPTS
+from src.database.executor import run_db
+from src.ext.economy.services import get_taxed_guild_ids, take_tax_for_roles
+from src.logger import get_logger
+
+
+logger = get_logger()
+
+
+@dataclass
+class TaxReport:
+    dry_run: bool
+    guilds: int = 0
+    chunks: int = 0
+    taxed_members: int = 0
+    collected: int = 0
+    removed_roles: list[tuple[int, int]] = field(default_factory=list)
+    deleted_roles: int = 0
+    missing_roles: int = 0
+    failed_roles: int = 0
+    # seconds spent by the database and by Discord
+    database_time: float = 0
+    slowest_chunk_time: float = 0
+    deletion_time: float = 0
+
+    def __str__(self) -> str:
+        mode = 'dry run' if self.dry_run else 'run'
+        return (
+            f'tax {mode}: {self.guilds} guilds in {self.chunks} chunks, '
+            f'{self.taxed_members} members paid {self.collected}, '
+            f'{len(self.removed_roles)} roles removed '
+            f'({self.deleted_roles} deleted, {self.missing_roles} missing, '
+            f'{self.failed_roles} failed); '
+            f'database {self.database_time:.2f}s '
+            f'(slowest chunk {self.slowest_chunk_time:.2f}s), '
+            f'discord {self.deletion_time:.2f}s'
+        )
+
+
+async def collect_tax(bot: SEBot, *, dry_run: bool = False) -> TaxReport:
+    """
+    Take daily tax for created roles and delete unpaid roles
+
+    Guilds are taxed in chunks, every chunk is a short transaction.
+    Dry run only reports what would be done.
+    """
+    report = TaxReport(dry_run)
+    guild_ids = await run_db(get_taxed_guild_ids)
+    report.guilds = len(guild_ids)
+
+    for start in range(0, len(guild_ids), TAX_GUILDS_CHUNK):
+        chunk = guild_ids[start:start + TAX_GUILDS_CHUNK]
+        started = monotonic()
+        removed, taxed = await run_db(take_tax_for_roles, chunk, dry_run=dry_run)
+        elapsed = monotonic() - started
+
+        report.chunks += 1
+        report.database_time += elapsed
+        report.slowest_chunk_time = max(report.slowest_chunk_time, elapsed)
+        report.removed_roles.extend(removed)
+        report.taxed_members += len(taxed)
+        report.collected += sum(tax for _, _, tax in taxed)
+
+    if not dry_run:
+        started = monotonic()
+        await RoleDeleter(bot, report).delete(report.removed_roles)
+        report.deletion_time = monotonic() - started
+
+    logger.info('%s', report)
+    return report
+
+
+class RoleDeleter:
+    """
+    Deletes roles from Discord with a few workers
+
+    Every worker takes all roles of one guild, role deletions of a guild
+    share one rate limit bucket, so parallel requests would only wait.
+    """
+
+    def __init__(self, bot: SEBot, report: TaxReport) -> None:
+        self.bot = bot
+        self.report = report
+        self._queue: asyncio.Queue[tuple[int, list[int]]] = asyncio.Queue()
+
+    async def delete(self, roles: list[tuple[int, int]]) -> None:
+        by_guild: dict[int, list[int]] = {}
+        for guild_id, role_id in roles:
+            by_guild.setdefault(guild_id, []).append(role_id)
+        for item in by_guild.items():
+            self._queue.put_nowait(item)
+
+        workers = min(ROLE_DELETION_CONCURRENCY, len(by_guild))
+        await asyncio.gather(*(self._work() for _ in range(workers)))
+
+    async def _work(self) -> None:
+        while not self._queue.empty():
+            guild_id, role_ids = self._queue.get_nowait()
+            guild = self.bot.get_guild(guild_id)
+            if not guild:
+                logger.info("taxing want to delete %d roles but can't find guild %d",
+                            len(role_ids), guild_id)
+                self.report.missing_roles += len(role_ids)
+                continue
+
+            for role_id in role_ids:
+                role = guild.get_role(role_id)
+                if not role:
+                    logger.info("taxing want to delete role with id %d, but role missing",
+                                role_id)
+                    self.report.missing_roles += 1
+                    continue
+                await self._delete_role(role)
+
+    async def _delete_role(self, role: disnake.Role) -> None:
+        error: Optional[disnake.HTTPException] = None
+        for attempt in range(ROLE_DELETION_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(2 ** attempt)
+            try:
+                logger.info("taxing removes role %d", role.id)
+                await role.delete()
+            except disnake.NotFound:
+                self.report.missing_roles += 1
+                return
+            except disnake.HTTPException as http_error:
+                error = http_error
+                # rate limits are waited by disnake itself, here it gave up
+                if http_error.status != 429 and http_error.status < 500:
+                    break
+            else:
+                self.report.deleted_roles += 1
+                return
+
+        logger.warning('taxing failed to delete role %d: %s', role.id, error)
+        self.report.failed_roles += 1
@@ -1,12 +1,13 @@
 import disnake
 from disnake.ext import commands
 from datetime import datetime
+import asyncio
 import dateparser
-import requests
-from io import BytesIO
+import aiohttp
 from typing import Optional, Union
 
 from src.bot import SEBot
+from src.http_client import HttpClient
 from src.ext.events.server_events import ServerEvents, EventType
 from src.discord_views.base_view import BaseView
 from src.discord_views.shortcuts import request_data_via_modal
@@ -66,7 +67,7 @@ class EventsCog(commands.Cog):
             return
         
         event_gif = event.gif if event.is_concrete else _fix_gif_url(modal_data[4])
-        if not (_check_gif_availability(event_gif)):
+        if not await self.bot.url_validator.is_image(event_gif):
             await inter.followup.send(t('wrong_gif'), ephemeral=True)
             return
 
@@ -105,7 +106,7 @@ class EventView(BaseView):
         super().__init__(
             timeout=180
         )
-        self.bot = bot,
+        self.bot = bot
         self.event = event
         self.event_time = event_time
         self.notification_channel = notification_channel
@@ -132,12 +133,14 @@ class SubmitEventButton(disnake.ui.Button):
             content = f"<@&{EVENT_ROLE_ID}>",
             embed=interaction.message.embeds[0]
         )
+        image = await _get_image_bytes(view.bot.http_client, event.image)
         await interaction.guild.create_scheduled_event( # type: ignore
             name=t(event.event) if event.is_concrete else view.event_addition_name, # type: ignore
             channel=view.event_channel,
             scheduled_start_time=view.event_time,   
             description=event.get_short_desc(jump_url=notification_message.jump_url),
-            image=_get_image_bytes(event.image)
+            # event is created without the image when it can't be loaded
+            **({'image': image} if image else {}),
         )
         logger.info("server event created in %d", interaction.guild_id)
         self.view.stop()
@@ -191,21 +194,17 @@ def _get_event_long_desc(
         event_channel=event_channel_id
     )
 
-def _check_gif_availability(gif_url: str) -> bool:
-    try:
-        response = requests.get(gif_url)
-        return response.status_code // 100 == 2
-    except:
-         return False
-
 def _fix_gif_url(url: str) -> str:
     return url if '.gif' in url else url + '.gif'
     
-def _get_image_bytes(image_url: str) -> bytes:
-    response = requests.get(image_url)
-    response.raise_for_status()
-    image_bytes = BytesIO(response.content).getvalue()
-    return image_bytes
+async def _get_image_bytes(client: HttpClient, image_url: str) -> Optional[bytes]:
+    try:
+        async with client.session.get(image_url) as response:
+            response.raise_for_status()
+            return await response.read()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+        logger.warning("event image %s is not loaded: %s", image_url, repr(error))
+        return None
 
 def setup(bot) -> None:
     bot.add_cog(EventsCog(bot))
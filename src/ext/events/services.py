@@ -1,11 +1,13 @@
 from src.logger import get_logger
 from src.database.models import (Guilds, EventsSettings, psql_db)
 from src.database.services import create_related
+from src.database.settings_cache import settings_cache
 
 
 logger = get_logger()
 
 
+@settings_cache.cached(EventsSettings)
 @create_related(Guilds)
 @psql_db.atomic()
 def get_events_settings(guild_id: int, /) -> EventsSettings:
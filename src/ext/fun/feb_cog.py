@@ -49,7 +49,7 @@ class FebCog(commands.Cog):
             description=text,
             color=disnake.Color.red(),
         )
-        change_balance(inter.guild_id, inter.author.id, -VALENTINE_PRICE)
+        change_balance(inter.guild_id, inter.author.id, -VALENTINE_PRICE, source=__name__)
         asyncio.gather(
             channel.send(content=member.mention, embed=embed),
             modal_inter.response.send_message('Валентинка отправлена', ephemeral=True),
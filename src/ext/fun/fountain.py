@@ -169,7 +169,7 @@ def add_money_to_fountain(
     amount: int,
     callback
 ) -> None:
-    change_balance(guild_id, user_id, -amount)
+    change_balance(guild_id, user_id, -amount, source=__name__)
     check_for_award(guild_id, user_id, amount, callback)
 
 
@@ -185,7 +185,7 @@ def check_for_award(
     m_c = counter.money_count
     m_n = counter.money_needed
     if m_c >= m_n:
-        change_balance(guild_id, user_id, m_c)
+        change_balance(guild_id, user_id, m_c, source=__name__)
         counter.money_count = 0
         counter.money_needed = random.randint(
             MIN_FOUNTAIN_NEEDED, MAX_FOUNTAIN_NEEDED
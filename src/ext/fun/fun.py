@@ -1,4 +1,3 @@
-import aiohttp
 import disnake
 from disnake.ext import commands
 
@@ -6,14 +5,27 @@ from src.ext.members.services import get_member
 from src.discord_views.embeds import DefaultEmbed
 from src.converters import interacted_member
 from src.bot import SEBot
+from src.translation import get_translator
 from src.custom_errors import ActionRestricted
 from src.ext.fun.categories import Categories
+from src.ext.fun.gifs import GifPool
 from src.ext.actions.actions import is_action_restricted
 
 
+t = get_translator(route='ext.fun')
+
+
 class FunCog(commands.Cog):
     def __init__(self, bot: SEBot) -> None:
         self.bot = bot
+        self.gifs = GifPool(bot.http_client)
+
+    def cog_unload(self) -> None:
+        self.gifs.stop()
+
+    @commands.Cog.listener()
+    async def on_ready(self) -> None:
+        self.gifs.prefetch()
 
     @commands.slash_command()
     @commands.cooldown(3, 30, commands.BucketType.user)
@@ -46,19 +58,17 @@ class FunCog(commands.Cog):
         target: disnake.Member,
         category: Categories,
     ) -> None:
+        url = await self.gifs.get(category)
+        if url is None:
+            await inter.response.send_message(t('gif_not_loaded'), ephemeral=True)
+            return
+
         embed = DefaultEmbed(
             description=category.get_embed_text(inter.author, target)  # type: ignore
         )
-        embed.set_image(url=await get_random_url(category))
+        embed.set_image(url=url)
         await inter.response.send_message(target.mention, embed=embed)
 
 
-async def get_random_url(category: Categories) -> str:
-    async with aiohttp.ClientSession() as session:
-        async with session.get(f'https://api.waifu.pics/sfw/{category.value}') as response:
-            json_resp = await response.json()
-            return json_resp['url']
-
-
 def setup(bot) -> None:
     bot.add_cog(FunCog(bot))
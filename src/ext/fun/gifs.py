@@ -0,0 +1,109 @@
+import asyncio
+from collections import deque
+from typing import Optional
+
+import aiohttp
+
+from src.http_client import HttpClient
+from src.ext.fun.categories import Categories
+from src.logger import get_logger
+
+
+logger = get_logger()
+WAIFU_API = 'https://api.waifu.pics'
+# GIF URLs kept ready for every category
+GIFS_PREFETCH = 30
+# the category is refilled when fewer URLs are left
+GIFS_REFILL_THRESHOLD = 10
+# seconds before the first retry of a failed refill, doubled on every failure
+GIFS_RETRY_DELAY = 1
+GIFS_MAX_RETRY_DELAY = 5 * 60
+# seconds to fetch a GIF when none are ready, interaction has to be answered in 3
+GIFS_FETCH_TIMEOUT = 2
+
+
+class GifPool:
+    """
+    GIF URLs of the action categories fetched in advance
+
+    Every category keeps a few URLs ready, so an action is answered
+    from memory. URLs are fetched in batches by a background task when
+    few of them are left, failed fetches are retried with growing delays.
+    When a category is used up, the URL is fetched right away, and None
+    is returned if that fails.
+    """
+
+    def __init__(self, client: HttpClient, api_url: str = WAIFU_API) -> None:
+        self.client = client
+        self.api_url = api_url
+        self._urls: dict[Categories, deque[str]] = {
+            category: deque() for category in Categories
+        }
+        self._refills: dict[Categories, asyncio.Task] = {}
+
+    def prefetch(self) -> None:
+        for category in Categories:
+            self._refill(category)
+
+    def stop(self) -> None:
+        for task in self._refills.values():
+            task.cancel()
+        self._refills.clear()
+
+    async def get(self, category: Categories) -> Optional[str]:
+        urls = self._urls[category]
+        if len(urls) <= GIFS_REFILL_THRESHOLD:
+            self._refill(category)
+        if urls:
+            return urls.popleft()
+        try:
+            return await self._fetch_one(category)
+        except (aiohttp.ClientError, asyncio.TimeoutError, KeyError, ValueError) as error:
+            logger.warning('GIF of %s is not fetched: %s', category.value, repr(error))
+            return None
+
+    def _refill(self, category: Categories) -> None:
+        task = self._refills.get(category)
+        if task is None or task.done():
+            self._refills[category] = asyncio.create_task(self._fill(category))
+
+    async def _fill(self, category: Categories) -> None:
+        urls = self._urls[category]
+        delay = GIFS_RETRY_DELAY
+        while len(urls) < GIFS_PREFETCH:
+            try:
+                fetched = await self._fetch_many(category, exclude=list(urls))
+            except (aiohttp.ClientError, asyncio.TimeoutError, KeyError, ValueError) as error:
+                logger.warning(
+                    'GIFs of %s are not fetched, retry in %d seconds: %s',
+                    category.value, delay, repr(error),
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, GIFS_MAX_RETRY_DELAY)
+                continue
+            delay = GIFS_RETRY_DELAY
+            known = set(urls)
+            new = [url for url in fetched if url not in known]
+            if not new:
+                # the category has fewer GIFs than are kept
+                return
+            urls.extend(new[:GIFS_PREFETCH - len(urls)])
+
+    async def _fetch_one(self, category: Categories) -> str:
+        async with self.client.session.get(
+            f'{self.api_url}/sfw/{category.value}',
+            timeout=aiohttp.ClientTimeout(total=GIFS_FETCH_TIMEOUT),
+        ) as response:
+            response.raise_for_status()
+            return (await response.json())['url']
+
+    async def _fetch_many(self, category: Categories, exclude: list[str]) -> list[str]:
+        async with self.client.session.post(
+            f'{self.api_url}/many/sfw/{category.value}',
+            json={'exclude': exclude},
+        ) as response:
+            response.raise_for_status()
+            files = (await response.json())['files']
+        if not files:
+            raise ValueError('no files returned')
+        return files
@@ -2,7 +2,7 @@ import disnake
 from disnake.ext import commands
 
 from src.bot import SEBot
-from src.database.models import Members
+from src.database.leaderboards import leaderboards, Metric
 from src.discord_views.embeds import DefaultEmbed
 from src.formatters import ordered_list
 from src.translation import get_translator
@@ -24,25 +24,14 @@ class MeowCog(commands.Cog):
         Команда, показывающая сколько раз ты мяукнул в чате!!!!!!!!!!!😭
         """
         await interaction.response.send_message(
-            embed=_create_meow_top_embed(interaction.guild.id)
+            embed=await _create_meow_top_embed(interaction.guild.id)
         )
 
-def _create_meow_top_query(guild_id: int):
-    return (
-        Members.
-        select(Members.user_id, Members.meow_count).
-        where((Members.guild_id == guild_id) 
-              & (Members.on_guild == True) 
-              & (Members.meow_count != 0)).
-        order_by(Members.meow_count.desc()). # type: ignore
-        limit(MEOW_TOP_SIZE)
-    )
-
-def _create_meow_top_embed(guild_id: int) -> disnake.Embed:
-    query = _create_meow_top_query(guild_id)
+async def _create_meow_top_embed(guild_id: int) -> disnake.Embed:
+    top = await leaderboards.top(guild_id, Metric.MEOW, MEOW_TOP_SIZE)
     desc = ordered_list(
-        query,
-        lambda item: f'<@{item.user_id}> {t("meow_message", count=item.meow_count)}'
+        [item for item in top if item.score != 0],
+        lambda item: f'<@{item.user_id}> {t("meow_message", count=item.score)}'
     )
     if desc == "": desc = t("meow_lack")
     embed = DefaultEmbed(
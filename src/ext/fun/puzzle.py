@@ -1,19 +1,21 @@
 import asyncio
+import datetime
 from dataclasses import dataclass
 import itertools
 import re
 import disnake
 from disnake.ext import commands
-from peewee import DoesNotExist
 from typing import Optional
-import requests
 
 from src.bot import SEBot
+from src.timers import Timer
 from src.utils.slash_shortcuts import only_admin
 from src.utils.counter import Counter
 from src.database.services import create_related
 from src.database.models import psql_db, Guilds, Puzzles
+from src.database.executor import run_db
 from src.ext.economy.services import change_balance, get_economy_settings
+from src.ext.fun.puzzle_deck import PuzzleDeck, normalize_answer, normalize_answers
 from src.logger import get_logger
 from src.translation import get_translator
 
@@ -25,6 +27,7 @@ MESSAGES_TIMER = 60  # 60
 PUZZLE_TIMEOUT = 600  # 600
 PUZZLE_DELAY = 3600  # 3600
 MESSAGES_COUNT = 10  # 10
+UNSOLVED_PUZZLE_TIMER = 'unsolved_puzzle'
 IMAGES_CYCLE = itertools.cycle((
     "https://i.pinimg.com/originals/c1/dc/10/c1dc10bb56883a1b134e50305abe10b8.gif",
     "https://i.pinimg.com/originals/df/ff/8f/dfff8f4a814276130f1bdbb74a5c3a45.gif",
@@ -39,8 +42,9 @@ t = get_translator(route='ext.fun')
 @dataclass
 class DiscordPuzzle:
     message: disnake.Message
-    remove_unsolved_task: asyncio.Task
     puzzle: Puzzles
+    # normalized answers
+    answers: frozenset[str]
 
 
 class PuzzleCog(commands.Cog):
@@ -48,6 +52,8 @@ class PuzzleCog(commands.Cog):
         self.bot = bot
         self._current_discord_puzzles: dict[disnake.Guild, DiscordPuzzle] = {}
         self._message_counters: dict[disnake.Guild, Counter] = {}
+        self._decks: dict[int, PuzzleDeck] = {}
+        bot.timers.register(UNSOLVED_PUZZLE_TIMER, self._remove_unsolved_puzzle)
 
     @commands.Cog.listener()
     async def on_message(self, message: disnake.Message) -> None:
@@ -61,7 +67,7 @@ class PuzzleCog(commands.Cog):
 
         if discord_puzzle:
             puzzle, puzzle_message = discord_puzzle.puzzle, discord_puzzle.message
-            if message.content not in puzzle.answers:
+            if normalize_answer(message.content) not in discord_puzzle.answers:
                 logger.debug("puzzle exists on guild %s but asnwer is wrong", guild.id)
                 return
 
@@ -82,10 +88,10 @@ class PuzzleCog(commands.Cog):
                 )
             )
             asyncio.create_task(puzzle_message.delete())
-            discord_puzzle.remove_unsolved_task.cancel()
+            self.bot.timers.cancel(f'{UNSOLVED_PUZZLE_TIMER}:{guild.id}')
             del self._current_discord_puzzles[guild]
             Puzzles.delete().where(Puzzles.id == puzzle.id).execute()
-            change_balance(guild.id, author.id, puzzle.prize)
+            change_balance(guild.id, author.id, puzzle.prize, source=__name__)
             return
 
         counter = self._message_counters.setdefault(
@@ -96,9 +102,8 @@ class PuzzleCog(commands.Cog):
             logger.debug("puzzle counter on guild %s not ready", guild.id)
             return
 
-        try:
-            puzzle = Puzzles.get(Puzzles.guild == guild.id)
-        except DoesNotExist:
+        puzzle = await self._get_deck(guild.id).draw()
+        if puzzle is None:
             logger.debug("puzzle counter on guild %s ready, but no puzzle in db", guild.id)
             counter.remove_delay()
             return
@@ -118,11 +123,20 @@ class PuzzleCog(commands.Cog):
             embed=embed
         )
 
-        task = asyncio.create_task(self._remove_unsolved_puzzle(puzzle_message))
+        self.bot.timers.schedule(
+            f'{UNSOLVED_PUZZLE_TIMER}:{guild.id}',
+            UNSOLVED_PUZZLE_TIMER,
+            datetime.datetime.now() + datetime.timedelta(seconds=PUZZLE_TIMEOUT),
+            {
+                'guild_id': guild.id,
+                'channel_id': puzzle_message.channel.id,
+                'message_id': puzzle_message.id,
+            },
+        )
         self._current_discord_puzzles[guild] = DiscordPuzzle(
             puzzle_message,
-            task,
             puzzle,
+            normalize_answers(puzzle.answers),
         )
 
     @commands.slash_command(**only_admin)
@@ -157,50 +171,63 @@ class PuzzleCog(commands.Cog):
         )
 
         if not image_url:
-            asyncio.create_task(create_puzzle(inter.guild_id, text, re.split(r', |,', answers), None, prize))
+            asyncio.create_task(self._create_puzzle(inter.guild_id, text, re.split(r', |,', answers), None, prize))
             asyncio.create_task(inter.response.send_message(embed=created_puzzle_embed))
             return
 
         url = self._fix_image_url(image_url)
-        is_image = self._check_for_correct_url(url)
+        is_image = await self.bot.url_validator.is_image(url)
 
         if not is_image:
             asyncio.create_task(inter.response.send_message(t('invalid_link'), ephemeral=True))
             return
 
-        asyncio.create_task(create_puzzle(inter.guild_id, text, re.split(r', |,', answers), url, prize))
+        asyncio.create_task(self._create_puzzle(inter.guild_id, text, re.split(r', |,', answers), url, prize))
         created_puzzle_embed.set_image(url=url)
         asyncio.create_task(inter.response.send_message(embed=created_puzzle_embed))
 
-    async def _remove_unsolved_puzzle(self, message: disnake.Message) -> None:
-        logger.debug("Start remove unsolved puzzle")
-        await asyncio.sleep(PUZZLE_TIMEOUT)
+    def _get_deck(self, guild_id: int) -> PuzzleDeck:
+        return self._decks.setdefault(guild_id, PuzzleDeck(guild_id))
+
+    async def _create_puzzle(
+        self,
+        guild_id: int,
+        text: str,
+        answers: list[str],
+        image_url: Optional[str],
+        prize: int,
+    ) -> None:
+        puzzle = await run_db(create_puzzle, guild_id, text, answers, image_url, prize)
+        self._get_deck(guild_id).add(puzzle)
+
+    async def _remove_unsolved_puzzle(self, timer: Timer) -> None:
         logger.debug("Remove unsolved puzzle")
-        del self._current_discord_puzzles[message.guild]  # type: ignore
-        await message.delete()
+        guild = self.bot.get_guild(timer.payload['guild_id'])
+        if not guild:
+            return
+        discord_puzzle = self._current_discord_puzzles.get(guild)
+        if discord_puzzle and discord_puzzle.message.id == timer.payload['message_id']:
+            del self._current_discord_puzzles[guild]
+        channel = guild.get_channel(timer.payload['channel_id'])
+        if isinstance(channel, disnake.TextChannel):
+            # message object is lost if the bot was restarted
+            await channel.get_partial_message(timer.payload['message_id']).delete()
 
     def _fix_image_url(self, url) -> str:
         return url if any(ext in url for ext in ['.jpg', '.jpeg', '.png', '.gif',]) else url + '.jpg'
-    
-    def _check_for_correct_url(self, url) -> bool:
-        try:
-            response = requests.get(url)
-            return response.status_code == 200
-        except:
-            return False
 
 
 @create_related(Guilds)
 @psql_db.atomic()
-async def create_puzzle(
+def create_puzzle(
     guild_id: int,
     /,
     text: str,
     answers: list[str],
     image_url: Optional[str],
     prize: int,
-) -> None:
-    Puzzles.create(
+) -> Puzzles:
+    return Puzzles.create(
         guild=guild_id,
         text=text,
         answers=answers,
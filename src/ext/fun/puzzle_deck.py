@@ -0,0 +1,65 @@
+import random
+import re
+from typing import Iterable, Optional
+
+from src.database.models import Puzzles
+from src.database.executor import run_db
+
+
+_PUNCTUATION = re.compile(r'[^\w\s]|_')
+
+
+def normalize_answer(text: str) -> str:
+    """Answer without case, punctuation and extra spaces, ё is replaced with е"""
+    text = _PUNCTUATION.sub(' ', text.casefold().replace('ё', 'е'))
+    return ' '.join(text.split())
+
+
+def normalize_answers(answers: Iterable[str]) -> frozenset[str]:
+    return frozenset(filter(None, map(normalize_answer, answers)))
+
+
+class PuzzleDeck:
+    """
+    Puzzles of a guild in shuffled order
+
+    Puzzles are drawn without repeats until all of them are shown, then
+    the deck is loaded again and shuffled, so solved puzzles are dropped
+    and unsolved ones come back. The last shown puzzle is never drawn
+    twice in a row. Added puzzles are put to a random place among
+    the puzzles left.
+    """
+
+    def __init__(self, guild_id: int) -> None:
+        self.guild_id = guild_id
+        self._puzzles: list[Puzzles] = []
+        self._last_id: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._puzzles)
+
+    async def draw(self) -> Optional[Puzzles]:
+        if not self._puzzles:
+            await self._load()
+        if not self._puzzles:
+            return None
+        puzzle = self._puzzles.pop()
+        self._last_id = puzzle.id
+        return puzzle
+
+    def add(self, puzzle: Puzzles) -> None:
+        # an empty deck is loaded on the next draw with the new puzzle
+        if self._puzzles:
+            self._puzzles.insert(random.randint(0, len(self._puzzles)), puzzle)
+
+    async def _load(self) -> None:
+        puzzles = await run_db(_load_puzzles, self.guild_id)
+        random.shuffle(puzzles)
+        # puzzles are drawn from the end
+        if len(puzzles) > 1 and puzzles[-1].id == self._last_id:
+            puzzles[0], puzzles[-1] = puzzles[-1], puzzles[0]
+        self._puzzles = puzzles
+
+
+def _load_puzzles(guild_id: int) -> list[Puzzles]:
+    return list(Puzzles.select().where(Puzzles.guild == guild_id))
@@ -1,7 +1,9 @@
 from src.database.models import psql_db, Guilds, GameChannelSettings
 from src.database.services import create_related
+from src.database.settings_cache import settings_cache
 
 
+@settings_cache.cached(GameChannelSettings)
 @create_related(Guilds)
 @psql_db.atomic()
 def get_game_channel_settings(guild_id: int, /) -> GameChannelSettings:
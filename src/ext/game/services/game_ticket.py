@@ -14,6 +14,6 @@ def ensure_ticket(guild_id: int, user_id: int) -> None:
     if member.game_ticket_until and member.game_ticket_until > datetime.now():
         return
 
-    member = change_balance(guild_id, user_id, -GAME_TICKET_PRICE)
+    member = change_balance(guild_id, user_id, -GAME_TICKET_PRICE, source=__name__)
     member.game_ticket_until = datetime.now() + timedelta(days=1)
     member.save()
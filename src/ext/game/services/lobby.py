@@ -68,18 +68,19 @@ class Lobby:
 
         if not player.bot:
             ensure_ticket(self._guild_id, player.player_id)
-            change_balance(self._guild_id, player.player_id, -self._bet)
+            change_balance(self._guild_id, player.player_id, -self._bet, source=__name__)
         else:
             return
         self._players.add(player)
 
     def remove(self, player: Player) -> None:
         if not player.bot:
-            change_balance(self._guild_id, player.player_id, self._bet)
+            change_balance(self._guild_id, player.player_id, self._bet, source=__name__)
         self._players.remove(player)
 
     def remove_many(self, players: list[Player]) -> None:
-        change_balances(self._guild_id, [player.player_id for player in players], self._bet)
+        change_balances(self._guild_id, [player.player_id for player in players], self._bet,
+                        source=__name__)
         for player in players:
             self._players.remove(player)
 
@@ -89,6 +90,7 @@ class Lobby:
                 self._guild_id,
                 [player.player_id for player in self._players],
                 self._bet,
+                source=__name__,
             )
         self._players.clear()
 
@@ -1,6 +1,7 @@
 from typing import Sequence
 
 from src.database.models import GameStatistics, psql_db
+from src.database.leaderboards import leaderboards, Metric
 
 
 @psql_db.atomic()
@@ -10,3 +11,4 @@ def count_wins(guild_id: int, user_ids: Sequence[int], money_won: int) -> None:
         statistic.wins += 1
         statistic.money_won += money_won
         statistic.save()
+        leaderboards.update(guild_id, user_id, Metric.GAMES, statistic.wins, statistic.money_won)
@@ -6,6 +6,8 @@ from src.logger import get_logger
 from src.ext.game.views.game_interfaces.channel_base import ChannelGameInterface
 from src.ext.game.services.game_channel import GameChannel
 from src.ext.game.db_services import get_game_channel_settings
+from src.database.models import GameChannelSettings
+from src.database.settings_cache import settings_cache
 
 logger = get_logger()
 t = get_translator(route="ext.games")
@@ -57,6 +59,7 @@ class GameChannelView(disnake.ui.View):
         settings = get_game_channel_settings(self.guild.id)
         settings.messages_id[self.game_channel.game_name] = created_message_id # type: ignore
         settings.save()
+        settings_cache.invalidate(GameChannelSettings, self.guild.id)
 
 class RulesButton(disnake.ui.Button):
     view: GameChannelView
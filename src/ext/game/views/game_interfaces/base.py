@@ -108,4 +108,5 @@ class DiscordInterface(Generic[T], disnake.ui.View):
             self.guild.id,
             [player.player_id for player in result.winners if not player.bot],
             win_amount,
+            source=__name__,
         )
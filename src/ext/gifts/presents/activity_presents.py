@@ -54,8 +54,12 @@ class ActivityPresent(Presents):
             await interaction.response.send_message(t('not_enough_presents'), ephemeral = True)
             return
 
+        # present could be opened by a concurrent interaction after the check
+        if remove_activity_present(self.guild.id, self.user.id) is None: # type: ignore
+            await interaction.response.send_message(t('not_enough_presents'), ephemeral = True)
+            return
+
         present = self._get_activity_present()
-        remove_activity_present(self.guild.id, self.user.id) # type: ignore
         match present:
 
             case ActivityGifts.DEFAULT_PET | ActivityGifts.LEGENDARY_PET as rarity:
@@ -99,7 +103,8 @@ class ActivityPresent(Presents):
         change_balance(
             interaction.guild.id, # type: ignore
             interaction.user.id,
-            amount := random.randint(100, 500)
+            amount := random.randint(100, 500),
+            source=__name__,
         )
         await interaction.response.send_message(t("coins_got", amount=amount), ephemeral=True)
 
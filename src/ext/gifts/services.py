@@ -1,4 +1,8 @@
-from src.database.models import Gifts, psql_db
+from typing import Optional
+
+from src.database.models import Gifts, Guilds, Users, psql_db
+from src.database.services import create_related
+from src.database.counters import increment
 from src.logger import get_logger
 
 
@@ -17,39 +21,50 @@ def get_gifts(
     return gifts_data
 
 
+@create_related(Guilds, Users)
 @psql_db.atomic()
 def add_activity_present(
     guild_id: int,
     user_id: int,
+    /,
     amount: int = 1
 ) -> Gifts:
-    gifts_data = get_gifts(guild_id, user_id)
-    gifts_data.activity_presents += amount
-    gifts_data.save()
-    return gifts_data
+    return increment(
+        Gifts,
+        {Gifts.guild: guild_id, Gifts.user: user_id},
+        {Gifts.activity_presents: amount},
+    )
 
 
+@create_related(Guilds, Users)
 @psql_db.atomic()
 def add_role_peace(
     guild_id: int,
-    user_id: int
+    user_id: int,
+    /,
 ) -> Gifts:
-    gifts_data = get_gifts(guild_id, user_id)
-    gifts_data.role += 1
-    gifts_data.save()
-    return gifts_data
+    return increment(
+        Gifts,
+        {Gifts.guild: guild_id, Gifts.user: user_id},
+        {Gifts.role: 1},
+    )
 
 
+@create_related(Guilds, Users)
 @psql_db.atomic()
 def remove_activity_present(
     guild_id: int,
     user_id: int,
+    /,
     amount: int = 1,
-) -> Gifts:
-    gifts_data = get_gifts(guild_id, user_id)
-    gifts_data.activity_presents -= amount
-    gifts_data.save()
-    return gifts_data
+) -> Optional[Gifts]:
+    """Returns None if user doesn't have enough presents"""
+    return increment(
+        Gifts,
+        {Gifts.guild: guild_id, Gifts.user: user_id},
+        {Gifts.activity_presents: -amount},
+        floors={Gifts.activity_presents: 0},
+    )
 
 
 @psql_db.atomic()
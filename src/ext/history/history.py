@@ -1,7 +1,8 @@
+import datetime
 from typing import Union
 
 import disnake
-from disnake.ext import commands
+from disnake.ext import commands, tasks
 
 from src.discord_views.paginate.peewee_paginator import (PeeweePaginator,
                                                          PeeweeItemSelect)
@@ -11,15 +12,47 @@ from src.translation import get_translator
 from src.utils.table import DiscordTable
 from src.discord_views.embeds import DefaultEmbed
 from src.utils.slash_shortcuts import only_admin
+from src.settings import (HISTORY_RETENTION_MONTHS, HISTORY_ARCHIVE_DIR,
+                          HISTORY_PARTITIONS_AHEAD, HISTORY_SHOWN_MONTHS,
+                          HISTORY_FLUSH_INTERVAL)
+from src.database.executor import run_db
+from src.ext.history.services import history_journal
+from src.ext.history.partitions import (month_start, create_partitions,
+                                        detach_old_partitions, export_detached_partitions)
+from src.logger import get_logger
 from src.bot import SEBot
 
 
 t = get_translator(route='ext.history')
+logger = get_logger()
 
 
 class HistoryCog(commands.Cog):
     def __init__(self, bot: SEBot) -> None:
         self.bot = bot
+        self.flush_history.start()
+        self.maintain_partitions.start()
+
+    def cog_unload(self) -> None:
+        self.flush_history.cancel()
+        self.maintain_partitions.cancel()
+        history_journal.flush_sync()
+
+    @tasks.loop(seconds=HISTORY_FLUSH_INTERVAL)
+    async def flush_history(self) -> None:
+        try:
+            await history_journal.flush()
+        except Exception as error:  # pylint: disable=broad-except
+            logger.error('history flush failed: %s', repr(error))
+
+    @tasks.loop(hours=24)
+    async def maintain_partitions(self) -> None:
+        try:
+            await run_db(create_partitions, HISTORY_PARTITIONS_AHEAD)
+            await run_db(detach_old_partitions, HISTORY_RETENTION_MONTHS)
+            await run_db(export_detached_partitions, HISTORY_ARCHIVE_DIR)
+        except Exception as error:  # pylint: disable=broad-except
+            logger.error('history partitions maintenance failed: %s', repr(error))
 
     @commands.slash_command(**only_admin)
     async def history(
@@ -39,7 +72,14 @@ class HistoryPaginator(PeeweePaginator[History]):
             History,
             items_per_page=15,
             order_by=-History.id,  # type: ignore
-            filters={'guild': History.guild_id == guild.id},
+            filters={
+                'guild': History.guild_id == guild.id,
+                # only partitions of recent months are scanned
+                'recent': History.creation_time >= month_start(
+                    datetime.date.today(), -HISTORY_SHOWN_MONTHS,
+                ),
+            },
+            keyset=True,
         )
         self.add_paginator_item(HistorySelect())
         self._guild = guild
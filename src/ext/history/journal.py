@@ -0,0 +1,89 @@
+import asyncio
+import datetime
+from typing import Callable, NamedTuple, Optional
+
+from src.logger import get_logger
+from src.database.executor import run_db
+
+
+logger = get_logger()
+
+
+class HistoryEntry(NamedTuple):
+    guild_id: int
+    user_id: int
+    creation_time: datetime.datetime
+    action_name: str
+    description: str
+
+
+class HistoryJournal:
+    """
+    Queue history entries in memory and write them in batches
+
+    Batches are written one at a time in the order entries were added,
+    so history of every guild keeps its order.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[list[HistoryEntry]], None],
+        max_pending: int,
+    ) -> None:
+        self.max_pending = max_pending
+        self._write = write
+        self._pending: list[HistoryEntry] = []
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(
+        self,
+        guild_id: int,
+        user_id: int,
+        name: str,
+        description: str,
+    ) -> None:
+        self._pending.append(HistoryEntry(
+            guild_id,
+            user_id,
+            datetime.datetime.now(),
+            name,
+            description,
+        ))
+        if len(self._pending) >= self.max_pending and (
+            self._flush_task is None or self._flush_task.done()
+        ):
+            self._flush_task = asyncio.create_task(self._safe_flush())
+
+    async def flush(self) -> None:
+        """Write all queued entries"""
+        async with self._flush_lock:
+            entries = self._take_pending()
+            if not entries:
+                return
+            try:
+                await run_db(self._write, entries)
+            except Exception:
+                self._pending[:0] = entries
+                raise
+            logger.debug('%d history entries written', len(entries))
+
+    def flush_sync(self) -> None:
+        """Flush in the current thread, used when event loop is stopping"""
+        entries = self._take_pending()
+        if entries:
+            self._write(entries)
+
+    async def _safe_flush(self) -> None:
+        try:
+            await self.flush()
+        except Exception as error:  # pylint: disable=broad-except
+            logger.error('history flush failed: %s', repr(error))
+
+    def _take_pending(self) -> list[HistoryEntry]:
+        pending = self._pending
+        self._pending = []
+        return pending
@@ -0,0 +1,149 @@
+"""
+Monthly partitions of the history
+
+History is partitioned by creation time. Partitions are created a few
+months in advance. Rows of months without a partition are kept in the
+default partition and moved to the month partition when it's created.
+Partitions older than the retention are detached, exported to gzipped
+JSON lines files and dropped.
+"""
+import datetime
+import gzip
+import json
+import os
+from typing import Optional
+
+from src.database.models import psql_db
+from src.logger import get_logger
+
+
+logger = get_logger()
+# rows fetched from the server at once while exporting
+EXPORT_BATCH = 5000
+DEFAULT_PARTITION = 'history_default'
+_COLUMNS = ('id', 'guild_id', 'user_id', 'creation_time', 'action_name', 'description')
+
+
+def month_start(day: datetime.date, shift: int = 0) -> datetime.date:
+    """First day of the month, `shift` months after the month of the day"""
+    months = day.year * 12 + day.month - 1 + shift
+    return datetime.date(months // 12, months % 12 + 1, 1)
+
+
+def partition_name(month: datetime.date) -> str:
+    return f'history_y{month.year}m{month.month:02}'
+
+
+def parse_partition_name(name: str) -> Optional[datetime.date]:
+    if not name.startswith('history_y'):
+        return None
+    try:
+        year, month = name.removeprefix('history_y').split('m')
+        return datetime.date(int(year), int(month), 1)
+    except ValueError:
+        return None
+
+
+@psql_db.atomic()
+def create_partitions(months_ahead: int) -> None:
+    """
+    Create partitions of the current month and following months
+
+    Partitions are created for months of rows in the default partition
+    too, such rows are moved there.
+    """
+    current = month_start(datetime.date.today())
+    months = {month_start(current, shift) for shift in range(months_ahead + 1)}
+    months.update(month for month, in psql_db.execute_sql(
+        f"SELECT DISTINCT date_trunc('month', creation_time)::date FROM {DEFAULT_PARTITION};"
+    ).fetchall())
+    for month in sorted(months):
+        _create_partition(month)
+
+
+def _create_partition(month: datetime.date) -> None:
+    name = partition_name(month)
+    bounds = (month, month_start(month, 1))
+    moved = psql_db.execute_sql(
+        f'SELECT 1 FROM {DEFAULT_PARTITION} '
+        'WHERE creation_time >= %s AND creation_time < %s LIMIT 1;',
+        bounds,
+    ).fetchone()
+    if not moved:
+        psql_db.execute_sql(
+            f'CREATE TABLE IF NOT EXISTS {name} PARTITION OF history '
+            'FOR VALUES FROM (%s) TO (%s);',
+            bounds,
+        )
+        return
+
+    # partition can't be created while the default one has rows of its month
+    psql_db.execute_sql(f"""
+        CREATE TABLE {name} (LIKE history INCLUDING DEFAULTS INCLUDING CONSTRAINTS);
+        WITH moved AS (
+            DELETE FROM {DEFAULT_PARTITION}
+            WHERE creation_time >= %(start)s AND creation_time < %(end)s
+            RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved;
+        ALTER TABLE history ATTACH PARTITION {name} FOR VALUES FROM (%(start)s) TO (%(end)s);
+    """, {'start': bounds[0], 'end': bounds[1]})
+    logger.info('history rows moved from the default partition to %s', name)
+
+
+@psql_db.atomic()
+def detach_old_partitions(retention_months: int) -> list[str]:
+    """Detach partitions of months before the retention, return their names"""
+    oldest_kept = month_start(datetime.date.today(), -retention_months)
+    rows = psql_db.execute_sql("""
+        SELECT child.relname FROM pg_inherits
+        INNER JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        INNER JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        WHERE parent.relname = 'history';
+    """).fetchall()
+
+    detached = []
+    for name, in rows:
+        month = parse_partition_name(name)
+        if month is not None and month < oldest_kept:
+            psql_db.execute_sql(f'ALTER TABLE history DETACH PARTITION {name};')
+            detached.append(name)
+            logger.info('history partition %s detached', name)
+    return detached
+
+
+def export_detached_partitions(directory: str) -> list[str]:
+    """Export detached partitions to the directory and drop them"""
+    names = [name for name, in psql_db.execute_sql(r"""
+        SELECT relname FROM pg_class
+        WHERE relkind = 'r' AND NOT relispartition AND relname LIKE 'history\_y%%'
+        ORDER BY relname;
+    """).fetchall() if parse_partition_name(name) is not None]
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for name in names:
+        paths.append(_export_partition(name, directory))
+    return paths
+
+
+@psql_db.atomic()
+def _export_partition(name: str, directory: str) -> str:
+    path = os.path.join(directory, f'{name}.jsonl.gz')
+    temporary_path = f'{path}.part'
+    count = 0
+    # named cursor streams rows from the server in batches
+    with psql_db.connection().cursor(name=f'export_{name}') as cursor:
+        cursor.itersize = EXPORT_BATCH
+        cursor.execute(f'SELECT {", ".join(_COLUMNS)} FROM {name} ORDER BY id;')
+        with gzip.open(temporary_path, 'wt', encoding='utf-8') as file:
+            for row in cursor:
+                entry = dict(zip(_COLUMNS, row))
+                entry['creation_time'] = entry['creation_time'].isoformat()
+                file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                count += 1
+    os.replace(temporary_path, path)
+
+    psql_db.execute_sql(f'DROP TABLE {name};')
+    logger.info('history partition %s with %d entries archived to %s', name, count, path)
+    return path
@@ -1,24 +1,37 @@
+from src.settings import HISTORY_MAX_PENDING
 from src.database.models import Users, psql_db, Guilds, History
-from src.database.services import create_related
+from src.database.services import provide_related
+from src.ext.history.journal import HistoryJournal, HistoryEntry
 from src.logger import get_logger
 
 
 logger = get_logger()
 
 
-@create_related(Guilds, Users)
 @psql_db.atomic()
+def write_history(entries: list[HistoryEntry]) -> None:
+    provide_related(
+        [Guilds] * len(entries) + [Users] * len(entries),
+        [entry.guild_id for entry in entries] + [entry.user_id for entry in entries],
+    )
+    History.insert_many(entries, fields=[
+        History.guild_id,
+        History.user_id,
+        History.creation_time,
+        History.action_name,
+        History.description,
+    ]).execute()
+
+
+history_journal = HistoryJournal(write_history, HISTORY_MAX_PENDING)
+
+
 def make_history(
     guild_id: int,
     user_id: int,
     /,
     name: str,
     description: str,
-) -> History:
-    action = History.create(
-        guild_id=guild_id,
-        user_id=user_id,
-        action_name=name,
-        description=description,
-    )
-    return action
+) -> None:
+    """Add action to the history, it's written by the next journal flush"""
+    history_journal.add(guild_id, user_id, name, description)
@@ -2,6 +2,7 @@ import disnake
 from disnake.ext import commands
 
 from src.database.services import get_member
+from src.database.leaderboards import leaderboards
 from src.logger import get_logger
 from src.bot import SEBot
 
@@ -22,6 +23,8 @@ class OnGuildCog(commands.Cog):
         if member_data.on_guild is not True:
             member_data.on_guild = True
             member_data.save()
+            # returned member may have scores unknown to the leaderboards
+            leaderboards.invalidate(guild_id)
 
     @commands.Cog.listener()
     async def on_member_remove(self, member: disnake.Member) -> None:
@@ -32,6 +35,7 @@ class OnGuildCog(commands.Cog):
         if member_data.on_guild is not False:
             member_data.on_guild = False
             member_data.save()
+            leaderboards.remove_member(guild_id, member_id)
 
 
 def setup(bot) -> None:
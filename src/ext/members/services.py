@@ -5,11 +5,16 @@ from src.database.models import (Guilds, Users, psql_db,
                                  Likes, Members, UserRoles,
                                  WelcomeSettings, RolesInventory)
 from src.database.services import get_member, create_related
+from src.database.settings_cache import settings_cache
+from src.database.leaderboards import leaderboards, Metric
+from src.ext.economy import ledger
+from src.ext.economy.services import CurrencyType
 
 
 logger = get_logger()
 
 
+@settings_cache.cached(WelcomeSettings)
 @create_related(Guilds)
 @psql_db.atomic()
 def get_welcome_settings(guild_id: int, /) -> WelcomeSettings:
@@ -122,6 +127,7 @@ def reset_members_activity(guild_id: int) -> None:
     .update(monthly_chat_activity = 0)
     .where(Members.guild_id == guild_id)
     .execute())
+    leaderboards.reset(guild_id, Metric.MONTHLY_ACTIVITY)
 
 
 @psql_db.atomic()
@@ -129,7 +135,12 @@ def give_activity_rewards(guild_id: int, rewards: dict[int, str]) -> None:
     logger.info("give monthly rewards to active members")
     awarded = Members.select().order_by(Members.monthly_chat_activity.desc()).limit(len(rewards))
     for index, user in enumerate(awarded, 1):
-        (Members
+        updated = (Members
         .update({Members.balance: Members.balance + int(rewards[index])})
         .where((Members.user_id == user.user_id) & (Members.guild_id == guild_id))
-        .execute())
\ No newline at end of file
+        .returning(Members.user_id, Members.guild_id, Members.on_guild, Members.balance)
+        .execute())
+        for member in updated:
+            ledger.record(guild_id, member.get_id()[0], int(rewards[index]),
+                          CurrencyType.COIN.value, source=__name__)
+            leaderboards.update_member(member, Metric.BALANCE)
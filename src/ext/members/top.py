@@ -1,12 +1,9 @@
-from typing import Sequence
 import disnake
-from disnake.ext import commands
-import peewee
-from datetime import datetime
-from dateutil.relativedelta import relativedelta
-import asyncio
+from disnake.ext import commands, tasks
 
-from src.database.models import Members, Likes, GameStatistics, psql_db, RelationshipTopEntry
+from src.database.models import psql_db, RelationshipTopEntry
+from src.database.leaderboards import leaderboards, Metric, LeaderboardEntry
+from src.database.executor import run_db
 from src.formatters import ordered_list
 from src.discord_views.embeds import DefaultEmbed
 from src.utils.experience import format_exp
@@ -17,6 +14,7 @@ from src.translation import get_translator
 from src.discord_views.base_view import BaseView
 from src.logger import get_logger
 from src.bot import SEBot
+from src.settings import LEADERBOARD_RESYNC_INTERVAL
 
 
 
@@ -25,6 +23,7 @@ logger = get_logger()
 t = get_translator(route="ext.top")
 TOP_SIZE = 10
 REWARD_CHANNEL = 1216474823610339469 # change for correct guild
+MONTHLY_REWARDS_JOB = 'monthly_rewards'
 REWARDS = {
     1: "2000",
     2: "1000",
@@ -34,45 +33,34 @@ REWARDS = {
 class TopCog(commands.Cog):
     def __init__(self, bot: SEBot) -> None:
         self.bot = bot
-        self.is_listener_started = False
-
-
-    @commands.Cog.listener()    
-    async def on_ready(self):
-        if self.is_listener_started:
-            logger.debug("month listener has already started")
-            return
-        
-        await self.start_month_listener()
-
-
-    async def start_month_listener(self):
-        self.is_listener_started = True
+        self.resync_leaderboards.start()
+        bot.scheduler.add_job(MONTHLY_REWARDS_JOB, '0 0 1 * *', self.sum_up_month)
+
+    def cog_unload(self) -> None:
+        self.resync_leaderboards.cancel()
+        self.bot.scheduler.remove_job(MONTHLY_REWARDS_JOB)
+
+    @tasks.loop(seconds=LEADERBOARD_RESYNC_INTERVAL)
+    async def resync_leaderboards(self) -> None:
+        # boards are updated incrementally, full reload fixes drift
+        # from rolled back transactions and manual database changes
+        try:
+            await run_db(leaderboards.load)
+        except Exception as error:  # pylint: disable=broad-except
+            logger.error('leaderboards loading failed: %s', repr(error))
+
+    async def sum_up_month(self) -> None:
         channel = self.bot.get_channel(REWARD_CHANNEL)
         if not isinstance(channel, disnake.TextChannel):
             logger.error("can not get text channel for month listener")
             return
-        logger.debug("month listener started successfully")
-        while True:
-            current_time = datetime.now()
-            if current_time.day == 1 and current_time.hour == 0 and current_time.minute == 0:                
-                guild_id = channel.guild.id
-
-                try:
-                    logger.info("sending message with rewards on guild: %s", channel.guild)
-                    await channel.send(embed=create_rewards_embed(guild_id))
-                    
-                    give_activity_rewards(guild_id, REWARDS)
-                    reset_members_activity(guild_id)
-                except Exception as e:
-                    logger.error("tried to sum up the month but an error occured: %s", repr(e))
-
-            next_month = current_time + relativedelta(months=1, day=1, hour=0, minute=0, second=0)
-            delta_seconds = (next_month - current_time).total_seconds()
- 
-            logger.debug("listener will sleep for %d seconds", delta_seconds)
-            await asyncio.sleep(delta_seconds)  
-        
+
+        guild_id = channel.guild.id
+        logger.info("sending message with rewards on guild: %s", channel.guild)
+        await channel.send(embed=await create_rewards_embed(guild_id))
+
+        await run_db(give_activity_rewards, guild_id, REWARDS)
+        await run_db(reset_members_activity, guild_id)
 
     @commands.slash_command()
     async def top(
@@ -104,7 +92,7 @@ class TopView(BaseView):
 
     async def _response(self, inter: disnake.ApplicationCommandInteraction) -> None:
         await inter.response.send_message(
-            embed=list(self.top_map.values())[0](self.guild_id),
+            embed=await list(self.top_map.values())[0](self.guild_id),
             view=self,
         )
 
@@ -127,69 +115,11 @@ class TopSelect(disnake.ui.Select):
     ) -> None:
         name = self.values[0]
         await interaction.response.edit_message(
-            embed=self.view.top_map[name](self.view.guild_id),
+            embed=await self.view.top_map[name](self.view.guild_id),
             view=self.view,
         )
 
 
-def _build_members_top_query(
-    guild_id: int,
-    ordering: peewee.Ordering,
-):
-    return (
-        Members.
-        select(Members).
-        where((Members.guild_id == guild_id) & (Members.on_guild == True)).  # noqa
-        order_by(ordering).  # type: ignore
-        limit(TOP_SIZE)
-    )
-
-
-def _build_voice_top_query(guild_id: int):
-    return _build_members_top_query(
-        guild_id=guild_id,
-        ordering=-Members.voice_activity,  # type: ignore
-    )
-
-
-def _build_balance_top_query(guild_id: int):
-    return _build_members_top_query(
-        guild_id=guild_id,
-        ordering=-Members.balance,  # type: ignore
-    )
-
-
-def _build_experience_top_query(guild_id: int):
-    return _build_members_top_query(
-        guild_id=guild_id,
-        ordering=-Members.experience,  # type: ignore
-    )
-
-def _build_chat_activity_top_query(guild_id: int):
-    return _build_members_top_query(
-        guild_id=guild_id,
-        ordering=-Members.monthly_chat_activity, # type: ignore
-    )
-
-def _build_reputation_top_query(guild_id: int):
-    reputation_sum = peewee.fn.COALESCE(peewee.fn.sum(Likes.type), 0)
-    return (
-        Members.select(
-            Members.user_id,
-            reputation_sum.alias('reputation'),
-        ).
-        join(
-            Likes,
-            join_type=peewee.JOIN.LEFT_OUTER,
-            on=Members.user_id == Likes.to_user_id
-        ).
-        where((Members.guild_id == guild_id) & (Members.on_guild == True)).  # type: ignore # noqa
-        order_by(peewee.SQL('reputation DESC')).
-        group_by(Members.user_id).
-        limit(TOP_SIZE)
-    )
-
-
 def _build_relations_top_query(guild_id: int) -> list[RelationshipTopEntry]:
     querry = """
     WITH rp AS (
@@ -215,23 +145,11 @@ def _build_relations_top_query(guild_id: int) -> list[RelationshipTopEntry]:
     return [RelationshipTopEntry(*entry) for entry in entrys]
 
 
-def _build_games_top_query(guild_id: int) -> Sequence[GameStatistics]:
-    return GameStatistics.select().where(
-        GameStatistics.guild == guild_id
-    ).join(
-        Members, on=(
-            (GameStatistics.guild == Members.guild_id) &
-            (GameStatistics.user == Members.user_id))
-    ).where(
-        Members.on_guild == True
-    ).order_by(-GameStatistics.wins).limit(TOP_SIZE)
-
-
-def create_voice_top_embed(guild_id: int) -> disnake.Embed:
-    query = _build_voice_top_query(guild_id)
+async def create_voice_top_embed(guild_id: int) -> disnake.Embed:
+    top = await leaderboards.top(guild_id, Metric.VOICE, TOP_SIZE)
     desc = ordered_list(
-        query,
-        lambda item: f'<@{item.user_id}> — {display_time(item.voice_activity)}'  # noqa
+        top,
+        lambda item: f'<@{item.user_id}> — {display_time(item.score)}'  # noqa
     )
     return DefaultEmbed(
         title=t('top_voice'),
@@ -239,23 +157,23 @@ def create_voice_top_embed(guild_id: int) -> disnake.Embed:
     )
 
 
-def create_experience_top_embed(guild_id: int) -> disnake.Embed:
-    query = _build_experience_top_query(guild_id)
+async def create_experience_top_embed(guild_id: int) -> disnake.Embed:
+    top = await leaderboards.top(guild_id, Metric.EXPERIENCE, TOP_SIZE)
     desc = ordered_list(
-        query,
-        lambda item: f'<@{item.user_id}> — {format_exp(item.experience)}'  # noqa
+        top,
+        lambda item: f'<@{item.user_id}> — {format_exp(item.score)}'  # noqa
     )
     return DefaultEmbed(
         title=t('top_experience'),
         description=desc,
     )
 
-def create_chat_activity_top_embed(guild_id: int) -> disnake.Embed:
-    query = _build_chat_activity_top_query(guild_id)
+async def create_chat_activity_top_embed(guild_id: int) -> disnake.Embed:
+    query = await leaderboards.top(guild_id, Metric.MONTHLY_ACTIVITY, TOP_SIZE)
     settings = get_economy_settings(guild_id)
     top = ordered_list(
         query,
-        lambda item: f'<@{item.user_id}> — **{item.monthly_chat_activity}** опыта'
+        lambda item: f'<@{item.user_id}> — **{item.score}** опыта'
     ).split('\n')
     desc = '\n'.join([item + f'  **|**  {REWARDS[index + 1]} {settings.coin}' if index < len(REWARDS) else item for index, item in enumerate(top)])
     return DefaultEmbed(
@@ -263,8 +181,8 @@ def create_chat_activity_top_embed(guild_id: int) -> disnake.Embed:
         description=desc,
     )   
 
-def create_rewards_embed(guild_id: int) -> disnake.Embed:
-    query = _build_chat_activity_top_query(guild_id)
+async def create_rewards_embed(guild_id: int) -> disnake.Embed:
+    query = await leaderboards.top(guild_id, Metric.MONTHLY_ACTIVITY, len(REWARDS))
     settings = get_economy_settings(guild_id)
     top = ordered_list(
         query,
@@ -280,12 +198,12 @@ def create_rewards_embed(guild_id: int) -> disnake.Embed:
     embed.set_image(url='https://imgur.com/Xp7Gni2.jpg')
     return embed
 
-def create_balance_top_embed(guild_id: int) -> disnake.Embed:
-    query = _build_balance_top_query(guild_id)
+async def create_balance_top_embed(guild_id: int) -> disnake.Embed:
+    top = await leaderboards.top(guild_id, Metric.BALANCE, TOP_SIZE)
     settings = get_economy_settings(guild_id)
     desc = ordered_list(
-        query,
-        lambda item: f'<@{item.user_id}> — {item.balance} {settings.coin}'
+        top,
+        lambda item: f'<@{item.user_id}> — {item.score} {settings.coin}'
     )
     return DefaultEmbed(
         title=t('top_balance'),
@@ -293,11 +211,11 @@ def create_balance_top_embed(guild_id: int) -> disnake.Embed:
     )
 
 
-def create_reputation_top_embed(guild_id: int) -> disnake.Embed:
-    query = _build_reputation_top_query(guild_id)
+async def create_reputation_top_embed(guild_id: int) -> disnake.Embed:
+    top = await leaderboards.top(guild_id, Metric.REPUTATION, TOP_SIZE)
     desc = ordered_list(
-        query,
-        lambda item: f'<@{item.user_id}> — {item.reputation} :revolving_hearts:'  # noqa
+        top,
+        lambda item: f'<@{item.user_id}> — {item.score} :revolving_hearts:'  # noqa
     )
     return DefaultEmbed(
         title=t('top_reputation'),
@@ -305,8 +223,8 @@ def create_reputation_top_embed(guild_id: int) -> disnake.Embed:
     )
 
 
-def create_relationships_top_embed(guild_id: int) -> disnake.Embed:
-    items = _build_relations_top_query(guild_id)
+async def create_relationships_top_embed(guild_id: int) -> disnake.Embed:
+    items = await run_db(_build_relations_top_query, guild_id)
 
     def formatter(item: RelationshipTopEntry) -> str:
         first_user = f'<@{item.first_user_id}>'
@@ -326,21 +244,21 @@ def create_relationships_top_embed(guild_id: int) -> disnake.Embed:
     )
 
 
-def create_games_top_embed(guild_id: int) -> disnake.Embed:
-    query = _build_games_top_query(guild_id)
+async def create_games_top_embed(guild_id: int) -> disnake.Embed:
+    top = await leaderboards.top(guild_id, Metric.GAMES, TOP_SIZE)
     economy_settings = get_economy_settings(guild_id)
     coin = economy_settings.coin
 
-    def formatter(item: GameStatistics) -> str:
+    def formatter(item: LeaderboardEntry) -> str:
         return t(
             'games_repr',
-            user_id=item.user_id,  # type: ignore
-            wins=t('wins', count=item.wins),
-            money=item.money_won,
+            user_id=item.user_id,
+            wins=t('wins', count=item.score),
+            money=item.extra,
             coin=coin,
         )
     desc = ordered_list(
-        query,
+        top,
         formatter
     )
     return DefaultEmbed(
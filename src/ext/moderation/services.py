@@ -1,11 +1,14 @@
-from src.database.models import Members, psql_db, Guilds, ModerationSettings
+from src.database.models import Members, psql_db, Guilds, Users, ModerationSettings
 from src.database.services import get_member, create_related
+from src.database.counters import increment
+from src.database.settings_cache import settings_cache
 from src.logger import get_logger
 
 
 logger = get_logger()
 
 
+@settings_cache.cached(ModerationSettings)
 @create_related(Guilds)
 @psql_db.atomic()
 def get_moderation_settings(guild_id: int, /) -> ModerationSettings:
@@ -15,23 +18,32 @@ def get_moderation_settings(guild_id: int, /) -> ModerationSettings:
     return settings
 
 
+@create_related(Guilds, Users)
 @psql_db.atomic()
 def add_warn(
     guild_id: int,
     user_id: int,
+    /,
 ) -> Members:
-    member = get_member(guild_id, user_id)
-    member.warns += 1
-    member.save()
-    return member
+    return increment(
+        Members,
+        {Members.guild_id: guild_id, Members.user_id: user_id},
+        {Members.warns: 1},
+    )
 
 
+@create_related(Guilds, Users)
 @psql_db.atomic()
 def remove_warn(
     guild_id: int,
     user_id: int,
+    /,
 ) -> Members:
-    member = get_member(guild_id, user_id)
-    member.warns -= 1
-    member.save()
-    return member
+    member = increment(
+        Members,
+        {Members.guild_id: guild_id, Members.user_id: user_id},
+        {Members.warns: -1},
+        floors={Members.warns: 0},
+    )
+    # member has no warns
+    return member or get_member(guild_id, user_id)
@@ -1,4 +1,4 @@
-import asyncio
+import datetime
 from dataclasses import dataclass
 from typing import Union
 
@@ -7,18 +7,21 @@ import disnake
 from disnake.ext import commands
 
 from src.database.models import EconomySettings, PersonalVoice
+from src.database.settings_cache import settings_cache
 from src.custom_errors import CriticalException
 from src.logger import get_logger
 from src.translation import get_translator
 from src.ext.personal_voice.services import (get_voice_channel_by_id, get_voice_channel,
                                              update_voice_state)
 from src.ext.economy.services import get_economy_settings
+from src.timers import Timer
 from src.bot import SEBot
 
 
 t = get_translator(route="ext.personal_voice")
 logger = get_logger()
 RPIVATE_VOICE_DELETE_TIMER = 60
+CHANNEL_DELETE_TIMER = 'voice_delete'
 
 
 @dataclass
@@ -72,7 +75,7 @@ class PersonalVoiceControllerCog(commands.Cog):
     def __init__(self, bot: SEBot) -> None:
         self.bot = bot
         self._checked_categories: set[int] = set()
-        self._chennel_delete_tasks: dict[int, asyncio.Task] = {}
+        bot.timers.register(CHANNEL_DELETE_TIMER, self._delete_channel)
 
     @commands.Cog.listener()
     async def on_guild_channel_update(
@@ -153,6 +156,7 @@ class PersonalVoiceControllerCog(commands.Cog):
             channel = await category.create_voice_channel(t('main_voice_default_name'))
             settings.main_voice_id = channel.id
             settings.save()
+            settings_cache.invalidate(EconomySettings, category.guild.id)
 
     async def _handle_main_voice_join(
         self,
@@ -214,31 +218,29 @@ class PersonalVoiceControllerCog(commands.Cog):
                 self._check_voice_for_delete(channel, settings)
 
     def _check_private_voice_for_delete(self, voice_channel: disnake.VoiceChannel) -> None:
+        key = f'{CHANNEL_DELETE_TIMER}:{voice_channel.id}'
         if not self._is_useless(voice_channel):
-            if task := self._chennel_delete_tasks.get(voice_channel.id):
+            if self.bot.timers.cancel(key):
                 logger.info("canceling channel_delete_task for %d voice_channel", voice_channel.id)
-                del self._chennel_delete_tasks[voice_channel.id]
-                res = task.cancel()
-                if not res:
-                    raise CriticalException('Task cancaled or done without removing from tasks map')
-        else:
-            async def channel_delete_task() -> None:
-                logger.info("starts channel_delete_task for %d voice_channel on %d guild",
-                            voice_channel.id, voice_channel.guild.id)
-                await asyncio.sleep(RPIVATE_VOICE_DELETE_TIMER)
-
-                del self._chennel_delete_tasks[voice_channel.id]
-
-                guild = self.bot.get_guild(voice_channel.guild.id)
-                if not guild:
-                    return
-                channel = guild.get_channel(voice_channel.id)
-                if channel:
-                    logger.info("delete %d voice_channel", voice_channel.id)
-                    await channel.delete()
-
-            task = asyncio.create_task(channel_delete_task())
-            self._chennel_delete_tasks[voice_channel.id] = task
+        elif not self.bot.timers.get(key):
+            logger.info("starts channel_delete_task for %d voice_channel on %d guild",
+                        voice_channel.id, voice_channel.guild.id)
+            self.bot.timers.schedule(
+                key,
+                CHANNEL_DELETE_TIMER,
+                datetime.datetime.now() + datetime.timedelta(seconds=RPIVATE_VOICE_DELETE_TIMER),
+                {'guild_id': voice_channel.guild.id, 'channel_id': voice_channel.id},
+            )
+
+    async def _delete_channel(self, timer: Timer) -> None:
+        guild = self.bot.get_guild(timer.payload['guild_id'])
+        if not guild:
+            return
+        channel = guild.get_channel(timer.payload['channel_id'])
+        # members could join while the bot was offline
+        if isinstance(channel, disnake.VoiceChannel) and self._is_useless(channel):
+            logger.info("delete %d voice_channel", channel.id)
+            await channel.delete()
 
     def _is_useless(self, voice_channel: disnake.VoiceChannel) -> bool:
         if not voice_channel.members:
@@ -186,7 +186,8 @@ class BuyVoiceSelect(disnake.ui.Select):
         change_balance(
             guild_id=guild.id,
             user_id=author.id,
-            amount=-settings.voice_price
+            amount=-settings.voice_price,
+            source=__name__,
         )
 
         voice = await category.create_voice_channel(
@@ -333,7 +334,8 @@ def _buy_slot(
         amount=-_count_next_slot_price(
             voice.slots,
             settings.slot_price,
-        )
+        ),
+        source=__name__,
     )
     voice.slots += 1
     voice.save()
@@ -352,7 +354,8 @@ def _buy_bitrate(
         amount=-_count_next_bitrate_price(
             voice.max_bitrate,
             settings.bitrate_price,
-        )
+        ),
+        source=__name__,
     )
     voice.max_bitrate = _get_next_bitrate(voice.max_bitrate)
     voice.save()
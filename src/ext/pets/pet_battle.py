@@ -1,8 +1,5 @@
 import disnake
 from disnake.ext import commands
-from datetime import datetime
-import asyncio
-from dateutil.relativedelta import relativedelta
 
 from src.bot import SEBot
 from src.logger import get_logger
@@ -13,19 +10,21 @@ from src.ext.pets.views.start import PetBattleView
 
 logger = get_logger()
 t = get_translator(route='ext.pets')
+ENERGY_RESET_JOB = 'pets_energy_reset'
 
 
 class PetBattleCog(commands.Cog):
     def __init__(self, bot: SEBot):
         self.bot = bot
-        self._is_reseter_started: bool = False
+        bot.scheduler.add_job(ENERGY_RESET_JOB, '0 0 * * *', reset_pets_energy)
+
+    def cog_unload(self) -> None:
+        self.bot.scheduler.remove_job(ENERGY_RESET_JOB)
 
     @commands.Cog.listener()
     async def on_ready(self) -> None:
         try: 
             await self._setup_pet_battle_message()
-            if not self._is_reseter_started:
-                await self._start_daily_energy_reseter()
 
         except Exception as e:
             logger.error("tried to setup pet battle but an error occured: %s", repr(e))
@@ -47,24 +46,5 @@ class PetBattleCog(commands.Cog):
             view = PetBattleView(self.bot, guild, game_channel, game_message)
             await view.create_or_update_game_message()
 
-    async def _start_daily_energy_reseter(self):
-        self._is_reseter_started = True
-        logger.debug("energy reseter started successfully")
-        while True:
-            current_time = datetime.now()
-            if current_time.hour == 0 and current_time.minute == 0:                
-                try:
-                    reset_pets_energy()
-                    logger.info("pets' energy reseted successfully")
-                except Exception as e:
-                    logger.error("tried to reset pet's energy but an error occured: %s", repr(e))
-
-            next_day = current_time + relativedelta(days=1)
-            next_day = datetime.combine(next_day, datetime.min.time())
-            delta_seconds = (next_day - current_time).total_seconds()
-
-            logger.debug("reseter will sleep for %d seconds", delta_seconds)
-            await asyncio.sleep(delta_seconds)
-
 def setup(bot: SEBot) -> None:
     bot.add_cog(PetBattleCog(bot))
\ No newline at end of file
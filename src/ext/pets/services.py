@@ -2,15 +2,19 @@ from __future__ import annotations
 from typing import Optional, TYPE_CHECKING
 from datetime import datetime
 
+from peewee import fn
+
 from src.database.models import (
     Pets, psql_db, UserPets,
     PetBattleSettings, AuctionPet,
-    AuctionMail
+    AuctionMail, Guilds, Users
 )
 from src.logger import get_logger
 from src.ext.economy.services import change_balance, CurrencyType
 from src.custom_errors import NotEnoughFeedStuff, ItemAlreadySold
-from src.database.services import get_member
+from src.database.services import get_member, create_related
+from src.database.counters import increment
+from src.database.settings_cache import settings_cache
 
 if TYPE_CHECKING:
     from src.ext.pets.classes import Specialization
@@ -172,6 +176,7 @@ def rename_pet(
     return pet
 
 
+@settings_cache.cached(PetBattleSettings)
 @psql_db.atomic()
 def get_pet_battle_settings(
     guild_id: int
@@ -190,6 +195,7 @@ def create_game_channel_message(
     settings = get_pet_battle_settings(guild_id)
     settings.game_message = message_id
     settings.save()
+    settings_cache.invalidate(PetBattleSettings, guild_id)
     return settings
 
 
@@ -225,33 +231,36 @@ def get_feed_stuff(
     return user_pet_data.feed_stuff
 
 
+@create_related(Guilds, Users)
 @psql_db.atomic()
 def remove_feed_stuff(
     guild_id: int,
-    user_id: int
+    user_id: int,
+    /,
 ) -> UserPets:
-    user_pet_data = get_user_pet(
-        guild_id, user_id
+    user_pet_data = increment(
+        UserPets,
+        {UserPets.guild: guild_id, UserPets.user: user_id},
+        {UserPets.feed_stuff: -1},
+        floors={UserPets.feed_stuff: 0},
     )
-    if user_pet_data.feed_stuff <= 0:
+    if user_pet_data is None:
         raise NotEnoughFeedStuff
-    
-    user_pet_data.feed_stuff -= 1
-    user_pet_data.save()
     return user_pet_data
 
 
+@create_related(Guilds, Users)
 @psql_db.atomic()
 def add_feed_stuff(
     guild_id: int,
-    user_id: int
+    user_id: int,
+    /,
 ) -> UserPets:
-    user_pet_data = get_user_pet(
-        guild_id, user_id
+    return increment(
+        UserPets,
+        {UserPets.guild: guild_id, UserPets.user: user_id},
+        {UserPets.feed_stuff: 1},
     )
-    user_pet_data.feed_stuff += 1
-    user_pet_data.save()
-    return user_pet_data
 
 
 @psql_db.atomic()
@@ -263,10 +272,12 @@ def feed_pet(
     remove_feed_stuff(
         guild_id, user_id
     )
-    pet = get_pet_by_id(pet_id)
-    pet.health = min(pet.health + 20, pet.max_health)
-    pet.save()
-    return pet
+    return _updated_pet(
+        Pets.
+        update(health=fn.LEAST(Pets.health + 20, Pets.max_health)).
+        where(Pets.id == pet_id),
+        pet_id,
+    )
 
 
 @psql_db.atomic()
@@ -278,12 +289,15 @@ def restore_energy(
 ) -> Pets:
     change_balance(
         guild_id, user_id, -amount,
-        currency=CurrencyType.CRYSTAL
+        currency=CurrencyType.CRYSTAL,
+        source=__name__,
+    )
+    return _updated_pet(
+        Pets.
+        update(energy=Pets.max_energy).
+        where(Pets.id == pet_id),
+        pet_id,
     )
-    pet = get_pet_by_id(pet_id)
-    pet.energy = pet.max_energy
-    pet.save()
-    return pet
 
 
 @psql_db.atomic()
@@ -293,7 +307,8 @@ def buy_feed_stuff(
     price: int
 ) -> None:
     change_balance(
-        guild_id, user_id, -price
+        guild_id, user_id, -price,
+        source=__name__,
     )
     add_feed_stuff(guild_id, user_id)
     
@@ -309,7 +324,7 @@ def pet_pet(
     pet.petted = True
     pet.save()
 
-    change_balance(guild_id, user_id, amount)
+    change_balance(guild_id, user_id, amount, source=__name__)
     return pet
 
 
@@ -377,8 +392,12 @@ def buy_auc_item(
     if not auc_item:
         raise ItemAlreadySold
 
-    change_balance(guild_id, user_id, -price)
-    change_balance(guild_id, owner_id, proceed := int(price-(price * 0.05)))
+    change_balance(guild_id, user_id, -price, counterparty_id=owner_id, source=__name__)
+    change_balance(
+        guild_id, owner_id, proceed := int(price-(price * 0.05)),
+        counterparty_id=user_id,
+        source=__name__,
+    )
     buyer = get_member(guild_id, user_id)
 
     pet.user = buyer.user_id
@@ -457,5 +476,14 @@ def award_winner(
     amount: int
 ) -> None:
     change_balance(
-        guild_id, winner_id, amount
-    )
\ No newline at end of file
+        guild_id, winner_id, amount,
+        source=__name__,
+    )
+
+
+def _updated_pet(query, pet_id: int) -> Pets:
+    pet = next(iter(query.returning(Pets).execute()), None)
+    if pet is None:
+        # raised inside the transaction, so paid items are given back
+        raise Pets.DoesNotExist(f'pet {pet_id} does not exist')
+    return pet
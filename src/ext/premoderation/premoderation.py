@@ -1,6 +1,5 @@
 import asyncio
 from typing import Optional, Union
-import aiohttp
 import io
 
 import disnake
@@ -21,6 +20,7 @@ from src.ext.premoderation.services import (get_premoderation_settings,
                                             create_premoderation_item,
                                             delete_items_by_author)
 from src.formatters import to_mention_and_id
+from src.database.executor import run_db
 from src.bot import SEBot
 
 
@@ -41,7 +41,7 @@ class PremoderationCog(commands.Cog):
         if not guild or message.author.bot:
             return
 
-        settings = get_premoderation_settings(guild.id)
+        settings = await run_db(get_premoderation_settings, guild.id)
         premoderation_channels = settings.premoderation_channels
         channel = message.channel
 
@@ -56,7 +56,7 @@ class PremoderationCog(commands.Cog):
             await channel.send(t('too_much_attachments'), delete_after=5)
             return
 
-        urls = []
+        attachments = []
         for attachment in message.attachments:
             content_type = attachment.content_type
             logger.debug('Premoderation: new content, type: %s', content_type)
@@ -64,11 +64,9 @@ class PremoderationCog(commands.Cog):
                 continue
             if not content_type.startswith(('image', 'video', 'audio')):
                 continue
+            attachments.append(attachment)
 
-            saved_url = await self.bot.save_file(await attachment.to_file())
-            if not saved_url:
-                continue
-            urls.append(saved_url)
+        urls = await self.bot.storage.save_attachments(attachments)
         content = message.clean_content
 
         await message.delete()
@@ -78,7 +76,8 @@ class PremoderationCog(commands.Cog):
             return
 
         await channel.send(t('content_found'), delete_after=5)
-        create_premoderation_item(
+        await run_db(
+            create_premoderation_item,
             guild.id, message.author.id,
             content=content,
             channel_id=channel.id,
@@ -196,7 +195,7 @@ async def _send_item(bot: SEBot, item: PremoderationItem, channel: disnake.TextC
         if item.urls is not None:
             for url in item.urls:
                 if _is_audio_file(url):
-                    message = await _download_and_send(channel, url) or message
+                    message = await _download_and_send(bot, channel, url) or message
                 else:
                     message = await channel.send(
                         content=url,
@@ -205,16 +204,19 @@ async def _send_item(bot: SEBot, item: PremoderationItem, channel: disnake.TextC
         await message.add_reaction('💔')
 
 
-async def _download_and_send(channel: disnake.TextChannel, url: str) -> Optional[disnake.Message]:
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as r:
-            if r.status != 200:
-                return
+async def _download_and_send(
+    bot: SEBot,
+    channel: disnake.TextChannel,
+    url: str,
+) -> Optional[disnake.Message]:
+    async with bot.http_client.session.get(url) as r:
+        if r.status != 200:
+            return
 
-            *_, filename = url.split('/')
-            payload = io.BytesIO(await r.read())
-            file = disnake.File(fp=payload, filename=filename or 'file.mp3')
-            return await channel.send(file=file)
+        *_, filename = url.split('/')
+        payload = io.BytesIO(await r.read())
+        file = disnake.File(fp=payload, filename=filename or 'file.mp3')
+        return await channel.send(file=file)
 
 
 def _is_audio_file(url: str) -> bool:
@@ -280,6 +282,7 @@ class RolePremoderationPaginator(PeeweePaginator[CreatedShopRoles]):
             item.creator.id,
             self._settings.role_creation_price,
             currency=CurrencyType.CRYSTAL,
+            source=__name__,
         )
 
     async def accept(self) -> None:
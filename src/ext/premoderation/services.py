@@ -1,11 +1,13 @@
 from src.database.models import Users, psql_db, Guilds, PremoderationSettings, PremoderationItem
 from src.database.services import create_related
+from src.database.settings_cache import settings_cache
 from src.logger import get_logger
 
 
 logger = get_logger()
 
 
+@settings_cache.cached(PremoderationSettings)
 @create_related(Guilds)
 @psql_db.atomic()
 def get_premoderation_settings(guild_id: int, /) -> PremoderationSettings:
@@ -78,6 +78,7 @@ class RelationshipProposalView(BaseView):
             guild_id=guild_id,
             user_id=author_id,
             amount=-self._price,  # type: ignore
+            source=__name__,
         )
         await inter.response.send_message(
             embed=disnake.Embed(
@@ -140,7 +141,8 @@ class RelationshipProposalView(BaseView):
         change_balance(
             guild_id=guild_id,
             user_id=author_id,
-            amount=self._price  # type: ignore
+            amount=self._price,  # type: ignore
+            source=__name__,
         )
         await interaction.response.edit_message(
             embed=disnake.Embed(
@@ -162,7 +164,8 @@ class RelationshipProposalView(BaseView):
         change_balance(
             guild_id=guild_id,
             user_id=author_id,
-            amount=self._price  # type: ignore
+            amount=self._price,  # type: ignore
+            source=__name__,
         )
         await self.message.edit(
             embed=disnake.Embed(
@@ -4,6 +4,7 @@ from src.database.models import (Relationships, RelationshipParticipant,
                                  RelationshipsSettings, Users, psql_db,
                                  Guilds)
 from src.database.services import create_related
+from src.database.settings_cache import settings_cache
 
 
 def get_user_relationships_or_none(
@@ -42,6 +43,7 @@ def create_relationships(
     ).execute()  # type: ignore
 
 
+@settings_cache.cached(RelationshipsSettings)
 @create_related(Guilds)
 @psql_db.atomic()
 def get_relationships_settings(guild_id: int, /) -> RelationshipsSettings:
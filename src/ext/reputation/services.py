@@ -2,6 +2,8 @@ from typing import Literal
 
 from src.database.models import Likes, Users, Guilds, psql_db
 from src.database.services import create_related
+from src.database.leaderboards import leaderboards, Metric
+from src.ext.members.services import get_member_reputation
 from src.logger import get_logger
 
 
@@ -25,6 +27,7 @@ def change_reputation(
         )
         if instance:
             instance.delete_instance()
+            _update_reputation_top(guild_id, to_member_id)
             return True
         return False
 
@@ -38,8 +41,18 @@ def change_reputation(
 
     instance.type = action
     instance.save()
+    _update_reputation_top(guild_id, to_member_id)
     logger.info(
         "%s change reputation for %d on guild %s",
         from_member_id, to_member_id, guild_id,
     )
     return True
+
+
+def _update_reputation_top(guild_id: int, user_id: int) -> None:
+    leaderboards.update(
+        guild_id,
+        user_id,
+        Metric.REPUTATION,
+        get_member_reputation(guild_id, user_id),
+    )
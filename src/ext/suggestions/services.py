@@ -2,12 +2,14 @@ from typing import Optional
 from src.database.models import (SuggestionSettings, Suggestions,
                                  Users, Guilds, psql_db)
 from src.database.services import create_related
+from src.database.settings_cache import settings_cache
 from src.logger import get_logger
 
 
 logger = get_logger()
 
 
+@settings_cache.cached(SuggestionSettings)
 @create_related(Guilds)
 @psql_db.atomic()
 def get_suggestion_settings(guild_id: int, /) -> SuggestionSettings:
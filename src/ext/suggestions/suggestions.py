@@ -65,8 +65,9 @@ class SuggestionsCog(commands.Cog):
         )
         embed.set_footer(text=t('suggestion_footer', author_id=author.id))
         if attachment:
-            file = await attachment.to_file()
-            embed.set_image(file=file)
+            file = await self.bot.storage.download(attachment)
+            if file:
+                embed.set_image(file=file)
         message = await channel.send(embed=embed)
 
         attachment_url = message.embeds[0].image.url or None
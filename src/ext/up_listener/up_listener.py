@@ -57,6 +57,7 @@ class UpListenerCog(commands.Cog):
             guild_id=message.guild.id,
             user_id=message.interaction.author.id,
             amount=25,
+            source=__name__,
         )
         self.bot.dispatch(
             custom_events.EventName.MONITORING_GUILD_PROMOTED.value,
@@ -1,5 +1,4 @@
 from __future__ import annotations
-import asyncio
 from typing import NamedTuple, Optional, TYPE_CHECKING
 import datetime
 
@@ -11,15 +10,15 @@ from pytz.tzinfo import BaseTzInfo
 from src.translation import get_translator
 from src.logger import get_logger
 from src.utils import custom_events
-from src.ext.up_listener.services import (get_reminder_settings,
-                                          create_or_overrite_old_reminder,
-                                          get_all_active_not_outdated_reminders)
+from src.ext.up_listener.services import get_reminder_settings
 if TYPE_CHECKING:
     from src.bot import SEBot
+    from src.timers import Timer
 
 
 logger = get_logger()
 t = get_translator(route='ext.up_listener')
+REMINDER_TIMER = 'up_reminder'
 
 
 class MonitoringData(NamedTuple):
@@ -48,6 +47,7 @@ MONITORING_INFORMATION = {
 class UpReminderCog(commands.Cog):
     def __init__(self, bot: SEBot) -> None:
         self.bot = bot
+        bot.timers.register(REMINDER_TIMER, self.send_reminder)
 
     @commands.Cog.listener(f'on_{custom_events.EventName.MONITORING_GUILD_PROMOTED.value}')
     async def up_listener(self, guild: disnake.Guild, monitoring_bot: disnake.User) -> None:
@@ -76,29 +76,13 @@ class UpReminderCog(commands.Cog):
                 info.reset_time,
             ))
 
-        create_or_overrite_old_reminder(guild.id, monitoring_bot.id, send_time)
-        await self.send_reminder(
-            channel,  # type: ignore
-            settings.text,  # type: ignore
-            send_time
-        )
-
-    async def load_reminders(self) -> None:
-        await self.bot.wait_until_ready()
-        reminders = get_all_active_not_outdated_reminders()
-        logger.info('%d pending reminders found', len(reminders))
-
-        for reminder in reminders:  # noqa
-            guild = self.bot.get_guild(reminder.guild_id.id)
-            if not guild:
-                continue
-            settings = get_reminder_settings(guild.id, reminder.monitoring_bot_id)
-            channel = guild.get_channel(settings.channel_id)  # type: ignore
-            if self.check_reminder(channel, settings.text):  # type: ignore
-                logger.info('Creating remidner for guild %d, monitoring %d',
-                            guild.id, reminder.monitoring_bot_id)
-                task = self.send_reminder(channel, settings.text, reminder.send_time)  # type: ignore
-                self.bot.loop.create_task(task)
+        key = f'{REMINDER_TIMER}:{guild.id}:{monitoring_bot.id}'
+        current_reminder = self.bot.timers.get(key)
+        if not current_reminder or current_reminder.due_at < send_time:
+            self.bot.timers.schedule(key, REMINDER_TIMER, send_time, {
+                'guild_id': guild.id,
+                'monitoring_bot_id': monitoring_bot.id,
+            })
 
     def check_reminder(
         self,
@@ -111,20 +95,18 @@ class UpReminderCog(commands.Cog):
             return False
         return True
 
-    async def send_reminder(
-        self,
-        channel: disnake.TextChannel,
-        text: str,
-        send_time: datetime.datetime
-    ) -> None:
-        current_time = datetime.datetime.now().astimezone()
-        wait_time = (send_time - current_time).total_seconds()
-        logger.debug('send_reminder will sleep for %d second', wait_time)
-
-        await asyncio.sleep(wait_time)
-        logger.info('Sending remidner in channel %d', channel.id)
-        await channel.send(
-            text,
+    async def send_reminder(self, timer: Timer) -> None:
+        guild = self.bot.get_guild(timer.payload['guild_id'])
+        if not guild:
+            return
+        settings = get_reminder_settings(guild.id, timer.payload['monitoring_bot_id'])
+        channel = guild.get_channel(settings.channel_id)  # type: ignore
+        if not self.check_reminder(channel, settings.text):  # type: ignore
+            return
+
+        logger.info('Sending remidner in channel %d', channel.id)  # type: ignore
+        await channel.send(  # type: ignore
+            settings.text,
             allowed_mentions=disnake.AllowedMentions(
                 everyone=False,
                 users=True,
@@ -144,6 +126,4 @@ def is_close_to_reset(info: MonitoringData) -> bool:
 
 
 def setup(bot) -> None:
-    cog = UpReminderCog(bot)
-    cog.bot.loop.create_task(cog.load_reminders())
-    bot.add_cog(cog)
+    bot.add_cog(UpReminderCog(bot))
@@ -0,0 +1,40 @@
+from typing import Optional
+
+import aiohttp
+
+from src.settings import HTTP_CONNECTIONS_LIMIT, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT
+
+
+class HttpClient:
+    """
+    HTTP session shared by the bot
+
+    Connections are kept alive and reused by all requests, so a request
+    to a known host doesn't open a new connection and TLS session.
+    The session is created on first use inside the event loop.
+    """
+
+    def __init__(self) -> None:
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=HTTP_CONNECTIONS_LIMIT,
+                    ttl_dns_cache=300,
+                ),
+                # total time is not limited, large files are streamed for long
+                timeout=aiohttp.ClientTimeout(
+                    total=None,
+                    connect=HTTP_CONNECT_TIMEOUT,
+                    sock_read=HTTP_READ_TIMEOUT,
+                ),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,222 @@
+import asyncio
+import datetime
+import inspect
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Any, Callable, Optional
+
+import pytz
+
+from src.settings import SCHEDULER_TIMEZONE, SCHEDULER_MAX_SLEEP
+from src.database.models import ScheduledJobs, psql_db
+from src.database.executor import run_db
+from src.logger import get_logger
+
+
+logger = get_logger()
+# days searched for the next run of a schedule
+MAX_SCHEDULE_DAYS = 366 * 5
+
+
+class CronSchedule:
+    """
+    Cron expression `minute hour day month weekday` in a timezone
+
+    Fields support `*`, numbers, ranges, lists and steps.
+    Weekdays are numbered from 0 (Sunday) to 6, 7 is Sunday too.
+    """
+
+    def __init__(self, expression: str, timezone: str = SCHEDULER_TIMEZONE) -> None:
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f'Cron expression should have 5 fields: {expression!r}')
+        self.expression = expression
+        self.timezone = pytz.timezone(timezone)
+        self.minutes = _parse_field(fields[0], 0, 59)
+        self.hours = _parse_field(fields[1], 0, 23)
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12)
+        self.weekdays = sorted({day % 7 for day in _parse_field(fields[4], 0, 7)})
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    def __repr__(self) -> str:
+        return f'CronSchedule({self.expression!r}, {self.timezone.zone!r})'
+
+    def next_after(self, moment: datetime.datetime) -> datetime.datetime:
+        """First run strictly after the moment"""
+        local = moment.astimezone(self.timezone).replace(tzinfo=None)
+        day = local.date()
+        for _ in range(MAX_SCHEDULE_DAYS):
+            if self._is_run_day(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        candidate = datetime.datetime.combine(day, datetime.time(hour, minute))
+                        if candidate > local:
+                            return self.timezone.localize(candidate)
+            day += datetime.timedelta(days=1)
+        raise ValueError(f'{self!r} never runs')
+
+    def _is_run_day(self, day: datetime.date) -> bool:
+        if day.month not in self.months:
+            return False
+        day_matches = day.day in self.days
+        weekday_matches = (day.weekday() + 1) % 7 in self.weekdays
+        # like in cron, restricted day and weekday are alternatives
+        if self._any_day or self._any_weekday:
+            return day_matches and weekday_matches
+        return day_matches or weekday_matches
+
+
+def _parse_field(text: str, low: int, high: int) -> list[int]:
+    values: set[int] = set()
+    for part in text.split(','):
+        span, _, step = part.partition('/')
+        if span == '*':
+            start, end = low, high
+        elif '-' in span:
+            start, end = map(int, span.split('-'))
+        else:
+            start = int(span)
+            end = high if step else start
+        if not low <= start <= end <= high:
+            raise ValueError(f'Invalid cron field {text!r}')
+        values.update(range(start, end + 1, int(step or 1)))
+    return sorted(values)
+
+
+@dataclass
+class Job:
+    name: str
+    schedule: CronSchedule
+    func: Callable[[], Any]
+    last_run_at: Optional[datetime.datetime] = None
+    loaded: bool = False
+    running: bool = False
+    next_run_at: Optional[datetime.datetime] = field(default=None, init=False)
+
+
+class Scheduler:
+    """
+    Runs jobs by cron schedules
+
+    Time of the last run of every job is saved in the database. Runs
+    missed while the bot was offline are caught up with one run as soon
+    as the bot starts. A new job runs first on its next scheduled time.
+    Every run is claimed in the database first, so a job runs once even
+    if several processes serve it. Synchronous jobs run in the database
+    executor, coroutine functions run in the event loop.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: dict[str, Job] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    def add_job(self, name: str, cron: str, func: Callable[[], Any]) -> Job:
+        job = Job(name, CronSchedule(cron), func)
+        self._jobs[name] = job
+        self._wakeup.set()
+        return job
+
+    def remove_job(self, name: str) -> None:
+        self._jobs.pop(name, None)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                await self._load_jobs()
+            except Exception as error:  # pylint: disable=broad-except
+                logger.error('scheduled jobs loading failed: %s', repr(error))
+
+            now = datetime.datetime.now(datetime.timezone.utc)
+            timeout = SCHEDULER_MAX_SLEEP
+            for job in list(self._jobs.values()):
+                if not job.loaded or job.running or job.next_run_at is None:
+                    continue
+                if job.next_run_at <= now:
+                    job.running = True
+                    asyncio.create_task(self._execute(job))
+                else:
+                    timeout = min(timeout, (job.next_run_at - now).total_seconds())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _load_jobs(self) -> None:
+        jobs = [job for job in self._jobs.values() if not job.loaded]
+        if not jobs:
+            return
+        last_runs = await run_db(_load_last_runs, [job.name for job in jobs])
+        for job in jobs:
+            job.last_run_at = last_runs[job.name]
+            job.next_run_at = job.schedule.next_after(job.last_run_at)
+            job.loaded = True
+            logger.info('job %s will run at %s', job.name, job.next_run_at)
+
+    async def _execute(self, job: Job) -> None:
+        run_at = datetime.datetime.now(datetime.timezone.utc)
+        try:
+            claimed = await run_db(_claim_run, job.name, job.last_run_at, run_at)
+        except Exception as error:  # pylint: disable=broad-except
+            logger.error('job %s is not started: %s', job.name, repr(error))
+            job.next_run_at = run_at + datetime.timedelta(seconds=SCHEDULER_MAX_SLEEP)
+            job.running = False
+            return
+        if not claimed:
+            # another process has run the job, its time is loaded again
+            job.loaded = False
+            job.running = False
+            self._wakeup.set()
+            return
+
+        job.last_run_at = run_at
+        job.next_run_at = job.schedule.next_after(run_at)
+        started = monotonic()
+        try:
+            if inspect.iscoroutinefunction(job.func):
+                await job.func()
+            else:
+                await run_db(job.func)
+        except Exception as error:  # pylint: disable=broad-except
+            logger.error('job %s failed: %s', job.name, repr(error))
+        else:
+            logger.info('job %s done in %.2f seconds', job.name, monotonic() - started)
+        finally:
+            job.running = False
+            self._wakeup.set()
+
+
+@psql_db.atomic()
+def _load_last_runs(names: list[str]) -> dict[str, datetime.datetime]:
+    """Last runs of the jobs, new jobs are counted as run now"""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    ScheduledJobs.insert_many(
+        [(name, now) for name in names],
+        fields=[ScheduledJobs.name, ScheduledJobs.last_run_at],
+    ).on_conflict_ignore().execute()
+    query = ScheduledJobs.select().where(ScheduledJobs.name.in_(names))
+    return {job.name: job.last_run_at for job in query}
+
+
+def _claim_run(
+    name: str,
+    previous_run_at: datetime.datetime,
+    run_at: datetime.datetime,
+) -> bool:
+    """Save the new run unless another process has saved it first"""
+    return bool(ScheduledJobs.update(last_run_at=run_at).where(
+        (ScheduledJobs.name == name) &
+        (ScheduledJobs.last_run_at == previous_run_at)
+    ).execute())
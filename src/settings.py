@@ -6,6 +6,26 @@ load_dotenv()
 APP_NAME = 'CindocuBot'
 LOGS_PATH = 'logs'
 IMAGE_CHANNELS = []
+# Max size of a file stored in IMAGE_CHANNELS, larger attachments are skipped
+STORAGE_MAX_FILE_SIZE = 25 * 1024 * 1024
+# Messages with files sent to one image channel at once
+STORAGE_CHANNEL_CONCURRENCY = 2
+# Attachments downloaded at once
+STORAGE_DOWNLOAD_CONCURRENCY = 8
+# URLs of stored files kept in memory, older ones are looked up in the database
+STORAGE_CACHE_SIZE = 4096
+# Seconds before a stored URL is checked again for being available
+STORAGE_URL_CHECK_INTERVAL = 60 * 60
+# Connections of the shared HTTP session open at once
+HTTP_CONNECTIONS_LIMIT = 100
+# Seconds to connect to a host and to wait for data of a response
+HTTP_CONNECT_TIMEOUT = 10
+HTTP_READ_TIMEOUT = 30
+# Seconds to check that a URL points to an image
+URL_CHECK_TIMEOUT = 2
+# Seconds a result of the URL check is kept, and how many results are kept
+URL_CHECK_TTL = 10 * 60
+URL_CHECK_CACHE_SIZE = 1024
 # Just show more log messages
 DEBUG = False
 
@@ -76,3 +96,51 @@ DATABASE = {
     'user': os.getenv('POSTGRES_USER'),
     'password': os.getenv('POSTGRES_PASS'),
 }
+# Threads used to run blocking database queries outside of the event loop
+DATABASE_WORKERS = 4
+# Connections pool size. Should be greater than DATABASE_WORKERS,
+# main thread also holds a connection
+DATABASE_MAX_CONNECTIONS = 10
+# Seconds after which connection in the pool will be recreated
+DATABASE_STALE_TIMEOUT = 300
+# How many times a query or a transaction is repeated after the connection is lost
+DATABASE_RECONNECT_ATTEMPTS = 1
+# Seconds between writes of buffered text activity
+ACTIVITY_FLUSH_INTERVAL = 30
+# Members with buffered text activity that trigger a write before the interval
+ACTIVITY_MAX_PENDING = 500
+# Members whose experience is kept in memory to detect level ups
+ACTIVITY_EXPERIENCE_CACHE_SIZE = 10000
+# Seconds during which guild settings are served from memory
+SETTINGS_CACHE_TTL = 300
+# Members kept in memory for every guild leaderboard, should be greater than top size
+LEADERBOARD_CAPACITY = 100
+# Seconds between full leaderboards reloads from the database
+LEADERBOARD_RESYNC_INTERVAL = 60 * 60
+# Guilds taxed for created roles in one transaction
+TAX_GUILDS_CHUNK = 50
+# Guilds whose unpaid roles are deleted from Discord at once,
+# roles of one guild share a rate limit and are deleted one by one
+ROLE_DELETION_CONCURRENCY = 4
+# Attempts to delete a role when Discord answers with an error
+ROLE_DELETION_ATTEMPTS = 3
+# Seconds during which total count of keyset paginator is not selected again
+PAGINATOR_COUNT_TTL = 60
+# Months of history kept in the database besides the current one,
+# older months are archived to HISTORY_ARCHIVE_DIR
+HISTORY_RETENTION_MONTHS = 12
+HISTORY_ARCHIVE_DIR = os.getenv('HISTORY_ARCHIVE_DIR', 'archive/history')
+# Months of history created in advance
+HISTORY_PARTITIONS_AHEAD = 2
+# Months besides the current one shown by /history
+HISTORY_SHOWN_MONTHS = 3
+# Seconds between writes of queued history entries
+HISTORY_FLUSH_INTERVAL = 5
+# Queued history entries that trigger a write before the interval
+HISTORY_MAX_PENDING = 50
+# Max seconds the timer service sleeps without checking the clock
+TIMERS_MAX_SLEEP = 60
+# Timezone of the scheduled jobs
+SCHEDULER_TIMEZONE = os.getenv('SCHEDULER_TIMEZONE', 'Europe/Moscow')
+# Max seconds the scheduler sleeps without checking the clock
+SCHEDULER_MAX_SLEEP = 60
@@ -16,6 +16,7 @@ from src.ext.game.db_services import get_game_channel_settings
 from src.ext.up_listener.up_reminder import MONITORING_INFORMATION
 from src.logger import get_logger
 from src.database.create import recreate_tables
+from src.database.settings_cache import settings_cache
 from src.custom_errors import BadProjectSettings
 if TYPE_CHECKING:
     from src.bot import SEBot
@@ -92,6 +93,7 @@ async def setup_development(  # noqa
     if recreate_database_schema:
         logger.info("Recreating database...")
         recreate_tables()
+        settings_cache.clear()
     logger.info("Links to guilds for testing:")
     await send_links_to_test_guild(test_guilds)
     if prepare_guilds:
@@ -148,6 +150,8 @@ async def setup_guilds(
         await ensure_welcome_settings(guild)
         await ensure_reminder_settings(guild)
         await ensure_game_channel_settings(guild)
+    # settings were changed directly by models, drop everything cached before
+    settings_cache.clear()
 
 
 async def ensure_reminder_settings(guild: Guild) -> None:
@@ -0,0 +1,267 @@
+from __future__ import annotations
+import asyncio
+import datetime
+import hashlib
+import io
+import tempfile
+from collections import OrderedDict
+from time import monotonic
+from typing import Awaitable, Callable, NamedTuple, Optional, Sequence, TYPE_CHECKING
+
+import aiohttp
+import disnake
+
+from src.settings import (STORAGE_MAX_FILE_SIZE, STORAGE_CHANNEL_CONCURRENCY,
+                          STORAGE_DOWNLOAD_CONCURRENCY, STORAGE_CACHE_SIZE,
+                          STORAGE_URL_CHECK_INTERVAL)
+from src.database.models import StoredFiles
+from src.database.executor import run_db
+from src.logger import get_logger
+if TYPE_CHECKING:
+    from src.bot import SEBot
+
+
+logger = get_logger()
+# attachments limit of one message
+FILES_PER_MESSAGE = 10
+CHUNK_SIZE = 64 * 1024
+# responses meaning that the stored file is gone
+GONE_STATUSES = {403, 404, 410}
+
+
+class StoredUrl(NamedTuple):
+    url: str
+    # monotonic time of the last availability check, None if never checked
+    checked_at: Optional[float]
+
+
+class UrlCache:
+    """URLs of stored files by their keys, least recently used ones are evicted"""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._urls: OrderedDict[str, StoredUrl] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def get(self, key: str) -> Optional[StoredUrl]:
+        stored = self._urls.get(key)
+        if stored is not None:
+            self._urls.move_to_end(key)
+        return stored
+
+    def put(self, key: str, stored: StoredUrl) -> None:
+        self._urls[key] = stored
+        self._urls.move_to_end(key)
+        if len(self._urls) > self.size:
+            self._urls.popitem(last=False)
+
+
+class FileStorage:
+    """
+    Keeps files in messages of the image channels
+
+    Attachments are streamed to temporary files, so they are not held
+    in memory. Files are packed into messages of up to 10 attachments,
+    messages go to the image channels in turn. Every channel sends a few
+    messages at a time, so uploads to different channels run concurrently.
+
+    Assets and files saved one by one are stored once: their URLs are saved
+    to the database by asset key or hash of the file with its name, recently
+    used ones are kept in memory. A stored URL is checked from time to
+    time and the file is uploaded again when it's gone.
+    """
+
+    def __init__(self, bot: SEBot) -> None:
+        self.bot = bot
+        self._channel_semaphores: dict[int, asyncio.Semaphore] = {}
+        self._download_semaphore = asyncio.Semaphore(STORAGE_DOWNLOAD_CONCURRENCY)
+        self._urls = UrlCache(STORAGE_CACHE_SIZE)
+
+    async def save_asset(self, asset: disnake.Asset) -> Optional[str]:
+        """Store the asset unless it's already stored, return its URL"""
+        async def upload() -> Optional[str]:
+            return (await self.store_files([await asset.to_file()]))[0]
+        return await self._save_once(f'asset:{asset.key}', upload)
+
+    async def save_file(self, file: disnake.File) -> Optional[str]:
+        """Store the file unless the same file is stored, return its URL"""
+        async def upload() -> Optional[str]:
+            return (await self.store_files([file]))[0]
+        return await self._save_once(f'file:{_file_hash(file)}', upload)
+
+    async def save_attachments(self, attachments: Sequence[disnake.Attachment]) -> list[str]:
+        """Store attachments and return their URLs, failed ones are skipped"""
+        files = await asyncio.gather(*(self.download(attachment) for attachment in attachments))
+        downloaded = [file for file in files if file is not None]
+        try:
+            urls = await self.store_files(downloaded)
+        finally:
+            for file in downloaded:
+                file.close()
+        return [url for url in urls if url]
+
+    async def download(
+        self,
+        attachment: disnake.Attachment,
+        max_size: int = STORAGE_MAX_FILE_SIZE,
+    ) -> Optional[disnake.File]:
+        """Stream the attachment to a temporary file, None if it's too large or failed"""
+        if attachment.size > max_size:
+            logger.info('attachment %d is too large: %d bytes', attachment.id, attachment.size)
+            return None
+
+        temporary = tempfile.TemporaryFile()
+        size = 0
+        try:
+            async with self._download_semaphore:
+                async with self.bot.http_client.session.get(attachment.url) as response:
+                    response.raise_for_status()
+                    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                        size += len(chunk)
+                        if size > max_size:
+                            logger.info('attachment %d is larger than declared', attachment.id)
+                            temporary.close()
+                            return None
+                        temporary.write(chunk)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            logger.info('attachment %d download failed: %s', attachment.id, repr(error))
+            temporary.close()
+            return None
+
+        temporary.seek(0)
+        return disnake.File(
+            temporary,  # type: ignore
+            filename=attachment.filename,
+            spoiler=attachment.is_spoiler(),
+        )
+
+    async def store_files(self, files: Sequence[disnake.File]) -> list[Optional[str]]:
+        """Send files to the image channels, return URL or None for every file"""
+        batches: list[tuple[disnake.TextChannel, list[int]]] = []
+        indexes = list(range(len(files)))
+        while indexes:
+            channel = self.bot._next_image_channel()  # pylint: disable=protected-access
+            if not channel:
+                break
+            batch = _pack(files, indexes, channel.guild.filesize_limit)
+            batches.append((channel, batch))
+            indexes = indexes[len(batch):]
+
+        urls: list[Optional[str]] = [None] * len(files)
+        results = await asyncio.gather(*(
+            self._send(channel, [files[index] for index in batch])
+            for channel, batch in batches
+        ))
+        for (_, batch), batch_urls in zip(batches, results):
+            for index, url in zip(batch, batch_urls):
+                urls[index] = url
+        return urls
+
+    async def _send(
+        self,
+        channel: disnake.TextChannel,
+        files: list[disnake.File],
+    ) -> list[Optional[str]]:
+        semaphore = self._channel_semaphores.setdefault(
+            channel.id, asyncio.Semaphore(STORAGE_CHANNEL_CONCURRENCY),
+        )
+        async with semaphore:
+            try:
+                message = await channel.send(files=files)
+            except disnake.HTTPException as error:
+                logger.warning('%d files not stored in %d: %s', len(files), channel.id, error)
+                return [None] * len(files)
+        return [attachment.url for attachment in message.attachments]
+
+    async def _save_once(
+        self,
+        key: str,
+        upload: Callable[[], Awaitable[Optional[str]]],
+    ) -> Optional[str]:
+        stored = self._urls.get(key)
+        if stored is None:
+            try:
+                url = await run_db(_get_stored_url, key)
+            except Exception as error:  # pylint: disable=broad-except
+                logger.error('stored URL of %s is not loaded: %s', key, repr(error))
+                url = None
+            if url is not None:
+                stored = StoredUrl(url, None)
+
+        if stored is not None:
+            now = monotonic()
+            if stored.checked_at is not None and now - stored.checked_at < STORAGE_URL_CHECK_INTERVAL:
+                return stored.url
+            if await self._is_available(stored.url):
+                self._urls.put(key, StoredUrl(stored.url, now))
+                return stored.url
+            logger.info('stored file %s is gone, uploading it again', key)
+
+        url = await upload()
+        if url is None:
+            return None
+        self._urls.put(key, StoredUrl(url, monotonic()))
+        try:
+            await run_db(_save_stored_url, key, url)
+        except Exception as error:  # pylint: disable=broad-except
+            logger.error('stored URL of %s is not saved: %s', key, repr(error))
+        return url
+
+    async def _is_available(self, url: str) -> bool:
+        """Whether the file is still there, failed checks count as available"""
+        try:
+            async with self.bot.http_client.session.head(url) as response:
+                return response.status not in GONE_STATUSES
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            logger.info('stored file %s is not checked: %s', url, repr(error))
+            return True
+
+
+def _pack(files: Sequence[disnake.File], indexes: list[int], size_limit: int) -> list[int]:
+    """Take first files fitting into one message, at least one file is taken"""
+    batch: list[int] = []
+    total = 0
+    for index in indexes[:FILES_PER_MESSAGE]:
+        size = _file_size(files[index])
+        if batch and total + size > size_limit:
+            break
+        batch.append(index)
+        total += size
+    return batch
+
+
+def _file_hash(file: disnake.File) -> str:
+    """SHA-256 of the content, name and spoiler mark, so the stored file looks the same"""
+    position = file.fp.tell()
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.fp.read(CHUNK_SIZE), b''):
+        digest.update(chunk)
+    file.fp.seek(position)
+    # name is hashed too, it may be longer than the key column allows
+    digest.update(f'\0{int(file.spoiler)}{file.filename}'.encode())
+    return digest.hexdigest()
+
+
+def _file_size(file: disnake.File) -> int:
+    position = file.fp.tell()
+    size = file.fp.seek(0, io.SEEK_END) - position
+    file.fp.seek(position)
+    return size
+
+
+def _get_stored_url(key: str) -> Optional[str]:
+    stored = StoredFiles.get_or_none(StoredFiles.key == key)
+    return stored.url if stored is not None else None
+
+
+def _save_stored_url(key: str, url: str) -> None:
+    StoredFiles.insert(
+        key=key,
+        url=url,
+        stored_at=datetime.datetime.now(datetime.timezone.utc),
+    ).on_conflict(
+        conflict_target=[StoredFiles.key],
+        preserve=[StoredFiles.url, StoredFiles.stored_at],
+    ).execute()
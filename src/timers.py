@@ -0,0 +1,213 @@
+import asyncio
+import datetime
+import heapq
+from typing import Any, Awaitable, Callable, NamedTuple, Optional
+
+from src.settings import TIMERS_MAX_SLEEP
+from src.database.models import Timers, psql_db
+from src.database.executor import run_db
+from src.logger import get_logger
+
+
+logger = get_logger()
+# stale heap items allowed besides two per timer
+COMPACT_THRESHOLD = 1024
+
+
+class Timer(NamedTuple):
+    key: str
+    kind: str
+    due_at: datetime.datetime
+    payload: dict[str, Any]
+
+
+TimerHandler = Callable[[Timer], Awaitable[None]]
+
+
+class TimerService:
+    """
+    Deadlines of entities served by a single task
+
+    Timers are kept in a heap ordered by due time and one task sleeps
+    until the earliest of them. Every timer has a key, scheduling the key
+    again replaces the timer. Timers are saved to the database in the
+    background and loaded by `start`, so timers due while the bot was
+    offline are fired late instead of being lost. Handlers are registered
+    for kinds of timers and run as separate tasks. A fired timer is
+    deleted from the database once its handler is done, so timers whose
+    handler failed or was interrupted are fired again after restart.
+    """
+
+    def __init__(self) -> None:
+        self._timers: dict[str, Timer] = {}
+        self._heap: list[tuple[float, int, str]] = []
+        # number of the last push of the key, older heap items are stale
+        self._versions: dict[str, int] = {}
+        self._counter = 0
+        self._handlers: dict[str, TimerHandler] = {}
+        # timers to save, None to delete
+        self._unsaved: dict[str, Optional[Timer]] = {}
+        self._saving = False
+        self._save_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def register(self, kind: str, handler: TimerHandler) -> None:
+        self._handlers[kind] = handler
+
+    def get(self, key: str) -> Optional[Timer]:
+        return self._timers.get(key)
+
+    def schedule(
+        self,
+        key: str,
+        kind: str,
+        due_at: datetime.datetime,
+        payload: Optional[dict[str, Any]] = None,
+    ) -> Timer:
+        """Schedule the timer, timer with the same key is replaced"""
+        timer = Timer(key, kind, due_at.astimezone(), payload or {})
+        self._push(timer)
+        self._save(key, timer)
+        return timer
+
+    def cancel(self, key: str) -> bool:
+        """Cancel the timer, return whether it was scheduled"""
+        if self._timers.pop(key, None) is None:
+            return False
+        self._versions.pop(key, None)
+        self._save(key, None)
+        return True
+
+    async def start(self) -> None:
+        """Load saved timers and start serving them"""
+        if self._task is not None:
+            return
+        timers = await run_db(_load_timers)
+        for timer in timers:
+            # timers scheduled before loading are newer
+            if timer.key not in self._timers and timer.key not in self._unsaved:
+                self._push(timer)
+        logger.info('%d timers loaded', len(timers))
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def flush(self) -> None:
+        """Save all changed timers"""
+        async with self._save_lock:
+            while self._unsaved:
+                changes = self._unsaved
+                self._unsaved = {}
+                try:
+                    await run_db(_save_timers, changes)
+                except Exception:
+                    # changes made while saving are newer
+                    self._unsaved = {**changes, **self._unsaved}
+                    raise
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            now = datetime.datetime.now().timestamp()
+            for timer in self._pop_due(now):
+                asyncio.create_task(self._fire(timer))
+
+            timeout = TIMERS_MAX_SLEEP
+            if self._heap:
+                timeout = min(timeout, max(self._heap[0][0] - now, 0))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _pop_due(self, now: float) -> list[Timer]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, version, key = heapq.heappop(self._heap)
+            if self._versions.get(key) != version:
+                continue
+            del self._versions[key]
+            due.append(self._timers.pop(key))
+        return due
+
+    async def _fire(self, timer: Timer) -> None:
+        handler = self._handlers.get(timer.kind)
+        if handler is None:
+            logger.warning('no handler for timer %s of kind %s', timer.key, timer.kind)
+            return
+        try:
+            await handler(timer)
+        except Exception as error:  # pylint: disable=broad-except
+            logger.error('timer %s handler failed: %s', timer.key, repr(error))
+            return
+        # handler could schedule the key again
+        if timer.key not in self._timers:
+            self._save(timer.key, None)
+
+    def _push(self, timer: Timer) -> None:
+        self._counter += 1
+        self._timers[timer.key] = timer
+        self._versions[timer.key] = self._counter
+        due = timer.due_at.timestamp()
+        heapq.heappush(self._heap, (due, self._counter, timer.key))
+        if self._heap[0][1] == self._counter:
+            self._wakeup.set()
+        if len(self._heap) > 2 * len(self._timers) + COMPACT_THRESHOLD:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Drop heap items of cancelled and replaced timers"""
+        self._heap = [
+            item for item in self._heap
+            if self._versions.get(item[2]) == item[1]
+        ]
+        heapq.heapify(self._heap)
+
+    def _save(self, key: str, timer: Optional[Timer]) -> None:
+        self._unsaved[key] = timer
+        if not self._saving:
+            self._saving = True
+            asyncio.create_task(self._save_in_background())
+
+    async def _save_in_background(self) -> None:
+        try:
+            while self._unsaved:
+                try:
+                    await self.flush()
+                except Exception as error:  # pylint: disable=broad-except
+                    logger.error('timers saving failed: %s', repr(error))
+                    await asyncio.sleep(TIMERS_MAX_SLEEP)
+        finally:
+            self._saving = False
+
+
+def _load_timers() -> list[Timer]:
+    return [
+        Timer(row.key, row.kind, row.due_at, row.payload)
+        for row in Timers.select()
+    ]
+
+
+@psql_db.atomic()
+def _save_timers(changes: dict[str, Optional[Timer]]) -> None:
+    deleted = [key for key, timer in changes.items() if timer is None]
+    saved = [timer for timer in changes.values() if timer is not None]
+    if deleted:
+        Timers.delete().where(Timers.key.in_(deleted)).execute()
+    if saved:
+        Timers.insert_many(saved, fields=[
+            Timers.key,
+            Timers.kind,
+            Timers.due_at,
+            Timers.payload,
+        ]).on_conflict(
+            conflict_target=[Timers.key],
+            preserve=[Timers.kind, Timers.due_at, Timers.payload],
+        ).execute()
@@ -0,0 +1,77 @@
+import asyncio
+from time import monotonic
+from typing import NamedTuple, Optional
+
+import aiohttp
+
+from src.settings import URL_CHECK_TIMEOUT, URL_CHECK_TTL, URL_CHECK_CACHE_SIZE
+from src.http_client import HttpClient
+from src.logger import get_logger
+
+
+logger = get_logger()
+# HEAD answers after which the URL is checked with GET
+HEAD_UNSUPPORTED_STATUSES = {403, 405, 501}
+
+
+class CheckedUrl(NamedTuple):
+    is_image: bool
+    # monotonic time when the result is outdated
+    expires_at: float
+
+
+class UrlValidator:
+    """
+    Checks that URLs point to available images
+
+    A URL is checked with a HEAD request, hosts not answering HEAD are
+    asked for the first byte with a ranged GET, so the body is never
+    downloaded. Results are cached for a while, concurrent checks of
+    one URL share a request. Failed and timed out checks are not cached.
+    """
+
+    def __init__(self, client: HttpClient) -> None:
+        self.client = client
+        self._checked: dict[str, CheckedUrl] = {}
+        self._pending: dict[str, asyncio.Task] = {}
+
+    async def is_image(self, url: str) -> bool:
+        checked = self._checked.get(url)
+        if checked is not None and checked.expires_at > monotonic():
+            return checked.is_image
+
+        task = self._pending.get(url)
+        if task is None:
+            task = asyncio.create_task(self._check(url))
+            self._pending[url] = task
+            task.add_done_callback(lambda _: self._pending.pop(url, None))
+        result = await asyncio.shield(task)
+        return bool(result)
+
+    async def _check(self, url: str) -> Optional[bool]:
+        try:
+            is_image = await asyncio.wait_for(self._request(url), URL_CHECK_TIMEOUT)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as error:
+            logger.info('URL %s is not checked: %s', url, repr(error))
+            return None
+        self._remember(url, is_image)
+        return is_image
+
+    async def _request(self, url: str) -> bool:
+        session = self.client.session
+        async with session.head(url, allow_redirects=True) as response:
+            if response.status not in HEAD_UNSUPPORTED_STATUSES:
+                return _is_image_response(response)
+        async with session.get(url, headers={'Range': 'bytes=0-0'}) as response:
+            return _is_image_response(response)
+
+    def _remember(self, url: str, is_image: bool) -> None:
+        self._checked.pop(url, None)
+        self._checked[url] = CheckedUrl(is_image, monotonic() + URL_CHECK_TTL)
+        if len(self._checked) > URL_CHECK_CACHE_SIZE:
+            # results are kept in the order of checks, the oldest one goes
+            del self._checked[next(iter(self._checked))]
+
+
+def _is_image_response(response: aiohttp.ClientResponse) -> bool:
+    return response.status // 100 == 2 and response.content_type.startswith('image/')
@@ -0,0 +1,61 @@
+import heapq
+from time import monotonic
+from typing import Generic, Hashable, TypeVar
+
+
+K = TypeVar('K', bound=Hashable)
+# expired keys removed from memory per trigger
+SWEEP_BATCH = 16
+
+
+class Cooldowns(Generic[K]):
+    """
+    Keys on cooldown stored with expiry time
+
+    Checks are dict lookups, expired keys are dropped lazily on check
+    and a few at a time on every trigger, so no task waits for expiry.
+    """
+
+    def __init__(self) -> None:
+        self._expires: dict[K, float] = {}
+        self._queue: list[tuple[float, int, K]] = []
+        self._counter = 0
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def is_on_cooldown(self, key: K) -> bool:
+        return self.retry_after(key) > 0
+
+    def retry_after(self, key: K) -> float:
+        expires = self._expires.get(key)
+        if expires is None:
+            return 0
+        remaining = expires - monotonic()
+        if remaining <= 0:
+            del self._expires[key]
+            return 0
+        return remaining
+
+    def trigger(self, key: K, seconds: float) -> None:
+        now = monotonic()
+        self._sweep(now)
+        if seconds <= 0:
+            return
+        expires = now + seconds
+        self._expires[key] = expires
+        # counter keeps keys themselves out of comparison
+        self._counter += 1
+        heapq.heappush(self._queue, (expires, self._counter, key))
+
+    def reset(self, key: K) -> None:
+        self._expires.pop(key, None)
+
+    def _sweep(self, now: float) -> None:
+        for _ in range(SWEEP_BATCH):
+            if not self._queue or self._queue[0][0] > now:
+                return
+            expires, _, key = heapq.heappop(self._queue)
+            # key could be triggered again with later expiry
+            if self._expires.get(key) == expires:
+                del self._expires[key]
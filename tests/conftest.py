@@ -0,0 +1,53 @@
+"""
+Tests that need Postgres use the database configured by TEST_POSTGRES_*
+variables (TEST_POSTGRES_NAME, TEST_POSTGRES_HOST and so on) and are
+skipped when it isn't set. Migrations are applied to it and rows of the
+test ids are removed, so it should never be the bot database.
+"""
+# pylint: disable=wrong-import-position,redefined-outer-name,unused-argument
+import os
+
+import pytest
+
+
+_TEST_DATABASE = {
+    name.removeprefix('TEST_'): value
+    for name, value in os.environ.items()
+    if name.startswith('TEST_POSTGRES_')
+}
+# settings read the database on import, so variables are replaced first
+os.environ.update(_TEST_DATABASE)
+
+from src.database.models import Guilds, Users, psql_db
+from src.database.migrations import migrate
+from src.database import services
+
+
+# IDs of guilds and users created by tests, far from real snowflakes
+TEST_ID = 1 << 21
+
+
+@pytest.fixture(scope='session')
+def database():
+    if 'POSTGRES_NAME' not in _TEST_DATABASE:
+        pytest.skip('TEST_POSTGRES_NAME is not set')
+    migrate()
+    _cleanup()
+    yield psql_db
+    _cleanup()
+    psql_db.close_all()
+
+
+@pytest.fixture
+def member_ids(database):
+    """Guild and user ids whose rows are removed after the test"""
+    yield TEST_ID, TEST_ID
+    _cleanup()
+
+
+def _cleanup() -> None:
+    # rows of other tables are removed by cascade
+    Guilds.delete().where(Guilds.id.between(TEST_ID, TEST_ID * 2)).execute()
+    Users.delete().where(Users.id.between(TEST_ID, TEST_ID * 2)).execute()
+    # removed rows would be considered existing otherwise
+    services._provisioned.clear()  # pylint: disable=protected-access
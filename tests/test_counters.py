@@ -0,0 +1,50 @@
+import asyncio
+
+from src.database.counters import increment
+from src.database.executor import run_db
+from src.database.models import Members
+from src.database.services import get_member
+
+
+PARALLEL = 100
+
+
+def _run_parallel(func, *args) -> list:
+    async def run_all():
+        return await asyncio.gather(*(run_db(func, *args) for _ in range(PARALLEL)))
+    return asyncio.run(run_all())
+
+
+def test_parallel_increments_are_not_lost(member_ids):
+    guild_id, user_id = member_ids
+    get_member(guild_id, user_id)
+    key = {Members.guild_id: guild_id, Members.user_id: user_id}
+
+    _run_parallel(increment, Members, key, {Members.balance: 1})
+
+    assert get_member(guild_id, user_id).balance == PARALLEL
+
+
+def test_parallel_decrements_stop_at_floor(member_ids):
+    guild_id, user_id = member_ids
+    member = get_member(guild_id, user_id)
+    member.balance = PARALLEL // 2
+    member.save()
+    key = {Members.guild_id: guild_id, Members.user_id: user_id}
+
+    results = _run_parallel(
+        lambda: increment(Members, key, {Members.balance: -1}, floors={Members.balance: 0})
+    )
+
+    assert sum(result is not None for result in results) == PARALLEL // 2
+    assert get_member(guild_id, user_id).balance == 0
+
+
+def test_missing_row_is_created(member_ids):
+    guild_id, user_id = member_ids
+    get_member(guild_id, user_id).delete_instance()
+    key = {Members.guild_id: guild_id, Members.user_id: user_id}
+
+    member = increment(Members, key, {Members.balance: 5})
+
+    assert member.balance == 5
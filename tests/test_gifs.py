@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.http_client import HttpClient
+from src.ext.fun import gifs
+from src.ext.fun.categories import Categories
+from src.ext.fun.gifs import GifPool
+
+
+class FakeWaifuApi:
+    """waifu.pics endpoints answering with a delay or failing first requests"""
+
+    def __init__(self, delay: float = 0, failures: int = 0) -> None:
+        self.delay = delay
+        self.failures = failures
+        self.requests = 0
+        self._served = 0
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/many/sfw/{category}', self.many)
+        app.router.add_get('/sfw/{category}', self.one)
+        return app
+
+    async def many(self, request: web.Request) -> web.Response:
+        if failed := await self._answer():
+            return failed
+        exclude = set((await request.json())['exclude'])
+        files = [url for url in self._urls(30) if url not in exclude]
+        return web.json_response({'files': files})
+
+    async def one(self, _: web.Request) -> web.Response:
+        if failed := await self._answer():
+            return failed
+        return web.json_response({'url': self._urls(1)[0]})
+
+    async def _answer(self):
+        self.requests += 1
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            return web.Response(status=503)
+        return None
+
+    def _urls(self, amount: int) -> list[str]:
+        urls = [f'https://gifs/{index}.gif' for index in range(self._served, self._served + amount)]
+        self._served += amount
+        return urls
+
+
+async def _with_pool(api: FakeWaifuApi, use) -> None:
+    client = HttpClient()
+    async with TestServer(api.app()) as server:
+        pool = GifPool(client, str(server.make_url('')).rstrip('/'))
+        try:
+            await use(pool)
+        finally:
+            pool.stop()
+            await client.close()
+
+
+def test_used_up_category_is_fetched_right_away():
+    api = FakeWaifuApi()
+
+    async def use(pool: GifPool) -> None:
+        assert await pool.get(Categories.PAT) is not None
+
+    asyncio.run(_with_pool(api, use))
+
+
+def test_failing_upstream_gives_none(monkeypatch):
+    monkeypatch.setattr(gifs, 'GIFS_RETRY_DELAY', 0.01)
+    api = FakeWaifuApi(failures=100)
+
+    async def use(pool: GifPool) -> None:
+        assert await pool.get(Categories.PAT) is None
+        await asyncio.sleep(0.1)
+        # refill is retried in the background
+        assert api.requests > 2
+
+    asyncio.run(_with_pool(api, use))
+
+
+def test_slow_upstream_gives_none_in_time(monkeypatch):
+    monkeypatch.setattr(gifs, 'GIFS_FETCH_TIMEOUT', 0.1)
+    api = FakeWaifuApi(delay=1)
+
+    async def use(pool: GifPool) -> None:
+        started = time.monotonic()
+        assert await pool.get(Categories.PAT) is None
+        assert time.monotonic() - started < 0.5
+
+    asyncio.run(_with_pool(api, use))
+
+
+def test_prefetched_urls_are_served_while_refill_is_slow(monkeypatch):
+    monkeypatch.setattr(gifs, 'GIFS_RETRY_DELAY', 0.01)
+    api = FakeWaifuApi(failures=2)
+
+    async def use(pool: GifPool) -> None:
+        pool.prefetch()
+        while len(pool._urls[Categories.PAT]) < gifs.GIFS_PREFETCH:  # pylint: disable=protected-access
+            await asyncio.sleep(0.01)
+        api.delay = 1
+
+        started = time.monotonic()
+        urls = [await pool.get(Categories.PAT) for _ in range(gifs.GIFS_PREFETCH)]
+        assert time.monotonic() - started < 0.5
+        assert len(set(urls)) == gifs.GIFS_PREFETCH
+
+    asyncio.run(_with_pool(api, use))
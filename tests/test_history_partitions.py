@@ -0,0 +1,29 @@
+import datetime
+
+from src.database.models import History, psql_db
+from src.database.services import get_member
+from src.ext.history.partitions import create_partitions, partition_name
+
+
+def test_rows_of_month_without_partition_are_moved(member_ids):
+    guild_id, user_id = member_ids
+    get_member(guild_id, user_id)
+    month = datetime.date(2100, 1, 1)
+    # months ahead are created by the maintenance, this one is too far
+    History.create(
+        guild_id=guild_id,
+        user_id=user_id,
+        creation_time=datetime.datetime(2100, 1, 15),
+        action_name='test',
+        description='test',
+    )
+
+    try:
+        create_partitions(0)
+
+        assert psql_db.execute_sql('SELECT count(*) FROM history_default;').fetchone()[0] == 0
+        moved = psql_db.execute_sql(f'SELECT count(*) FROM {partition_name(month)};')
+        assert moved.fetchone()[0] == 1
+        assert History.select().where(History.guild_id == guild_id).count() == 1
+    finally:
+        psql_db.execute_sql(f'DROP TABLE IF EXISTS {partition_name(month)};')
@@ -0,0 +1,48 @@
+import pytest
+
+from src.custom_errors import NotEnoughMoney
+from src.database.models import psql_db
+from src.database.services import get_member
+from src.ext.economy import ledger
+from src.ext.economy.services import change_balance, transfer_balance
+
+
+def test_changes_are_recorded_with_source(member_ids):
+    guild_id, user_id = member_ids
+
+    change_balance(guild_id, user_id, 100, source=__name__)
+    transfer_balance(guild_id, user_id, user_id + 1, 30, source=__name__)
+
+    entries = ledger.get_statement(guild_id, user_id)
+    assert [entry.amount for entry in entries] == [-30, 100]
+    assert {entry.source for entry in entries} == {__name__}
+    assert entries[0].counterparty_id == user_id + 1
+
+
+def test_rolled_back_changes_are_not_recorded(member_ids):
+    guild_id, user_id = member_ids
+
+    with pytest.raises(NotEnoughMoney):
+        with psql_db.atomic():
+            change_balance(guild_id, user_id, 100, source=__name__)
+            change_balance(guild_id, user_id, -200, source=__name__)
+
+    assert not ledger.get_statement(guild_id, user_id)
+    assert psql_db.transaction_hooks() is None
+
+
+def test_changes_of_rolled_back_savepoint_are_not_recorded(member_ids):
+    guild_id, user_id = member_ids
+
+    with psql_db.atomic():
+        change_balance(guild_id, user_id, 100, source=__name__)
+        with pytest.raises(NotEnoughMoney):
+            with psql_db.atomic():
+                change_balance(guild_id, user_id, 50, source=__name__)
+                change_balance(guild_id, user_id, -500, source=__name__)
+        with psql_db.atomic():
+            change_balance(guild_id, user_id, 20, source=__name__)
+
+    entries = ledger.get_statement(guild_id, user_id)
+    assert [entry.amount for entry in entries] == [20, 100]
+    assert get_member(guild_id, user_id).balance == 120
@@ -0,0 +1,199 @@
+import asyncio
+import io
+import os
+from types import SimpleNamespace
+from typing import Optional
+
+import disnake
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.http_client import HttpClient
+from src.database.models import StoredFiles
+from src.storage import FILES_PER_MESSAGE, FileStorage, _file_hash, _pack
+
+
+def _file(size: int, name: str = 'file.png') -> disnake.File:
+    return disnake.File(io.BytesIO(b'x' * size), filename=name)
+
+
+class FakeChannel:
+    def __init__(
+        self,
+        id_: int,
+        filesize_limit: int = 10 ** 6,
+        delay: float = 0,
+        base_url: str = 'https://cdn',
+    ) -> None:
+        self.id = id_
+        self.guild = SimpleNamespace(filesize_limit=filesize_limit)
+        self.delay = delay
+        self.base_url = base_url
+        self.sent: list[list[str]] = []
+
+    async def send(self, files: list[disnake.File]) -> SimpleNamespace:
+        self.sent.append([file.filename for file in files])
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(attachments=[
+            SimpleNamespace(url=f'{self.base_url}/{self.id}/{file.filename}') for file in files
+        ])
+
+
+class FakeBot:
+    def __init__(self, channels: list[FakeChannel]) -> None:
+        self.http_client = HttpClient()
+        self._channels = channels
+        self._sent = 0
+
+    def _next_image_channel(self) -> Optional[FakeChannel]:
+        if not self._channels:
+            return None
+        channel = self._channels[self._sent % len(self._channels)]
+        self._sent += 1
+        return channel
+
+
+async def _store(channels: list[FakeChannel], files: list[disnake.File]) -> list[Optional[str]]:
+    return await FileStorage(FakeBot(channels)).store_files(files)  # type: ignore
+
+
+def test_pack_takes_files_per_message():
+    files = [_file(10) for _ in range(25)]
+
+    assert _pack(files, list(range(25)), 10 ** 6) == list(range(FILES_PER_MESSAGE))
+    assert _pack(files, list(range(20, 25)), 10 ** 6) == list(range(20, 25))
+
+
+def test_pack_stops_at_size_limit():
+    files = [_file(40), _file(40), _file(40)]
+
+    assert _pack(files, [0, 1, 2], 100) == [0, 1]
+    # a file larger than the limit is still sent alone
+    assert _pack([_file(200), _file(10)], [0, 1], 100) == [0]
+
+
+def test_pack_counts_from_current_position():
+    file = _file(100)
+    file.fp.read(60)
+
+    assert _pack([file, _file(60)], [0, 1], 100) == [0, 1]
+
+
+def test_store_files_keeps_order_of_urls():
+    # the first channel answers last, so batches complete out of order
+    channels = [FakeChannel(1, delay=0.05), FakeChannel(2)]
+    files = [_file(10, f'{index}.png') for index in range(25)]
+
+    urls = asyncio.run(_store(channels, files))
+
+    assert [f'https://cdn/{1 + index // 10 % 2}/{index}.png' for index in range(25)] == urls
+    assert [len(batch) for batch in channels[0].sent + channels[1].sent] == [10, 5, 10]
+
+
+def test_store_files_without_channels():
+    files = [_file(10)]
+
+    assert asyncio.run(_store([], files)) == [None]
+
+
+def _attachment(server: TestServer, path: str, size: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=1,
+        url=str(server.make_url(path)),
+        size=size,
+        filename='file.png',
+        is_spoiler=lambda: False,
+    )
+
+
+async def _download(declared_size: int, max_size: int):
+    requested = []
+
+    async def handler(request: web.Request) -> web.Response:
+        requested.append(request.path)
+        return web.Response(body=b'x' * 1000)
+
+    app = web.Application()
+    app.router.add_get('/file', handler)
+    storage = FileStorage(FakeBot([]))  # type: ignore
+    async with TestServer(app) as server:
+        try:
+            file = await storage.download(
+                _attachment(server, '/file', declared_size), max_size,  # type: ignore
+            )
+        finally:
+            await storage.bot.http_client.close()
+    return file, requested
+
+
+def test_download_skips_declared_oversize():
+    file, requested = asyncio.run(_download(declared_size=1000, max_size=999))
+
+    assert file is None
+    assert not requested
+
+
+def test_download_skips_actual_oversize():
+    # attachment claims to be small, but the response is larger
+    file, requested = asyncio.run(_download(declared_size=10, max_size=999))
+
+    assert file is None
+    assert requested == ['/file']
+
+
+def test_download_streams_to_file():
+    file, _ = asyncio.run(_download(declared_size=1000, max_size=1000))
+
+    assert file is not None
+    assert file.filename == 'file.png'
+    assert file.fp.read() == b'x' * 1000
+    file.close()
+
+
+def test_file_key_depends_on_name_and_spoiler():
+    content = b'same content'
+    keys = {
+        _file_hash(disnake.File(io.BytesIO(content), filename=name, spoiler=spoiler))
+        for name in ('a.png', 'b.png') for spoiler in (False, True)
+    }
+
+    assert len(keys) == 4
+
+
+async def _save_after_restart(status: int) -> tuple[str, str, FakeChannel]:
+    """Save the file, then save it again with an empty cache while HEAD answers status"""
+    async def handler(request: web.Request) -> web.Response:
+        return web.Response(status=status)
+
+    app = web.Application()
+    app.router.add_route('HEAD', '/{channel}/{name}', handler)
+    async with TestServer(app) as server:
+        channel = FakeChannel(1, base_url=str(server.make_url('')).rstrip('/'))
+        bot = FakeBot([channel])
+        content = os.urandom(16)
+        key = f'file:{_file_hash(disnake.File(io.BytesIO(content), filename="file.png"))}'
+        try:
+            first = await FileStorage(bot).save_file(  # type: ignore
+                disnake.File(io.BytesIO(content), filename='file.png'),
+            )
+            second = await FileStorage(bot).save_file(  # type: ignore
+                disnake.File(io.BytesIO(content), filename='file.png'),
+            )
+        finally:
+            await bot.http_client.close()
+            StoredFiles.delete().where(StoredFiles.key == key).execute()
+    return first, second, channel  # type: ignore
+
+
+def test_stored_url_is_reused(database):
+    first, second, channel = asyncio.run(_save_after_restart(200))
+
+    assert first == second
+    assert len(channel.sent) == 1
+
+
+def test_gone_file_is_uploaded_again(database):
+    first, second, channel = asyncio.run(_save_after_restart(404))
+
+    assert first == second
+    assert len(channel.sent) == 2
@@ -0,0 +1,71 @@
+import asyncio
+import datetime
+
+import pytest
+
+from src.database.models import Timers
+from src.timers import Timer, TimerService
+
+
+KIND = 'test'
+
+
+@pytest.fixture
+def timers(database):
+    yield
+    Timers.delete().where(Timers.kind == KIND).execute()
+
+
+def _fire(handler) -> None:
+    """Fire a due timer with the handler, then restart the service"""
+    async def run() -> None:
+        service = TimerService()
+        fired = asyncio.Event()
+
+        async def handle(timer: Timer) -> None:
+            try:
+                await handler(service, timer)
+            finally:
+                fired.set()
+
+        service.register(KIND, handle)
+        service.schedule(f'{KIND}:1', KIND, datetime.datetime.now() - datetime.timedelta(seconds=1))
+        await service.flush()
+        await service.start()
+        await fired.wait()
+        # let the service save changes made after the handler
+        await asyncio.sleep(0)
+        await service.flush()
+        service.stop()
+    asyncio.run(run())
+
+
+def _saved() -> list[Timer]:
+    return list(Timers.select().where(Timers.kind == KIND))
+
+
+def test_handled_timer_is_deleted(timers):
+    async def handler(service: TimerService, timer: Timer) -> None:
+        pass
+
+    _fire(handler)
+
+    assert not _saved()
+
+
+def test_failed_timer_is_kept(timers):
+    async def handler(service: TimerService, timer: Timer) -> None:
+        raise RuntimeError('handler failed')
+
+    _fire(handler)
+
+    assert [timer.key for timer in _saved()] == [f'{KIND}:1']
+
+
+def test_timer_scheduled_again_by_handler_is_kept(timers):
+    async def handler(service: TimerService, timer: Timer) -> None:
+        service.schedule(timer.key, KIND, timer.due_at + datetime.timedelta(days=1))
+
+    _fire(handler)
+
+    assert [timer.key for timer in _saved()] == [f'{KIND}:1']
@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src import url_validator
+from src.http_client import HttpClient
+from src.url_validator import UrlValidator
+
+
+SLOW_CHECK = 0.5
+
+
+class FakeImageHost:
+    def __init__(self) -> None:
+        self.requests: list[tuple[str, str]] = []
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route('*', '/slow.gif', self.slow)
+        app.router.add_route('*', '/no-head.png', self.no_head)
+        app.router.add_route('*', '/page.html', self.page)
+        return app
+
+    async def slow(self, request: web.Request) -> web.Response:
+        self.requests.append((request.method, request.path))
+        await asyncio.sleep(SLOW_CHECK)
+        return web.Response(content_type='image/gif')
+
+    async def no_head(self, request: web.Request) -> web.Response:
+        self.requests.append((request.method, request.path))
+        if request.method == 'HEAD':
+            return web.Response(status=405)
+        assert request.headers['Range'] == 'bytes=0-0'
+        return web.Response(status=206, body=b'x', content_type='image/png')
+
+    async def page(self, request: web.Request) -> web.Response:
+        self.requests.append((request.method, request.path))
+        return web.Response(text='page', content_type='text/html')
+
+
+async def _with_validator(use) -> FakeImageHost:
+    host = FakeImageHost()
+    client = HttpClient()
+    async with TestServer(host.app()) as server:
+        try:
+            await use(UrlValidator(client), lambda path: str(server.make_url(path)))
+        finally:
+            await client.close()
+    return host
+
+
+def test_slow_check_does_not_delay_messages(monkeypatch):
+    monkeypatch.setattr(url_validator, 'URL_CHECK_TIMEOUT', SLOW_CHECK * 4)
+    lags: list[float] = []
+
+    async def handle_messages() -> None:
+        # stands in for on_message handlers running while the URL is checked
+        for _ in range(10):
+            started = time.monotonic()
+            await asyncio.sleep(0.01)
+            lags.append(time.monotonic() - started - 0.01)
+
+    async def use(validator: UrlValidator, url) -> None:
+        results = await asyncio.gather(
+            validator.is_image(url('/slow.gif')),
+            validator.is_image(url('/slow.gif')),
+            handle_messages(),
+        )
+        assert results[:2] == [True, True]
+
+    host = asyncio.run(_with_validator(use))
+
+    assert max(lags) < SLOW_CHECK / 5
+    # concurrent checks of one URL share the request
+    assert host.requests == [('HEAD', '/slow.gif')]
+
+
+def test_timed_out_check_is_not_cached(monkeypatch):
+    monkeypatch.setattr(url_validator, 'URL_CHECK_TIMEOUT', SLOW_CHECK / 5)
+
+    async def use(validator: UrlValidator, url) -> None:
+        started = time.monotonic()
+        assert not await validator.is_image(url('/slow.gif'))
+        assert time.monotonic() - started < SLOW_CHECK
+        assert not validator._checked  # pylint: disable=protected-access
+
+    asyncio.run(_with_validator(use))
+
+
+def test_hosts_without_head_are_checked_with_ranged_get():
+    async def use(validator: UrlValidator, url) -> None:
+        assert await validator.is_image(url('/no-head.png'))
+        assert not await validator.is_image(url('/page.html'))
+        # results are cached
+        assert await validator.is_image(url('/no-head.png'))
+
+    host = asyncio.run(_with_validator(use))
+
+    assert host.requests == [
+        ('HEAD', '/no-head.png'), ('GET', '/no-head.png'), ('HEAD', '/page.html'),
+    ]